@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""Generator of synthetic recordings in the schema of `DummyJsonDataAdapter`, from a few to 10^8 echoes.
+
+The recording is written column by column and chunk by chunk, thus the memory needed is independent of its size:
+
+    python -m benchmarks.generate_recording -n 1000000 -o data/synthetic_1e6.json
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+import numpy as np
+
+# Number of values generated and written at once.
+CHUNK_SIZE = 1 << 20
+# Mean number of echoes per sample (i.e. per row of `points`) and of reflex points (i.e. x and y pairs) per sample.
+ECHOES_PER_SAMPLE = 64
+POINTS_PER_SAMPLE = 50
+# Fraction of timestamps being out of sequence and of gaps in the timestamps.
+OUT_OF_SEQUENCE_RATE = 1e-4
+GAP_RATE = 1e-4
+
+
+def _parse_args():
+    """
+    Define and parse the command line arguments.
+    @return: argparse.Namespace Command line arguments specified by the user.
+    """
+    parser = argparse.ArgumentParser(description="Synthetic recording generator")
+    parser.add_argument(
+        "-n",
+        "--number_of_echoes",
+        type=lambda n: int(float(n)),
+        required=True,
+        help="Number of echoes, e.g. 1e6.",
+    )
+    parser.add_argument(
+        "-o",
+        "--output_file",
+        type=Path,
+        required=True,
+        help="The json file to write.",
+    )
+    parser.add_argument(
+        "-s",
+        "--seed",
+        type=int,
+        default=0,
+        help="Seed of the random generator, the same seed gives the same recording.",
+    )
+    return parser.parse_args()
+
+
+def generate(output_file: Path, number_of_echoes: int, seed: int = 0):
+    """Writes a synthetic recording with `number_of_echoes` echoes to `output_file`.
+
+    The echo columns are drawn from the same ranges as in `data/dummy.json`. Timestamps increase by one per echo, with
+    rare out-of-sequence timestamps and gaps. There is one row of reflex points per sample of `ECHOES_PER_SAMPLE`
+    echoes, each with a Poisson distributed number of points around `POINTS_PER_SAMPLE` as interleaved x and y
+    coordinates (see `DataAdapter.point_dimensions`).
+
+    Args:
+        output_file: The json file to write.
+        number_of_echoes: Number of echoes (i.e. length of all columns but `points`).
+        seed: Seed of the random generator.
+    """
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    temporary_file = output_file.with_suffix(".tmp")
+    with open(temporary_file, "w") as f:
+        f.write("{")
+        for index, (column, generate_chunk) in enumerate(
+            [
+                ("amplitude", lambda rng, n, _: rng.uniform(0.0, 10.0, n)),
+                ("echo_distance", lambda rng, n, _: rng.uniform(0.0, 5.0, n)),
+                ("significance", lambda rng, n, _: rng.uniform(0.0, 1.0, n)),
+                ("timestamp", _timestamps()),
+            ]
+        ):
+            f.write(f"{',' if index > 0 else ''}\n{json.dumps(column)}: [")
+            _write_column(f, np.random.default_rng([seed, index]), number_of_echoes, generate_chunk)
+            f.write("]")
+        f.write(',\n"points": [')
+        _write_points(f, np.random.default_rng([seed, 4]), -(-number_of_echoes // ECHOES_PER_SAMPLE))
+        f.write("]\n}\n")
+    temporary_file.replace(output_file)
+
+
+def _write_column(f, rng, length, generate_chunk):
+    for start in range(0, length, CHUNK_SIZE):
+        values = generate_chunk(rng, min(CHUNK_SIZE, length - start), start)
+        f.write(("," if start > 0 else "") + ",".join(values.astype(str)))
+
+
+def _timestamps():
+    """Returns the generator of timestamp chunks, which keeps the sum of all gaps so far across chunks."""
+    total_gap = 0
+
+    def _generate_chunk(rng, n, start):
+        nonlocal total_gap
+        # Gaps shift all following timestamps.
+        gaps = np.cumsum((rng.random(n) < GAP_RATE) * rng.integers(10, 1000, n)) + total_gap
+        total_gap = int(gaps[-1])
+        timestamps = np.arange(start, start + n, dtype=np.int64) + gaps
+        out_of_sequence = rng.random(n) < OUT_OF_SEQUENCE_RATE
+        timestamps[out_of_sequence] -= rng.integers(1, 100, np.count_nonzero(out_of_sequence))
+        return np.maximum(timestamps, 0)
+
+    return _generate_chunk
+
+
+def _write_points(f, rng, number_of_samples):
+    for start in range(0, number_of_samples, CHUNK_SIZE // POINTS_PER_SAMPLE):
+        # Two coordinates per point, thus every row has an even length.
+        lengths = 2 * rng.poisson(POINTS_PER_SAMPLE, min(CHUNK_SIZE // POINTS_PER_SAMPLE, number_of_samples - start))
+        values = rng.uniform(0.0, 2 * np.pi, lengths.sum()).astype(str)
+        offsets = np.concatenate([[0], np.cumsum(lengths)])
+        rows = ("[" + ",".join(values[s:e]) + "]" for s, e in zip(offsets[:-1], offsets[1:]))
+        f.write(("," if start > 0 else "") + ",".join(rows))
+
+
+if __name__ == "__main__":
+    args = _parse_args()
+    generate(args.output_file, args.number_of_echoes, args.seed)
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Report of the cold-start import time of the entry points, evaluations and data adapters.
+
+Every module is imported in a fresh interpreter with `-X importtime`, the report lists its total import time and the
+most expensive (top-level) packages it pulls in:
+
+    python -m benchmarks.import_time evaluation_dashboard evaluation_semantics.correlation_matrix
+"""
+
+import argparse
+import json
+from pathlib import Path
+import subprocess
+import sys
+
+from evaluation_semantics import _registry
+
+_ROOT_DIRECTORY = Path(__file__).parent.parent
+
+
+def _parse_args():
+    """
+    Define and parse the command line arguments.
+    @return: argparse.Namespace Command line arguments specified by the user.
+    """
+    parser = argparse.ArgumentParser(description="Import time report")
+    parser.add_argument(
+        "modules",
+        nargs="*",
+        help="Modules to import, defaults to the entry points and all evaluations and data adapters.",
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=5,
+        help="Number of the most expensive packages listed per module.",
+    )
+    parser.add_argument(
+        "-o",
+        "--output_file",
+        type=Path,
+        default=None,
+        help="Optional json file the report is written to.",
+    )
+    return parser.parse_args()
+
+
+def import_time(module_name: str) -> dict:
+    """Imports `module_name` in a fresh interpreter and returns the import time of it and of each top-level package.
+
+    Returns:
+        Dictionary with the total `seconds` (including all transitive imports) and the `packages` mapping each
+        top-level package to the seconds spent importing its own modules, ordered by decreasing time.
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module_name}"],
+        cwd=_ROOT_DIRECTORY,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    packages = dict()
+    total = 0.0
+    for line in completed.stderr.splitlines():
+        # Lines look like `import time: self [us] | cumulative [us] | imported package`.
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        own, cumulative, name = line[len("import time:") :].split("|")
+        package = name.strip().split(".")[0]
+        packages[package] = packages.get(package, 0.0) + int(own) / 1e6
+        if name.strip() == module_name:
+            total = int(cumulative) / 1e6
+    return {"seconds": total, "packages": dict(sorted(packages.items(), key=lambda item: -item[1]))}
+
+
+def _default_modules() -> list:
+    entries = list(_registry.available_evaluations().values()) + list(_registry.available_data_adapters().values())
+    return ["evaluation_dashboard", "evaluation_report"] + sorted({e.module_name for e in entries})
+
+
+if __name__ == "__main__":
+    args = _parse_args()
+
+    report = {module_name: import_time(module_name) for module_name in args.modules or _default_modules()}
+    for module_name, result in report.items():
+        heaviest = ", ".join(f"{p} {s:.3f} s" for p, s in list(result["packages"].items())[: args.top])
+        print(f"{module_name:<50} {result['seconds']:7.3f} s   ({heaviest})")
+    if args.output_file is not None:
+        args.output_file.write_text(json.dumps(report, indent=2))
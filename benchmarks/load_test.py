@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""Load test of the dashboard served in production mode by an increasing number of worker processes.
+
+For each number of workers the dashboard is started (with --production and --warmup), then concurrent clients request
+the selected evaluations (i.e. the dispatcher callback, served from the figure cache of the worker) as fast as
+possible. Throughput and latencies are reported per number of workers along with the number of cores, the speedup
+shows how serving scales with the cores. Note that the scaling has not been verified yet: so far the load test has only
+been run on a single core, where more workers cannot be faster. Run it on a machine with at least as many cores as
+workers to measure it:
+
+    python -m benchmarks.load_test -i data/dummy.json -da DummyJsonDataAdapter --workers 1 2 4 --clients 16
+"""
+
+import argparse
+import concurrent.futures
+import json
+import os
+from pathlib import Path
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+import numpy as np
+
+from evaluation_dashboard import available_data_adapters
+from evaluation_semantics import _registry
+from evaluation_semantics import base
+
+_ROOT_DIRECTORY = Path(__file__).parent.parent
+
+
+def _parse_args():
+    """
+    Define and parse the command line arguments.
+    @return: argparse.Namespace Command line arguments specified by the user.
+    """
+    parser = argparse.ArgumentParser(description="Dashboard load test")
+    parser.add_argument(
+        "-i",
+        "--input_file",
+        type=Path,
+        required=True,
+        help="Input file served by the dashboard.",
+    )
+    parser.add_argument(
+        "-da",
+        "--data_adapter",
+        choices=available_data_adapters().keys(),
+        required=True,
+        help="Data Adapter to use.",
+    )
+    parser.add_argument(
+        "--workers",
+        nargs="+",
+        type=int,
+        default=[1, 2, 4],
+        help="Numbers of worker processes to test.",
+    )
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=4,
+        help="Number of threads per worker.",
+    )
+    parser.add_argument(
+        "--clients",
+        type=int,
+        default=16,
+        help="Number of concurrent clients, each sending its next request once the previous one is answered.",
+    )
+    parser.add_argument(
+        "--seconds",
+        type=float,
+        default=10.0,
+        help="Duration of the load per number of workers.",
+    )
+    parser.add_argument(
+        "-e",
+        "--evaluations",
+        nargs="+",
+        choices=_registry.available_evaluations().keys(),
+        default=None,
+        help="Evaluations requested by the clients, all by default.",
+    )
+    parser.add_argument(
+        "-o",
+        "--output_file",
+        type=Path,
+        default=None,
+        help="Optional json file the results are written to.",
+    )
+    return parser.parse_args()
+
+
+def run(input_file: Path, data_adapter: str, workers: int, threads: int, clients: int, seconds: float, names=None):
+    """Starts the dashboard with `workers` workers and measures it under the load of `clients` concurrent clients.
+
+    Returns:
+        Dictionary with the number of `requests` answered, the `errors`, the throughput (`requests_per_second`) and the
+        median and 95th percentile of the latency in seconds.
+    """
+    port = _free_port()
+    server = subprocess.Popen(
+        [sys.executable, "evaluation_dashboard.py", "-i", str(input_file), "-da", data_adapter, "--port", str(port)]
+        + ["--production", "--warmup", "--workers", str(workers), "--threads", str(threads)],
+        cwd=_ROOT_DIRECTORY,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        url = f"http://127.0.0.1:{port}"
+        _wait_until_up(url, server)
+        payload = json.dumps(_dispatch_payload(url, names)).encode()
+        deadline = time.perf_counter() + seconds
+        with concurrent.futures.ThreadPoolExecutor(max_workers=clients) as executor:
+            results = list(executor.map(lambda _: _client(url, payload, deadline), range(clients)))
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=30)
+
+    latencies = np.concatenate([r[0] for r in results])
+    return {
+        "requests": len(latencies),
+        "errors": sum(r[1] for r in results),
+        "requests_per_second": len(latencies) / seconds,
+        "latency_median": float(np.median(latencies)) if len(latencies) > 0 else None,
+        "latency_p95": float(np.percentile(latencies, 95)) if len(latencies) > 0 else None,
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_until_up(url, server, timeout=300):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"The dashboard exited with code {server.returncode}.")
+        try:
+            urllib.request.urlopen(url, timeout=5).read()
+            return
+        except OSError:
+            time.sleep(0.5)
+    raise TimeoutError(f"The dashboard did not start within {timeout} s.")
+
+
+def _dispatch_payload(url, names=None) -> dict:
+    """Returns the request of the dispatcher callback (see `base.register_dispatcher`) selecting `names`, all if `None`.
+
+    The outputs matched by pattern (e.g. the figures of all evaluations) are resolved via the layout of the dashboard.
+    """
+    dependencies = json.loads(urllib.request.urlopen(f"{url}/_dash-dependencies").read())
+    layout = json.loads(urllib.request.urlopen(f"{url}/_dash-layout").read())
+    dispatcher = next(d for d in dependencies if f"{base.SELECTION_STORE_ID}.data" in d["output"])
+    ids = list()
+    _collect_ids(layout, ids)
+    if names is None:
+        names = sorted({i["name"] for i in ids if isinstance(i, dict) and "name" in i})
+
+    outputs = list()
+    # Multiple outputs are serialized as `..first...second..`.
+    for output in dispatcher["output"].strip(".").split("..."):
+        component_id, prop = output.rsplit(".", 1)
+        if component_id.startswith("{"):
+            pattern = json.loads(component_id)
+            outputs.append(
+                [{"id": i, "property": prop} for i in ids if isinstance(i, dict) and i.get("type") == pattern["type"]]
+            )
+        else:
+            outputs.append({"id": component_id, "property": prop})
+    return {
+        "output": dispatcher["output"],
+        "outputs": outputs,
+        "inputs": [{**dispatcher["inputs"][0], "value": names}],
+        # Without a previous selection, every request computes (i.e. serves from the cache) all parts of `names`.
+        "state": [{**s, "value": None} for s in dispatcher["state"]],
+        "changedPropIds": [f"{dispatcher['inputs'][0]['id']}.{dispatcher['inputs'][0]['property']}"],
+    }
+
+
+def _collect_ids(component, ids):
+    if isinstance(component, dict):
+        if "id" in component.get("props", dict()):
+            ids.append(component["props"]["id"])
+        for value in component.get("props", dict()).values():
+            _collect_ids(value, ids)
+    elif isinstance(component, list):
+        for child in component:
+            _collect_ids(child, ids)
+
+
+def _client(url, payload, deadline):
+    """Sends requests until `deadline`, returns the latencies of the successful ones and the number of errors."""
+    latencies, errors = list(), 0
+    while time.perf_counter() < deadline:
+        request = urllib.request.Request(
+            f"{url}/_dash-update-component",
+            data=payload,
+            headers={"Content-Type": "application/json", "Accept-Encoding": "gzip"},
+        )
+        start = time.perf_counter()
+        try:
+            urllib.request.urlopen(request, timeout=60).read()
+        except OSError:
+            errors += 1
+            continue
+        latencies.append(time.perf_counter() - start)
+    return np.array(latencies), errors
+
+
+if __name__ == "__main__":
+    args = _parse_args()
+
+    report = dict(cpu_count=os.cpu_count(), clients=args.clients, threads=args.threads, results=dict())
+    for workers in args.workers:
+        result = run(
+            args.input_file, args.data_adapter, workers, args.threads, args.clients, args.seconds, args.evaluations
+        )
+        report["results"][workers] = result
+        baseline = report["results"][args.workers[0]]["requests_per_second"]
+        # Runs without any answered request have neither latencies nor a throughput to compare with.
+        speedup = f"x{result['requests_per_second'] / baseline:.2f}" if baseline > 0 else "n/a"
+        median, p95 = [
+            f"{result[key]:.3f} s" if result[key] is not None else "n/a" for key in ["latency_median", "latency_p95"]
+        ]
+        print(
+            f"{workers:>3} workers: {result['requests_per_second']:8.1f} requests/s ({speedup}), "
+            f"median {median}, p95 {p95}, {result['errors']} errors"
+        )
+    if args.output_file is not None:
+        args.output_file.write_text(json.dumps(report, indent=2))
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""Benchmark of the data adapters and evaluations over synthetic recordings of increasing size.
+
+For each size and data adapter the time to load the recording, to compute every figure (with an empty adapter cache,
+i.e. including all intermediate results) and to serialize it (with plain json lists and with typed arrays), the size
+of the serialized figure (plain, with typed arrays and additionally gzip compressed) and the time to build the
+`echoes` data frame are measured. The results are written to a json file. Given the results of a previous run as
+baseline, every measurement exceeding its threshold is reported as regression. Failing measurements (e.g. an
+evaluation raising on the synthetic recordings) are reported as well, both result in a non-zero exit code:
+
+    python -m benchmarks.run_benchmarks --sizes 1e3 1e5 1e7 -o after.json --baseline before.json
+"""
+
+import argparse
+import json
+import os
+import platform
+from pathlib import Path
+import sys
+import tempfile
+import time
+
+import numpy as np
+import plotly.graph_objects as go
+import plotly.io
+
+from benchmarks.generate_recording import generate
+from evaluation_dashboard import available_data_adapters, get_all_available_evaluations, load_adapter
+from evaluation_semantics import _payload
+
+# Failures of a measurement on the synthetic recordings (e.g. an evaluation rejecting the data), which are recorded.
+# Anything else is a bug of the benchmark and aborts it.
+MEASUREMENT_ERRORS = (OSError, ValueError, AssertionError, ArithmeticError, IndexError, MemoryError)
+
+
+def _parse_args():
+    """
+    Define and parse the command line arguments.
+    @return: argparse.Namespace Command line arguments specified by the user.
+    """
+    parser = argparse.ArgumentParser(description="Evaluation benchmarks")
+    parser.add_argument(
+        "--sizes",
+        nargs="+",
+        type=lambda n: int(float(n)),
+        default=[10**3, 10**4, 10**5, 10**6],
+        help="Numbers of echoes of the synthetic recordings, up to 1e8.",
+    )
+    parser.add_argument(
+        "-da",
+        "--data_adapters",
+        nargs="+",
+        choices=available_data_adapters().keys(),
+        default=["DummyJsonDataAdapter", "StreamingJsonDataAdapter"],
+        help="Data Adapters to benchmark.",
+    )
+    parser.add_argument(
+        "-o",
+        "--output_file",
+        type=Path,
+        default=Path("benchmark_results.json"),
+        help="The json file the results are written to.",
+    )
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        default=None,
+        help="Optional results of a previous run to compare with, regressions result in a non-zero exit code.",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Relative increase of a measurement over the baseline considered a regression.",
+    )
+    parser.add_argument(
+        "--min_seconds",
+        type=float,
+        default=0.05,
+        help="Absolute increase of a timing below which it is never considered a regression (i.e. noise).",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=1,
+        help="Number of repetitions of every timing, the fastest one is kept.",
+    )
+    parser.add_argument(
+        "--data_directory",
+        type=Path,
+        default=Path(tempfile.gettempdir()) / "evaluation_benchmarks",
+        help="Directory of the generated recordings, which are reused across runs.",
+    )
+    return parser.parse_args()
+
+
+def run(sizes, data_adapters, data_directory: Path, repeat: int = 1) -> dict:
+    """Runs the benchmark for all `sizes` and `data_adapters`.
+
+    Returns:
+        Mapping of the name of each measurement (`<size>/<adapter>/<what>`) to a dictionary with either its `seconds`,
+        its `bytes` or the `error` it failed with.
+    """
+    results = dict()
+    for size in sizes:
+        file_path = data_directory / f"synthetic_{size}.json"
+        if not file_path.is_file():
+            generate(file_path, size)
+        for data_adapter in data_adapters:
+            prefix = f"{size}/{data_adapter}"
+            adapter = _measure(
+                results, f"{prefix}/load", repeat, lambda d=data_adapter, f=file_path: load_adapter(d, f)
+            )
+            if adapter is None:
+                continue
+            for evaluation in sorted(
+                get_all_available_evaluations(adapter, mode="notebook"), key=lambda e: e.get_name()
+            ):
+                for args in evaluation.get_warmup_arguments():
+                    name = f"{prefix}/{evaluation.get_name()}" + "".join(f"[{a}]" for a in args if a is not None)
+                    figure = _measure(
+                        results, f"{name}/get_figure", repeat, lambda e=evaluation, a=args: _get_figure(e, a)
+                    )
+                    if not isinstance(figure, go.Figure):
+                        # Arguments not resulting in a figure (e.g. no property selected) are no use to measure.
+                        if "error" not in results[f"{name}/get_figure"]:
+                            del results[f"{name}/get_figure"]
+                        continue
+                    serialized = _measure(results, f"{name}/serialize", repeat, lambda f=figure: plotly.io.to_json(f))
+                    results[f"{name}/figure_size"] = {"bytes": len(serialized)}
+                    # As sent by the dashboard, i.e. with typed arrays and compressed.
+                    typed = _measure(
+                        results,
+                        f"{name}/serialize_typed",
+                        repeat,
+                        lambda f=figure: plotly.io.json.to_json_plotly(_payload.encode(f)),
+                    )
+                    results[f"{name}/typed_figure_size"] = {"bytes": len(typed)}
+                    compressed = _payload.compress(typed.encode(), "gzip")
+                    results[f"{name}/compressed_figure_size"] = {"bytes": len(compressed)}
+            _measure(results, f"{prefix}/echoes", repeat, lambda a=adapter: _echoes(a))
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float, min_seconds: float) -> list:
+    """Returns the regressions of `results` compared to `baseline` (both as returned by `run`).
+
+    A timing is a regression if it increased by more than `tolerance` (relative) and `min_seconds` (absolute), a size
+    if it increased by more than `tolerance`. Measurements failing now but not in the baseline are regressions too.
+    """
+    regressions = list()
+    for name, before in baseline.items():
+        after = results.get(name)
+        if after is None or "error" in before:
+            continue
+        if "error" in after:
+            regressions.append({"name": name, "before": before, "after": after})
+        elif "seconds" in before:
+            if after["seconds"] > before["seconds"] * (1 + tolerance) + min_seconds:
+                regressions.append({"name": name, "before": before, "after": after})
+        elif after["bytes"] > before["bytes"] * (1 + tolerance):
+            regressions.append({"name": name, "before": before, "after": after})
+    return regressions
+
+
+def _measure(results, name, repeat, function):
+    """Stores the fastest of `repeat` calls of `function` as `name` in `results`, returns its (last) return value.
+
+    Failures (see `MEASUREMENT_ERRORS`) are stored as `error` instead, returning `None`.
+    """
+    value, timings = None, list()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            value = function()
+            timings.append(time.perf_counter() - start)
+    except MEASUREMENT_ERRORS as e:
+        results[name] = {"error": f"{type(e).__name__}: {e}"}
+        return None
+    results[name] = {"seconds": min(timings)}
+    return value
+
+
+def _get_figure(evaluation, args):
+    # Every figure is computed from scratch, including all (shared) intermediate results.
+    evaluation.adapter.clear_cache()
+    # The arguments are passed the same way as by `base.return_data_or_empty_list`.
+    return evaluation.get_figure(args) if len(args) > 0 else evaluation.get_figure()
+
+
+def _echoes(adapter):
+    adapter.clear_cache()
+    return adapter.echoes
+
+
+def _environment() -> dict:
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+if __name__ == "__main__":
+    args = _parse_args()
+
+    results = run(args.sizes, args.data_adapters, args.data_directory, args.repeat)
+    report = {
+        "environment": _environment(),
+        "thresholds": {"tolerance": args.tolerance, "min_seconds": args.min_seconds},
+        "results": results,
+    }
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text())
+        report["baseline"] = str(args.baseline)
+        report["regressions"] = compare(results, baseline["results"], args.tolerance, args.min_seconds)
+    args.output_file.write_text(json.dumps(report, indent=2))
+
+    for name, result in results.items():
+        print(f"{name:<80} {result.get('seconds', result.get('bytes', result.get('error')))}")
+    for regression in report.get("regressions", list()):
+        print(f"REGRESSION {regression['name']}: {regression['before']} -> {regression['after']}")
+    # Failures are no numbers to compare with later, thus a run with failures must not be taken as baseline.
+    failures = {name: result["error"] for name, result in results.items() if "error" in result}
+    for name, error in failures.items():
+        print(f"FAILED {name}: {error}")
+    sys.exit(1 if report.get("regressions") or failures else 0)
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+
+from collections import OrderedDict
+import concurrent.futures
+import logging
+import os
+import threading
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class AdapterPool:
+    def __init__(self, load, max_bytes: Optional[int] = None):
+        """Least recently used pool of loaded data adapters (e.g. one per input file), bounded by their memory.
+
+        The memory of an adapter is its `nbytes` (derived data such as features is not counted). Whenever the pool
+        exceeds `max_bytes`, the least recently used adapters are evicted, except the most recently used one. Evicted
+        adapters are freed as soon as nobody uses them anymore.
+
+        Args:
+            load: Callable creating the adapter for a key (e.g. the input file).
+            max_bytes: Memory budget of all adapters, defaults to half of the physical memory (see `default_budget`).
+        """
+        self.load = load
+        self.max_bytes = max_bytes if max_bytes is not None else default_budget()
+        self._entries = OrderedDict()
+        self._loading = dict()
+        self._lock = threading.Lock()
+        # A single thread, prefetching must not compete with the requests for the cores.
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="adapter-prefetch")
+
+    def get(self, key):
+        """Returns the adapter for `key`, loading it on first request (or waiting for its prefetch to finish)."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            future = self._loading.get(key)
+            load_here = future is None
+            if load_here:
+                future = self._loading[key] = concurrent.futures.Future()
+        if load_here:
+            self._load(key, future, recent=True)
+        adapter = future.result()
+        if not load_here:
+            # Loaded by a prefetch (or another request), i.e. possibly added as least recently used.
+            with self._lock:
+                self._put(key, adapter, recent=True)
+        return adapter
+
+    def prefetch(self, key):
+        """Loads the adapter for `key` in the background, unless loaded (or loading) already.
+
+        Prefetched adapters are added as least recently used, thus they never evict adapters that have been requested.
+        Failures are logged only, they are raised once the adapter is requested via `get`.
+        """
+        with self._lock:
+            if key in self._entries or key in self._loading:
+                return
+            future = self._loading[key] = concurrent.futures.Future()
+        self._executor.submit(self._load, key, future, recent=False)
+
+    @property
+    def nbytes(self) -> int:
+        """Returns the summed memory of all adapters in the pool."""
+        with self._lock:
+            return sum(adapter.nbytes for adapter in self._entries.values())
+
+    def keys(self) -> list:
+        """Returns the keys of the loaded adapters, the least recently used first."""
+        with self._lock:
+            return list(self._entries)
+
+    def _load(self, key, future, recent):
+        try:
+            adapter = self.load(key)
+        except (OSError, ValueError) as e:
+            # E.g. a missing or malformed input file, raised by `get` once requested.
+            if not recent:
+                logger.warning("Prefetching '%s' failed: %r", key, e)
+            self._fail(key, future, e)
+            return
+        except Exception as e:
+            # Anything else is a bug of the loader, which is raised by `get` as well but never hidden.
+            logger.exception("Loading '%s' failed.", key)
+            self._fail(key, future, e)
+            return
+        with self._lock:
+            self._put(key, adapter, recent)
+            self._loading.pop(key, None)
+        future.set_result(adapter)
+
+    def _fail(self, key, future, error):
+        with self._lock:
+            self._loading.pop(key, None)
+        future.set_exception(error)
+
+    def _put(self, key, adapter, recent):
+        self._entries[key] = adapter
+        self._entries.move_to_end(key, last=recent)
+        # Recomputed every time, since adapters may load data lazily (e.g. `StreamingJsonDataAdapter`).
+        nbytes = sum(a.nbytes for a in self._entries.values())
+        # The most recently used adapter is kept even if exceeding the budget on its own.
+        most_recent = next(reversed(self._entries))
+        for evicted_key in list(self._entries):
+            if nbytes <= self.max_bytes:
+                break
+            if evicted_key == most_recent:
+                continue
+            nbytes -= self._entries.pop(evicted_key).nbytes
+            logger.info("Evicted '%s' from the adapter pool.", evicted_key)
+
+
+def default_budget() -> int:
+    """Returns half of the physical memory of the host (POSIX only, else no limit)."""
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") // 2
+    except (AttributeError, ValueError, OSError):
+        return float("inf")
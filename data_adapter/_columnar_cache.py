@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from contextlib import ExitStack
+from pathlib import Path
+
+import numpy as np
+
+from data_adapter._ragged_array import RaggedArray
+
+DEFAULT_CACHE_DIRECTORY = Path.home() / ".cache" / "evaluation_dashboard"
+MANIFEST_FILE_NAME = "manifest.json"
+
+
+def load_cached(adapter_class, file_path: Path, cache_directory: Path = DEFAULT_CACHE_DIRECTORY, **kwargs):
+    """Instantiates `adapter_class` for `file_path` via an on-disk columnar cache.
+
+    On first load the adapter is created as usual and its columns are written chunk by chunk (see `write_columns`)
+    as one binary file each (ragged columns as a flat values and an offsets file). Every later load of the same,
+    unchanged file memory-maps these files instead of parsing the input again. Entries are keyed by the resolved path,
+    size and modification time of the input file, the adapter class and `kwargs`, thus changing any of them results
+    in a new entry. Entries of a changed input file are removed, the ones of the same file for other adapter classes
+    or `kwargs` are kept. Whether the data has been validated (see `DataAdapter.validated`) is kept with the entry,
+    the data is not validated again on later loads.
+
+    Args:
+        adapter_class: The `DataAdapter` subclass to instantiate.
+        file_path: The input file as passed to the adapter.
+        cache_directory: The root directory of the cache.
+        **kwargs: Further arguments passed to the constructor of `adapter_class`.
+    Returns:
+        The adapter, either freshly loaded or backed by read-only memory maps.
+    """
+    path_key, stat_key, entry_key = _cache_keys(adapter_class, file_path, kwargs)
+    entry_directory = Path(cache_directory) / f"{path_key}-{stat_key}-{entry_key}"
+
+    if (entry_directory / MANIFEST_FILE_NAME).is_file():
+        data, validated = read_columns(entry_directory)
+        return adapter_class.from_data(data, source_token=entry_directory.name, validated=validated)
+
+    adapter = adapter_class(file_path, **kwargs)
+    # Entries of a previous version of the same input file are of no use anymore.
+    for outdated_directory in Path(cache_directory).glob(f"{path_key}-*"):
+        if not outdated_directory.name.startswith(f"{path_key}-{stat_key}-"):
+            shutil.rmtree(outdated_directory, ignore_errors=True)
+    write_columns(adapter, entry_directory)
+    return adapter
+
+
+def write_columns(adapter, directory: Path):
+    """Writes all columns of `adapter` into `directory`, chunk by chunk via `DataAdapter.iter_chunks`.
+
+    Thus the data of adapters streaming it (e.g. `StreamingJsonDataAdapter`) is never held in memory as a whole. The
+    files are written into a temporary directory first which is then renamed, so that concurrent readers never see a
+    partially written entry.
+    """
+    directory = Path(directory)
+    directory.parent.mkdir(parents=True, exist_ok=True)
+    temporary_directory = Path(tempfile.mkdtemp(dir=directory.parent, prefix=".tmp-"))
+
+    manifest = {
+        "validated": adapter.validated,
+        "columns": {name: _write_column(adapter, name, temporary_directory) for name in adapter.columns},
+    }
+    with open(temporary_directory / MANIFEST_FILE_NAME, "w") as mf:
+        json.dump(manifest, mf)
+
+    try:
+        os.rename(temporary_directory, directory)
+    except OSError:
+        # Someone else has been faster writing the very same entry.
+        shutil.rmtree(temporary_directory, ignore_errors=True)
+
+
+def read_columns(directory: Path):
+    """Maps all columns of a cache entry written via `write_columns` read-only into memory.
+
+    Returns:
+        Tuple of the columns (as expected by `DataAdapter.from_data`) and whether they have been validated.
+    """
+    directory = Path(directory)
+    with open(directory / MANIFEST_FILE_NAME) as mf:
+        manifest = json.load(mf)
+
+    data = dict()
+    for name, spec in manifest["columns"].items():
+        if spec["kind"] == "array":
+            data[name] = _map(directory / f"{name}.bin", spec["dtype"], spec["shape"])
+        else:
+            values = _map(directory / f"{name}.values.bin", spec["dtype"], [spec["number_of_values"]])
+            offsets = _map(directory / f"{name}.offsets.bin", np.int64, [spec["shape"][0] + 1])
+            data[name] = RaggedArray(values, offsets)
+    return data, manifest["validated"]
+
+
+def _write_column(adapter, name: str, directory: Path) -> dict:
+    """Appends the chunks of the column `name` to its file(s), returns its entry of the manifest.
+
+    The offsets of the chunks of ragged columns are rebased onto the values written before.
+    """
+    spec = None
+    with ExitStack() as files:
+        for chunk in adapter.iter_chunks([name]):
+            values = chunk[name]
+            if spec is None:
+                spec = _spec(values)
+                if spec["kind"] == "array":
+                    values_file = files.enter_context(open(directory / f"{name}.bin", "wb"))
+                else:
+                    values_file = files.enter_context(open(directory / f"{name}.values.bin", "wb"))
+                    offsets_file = files.enter_context(open(directory / f"{name}.offsets.bin", "wb"))
+                    offsets_file.write(np.zeros(1, dtype=np.int64).tobytes())
+            if spec["kind"] == "array":
+                values_file.write(np.ascontiguousarray(values, dtype=spec["dtype"]).tobytes())
+            else:
+                offsets = values.offsets[1:] - values.offsets[0] + spec["number_of_values"]
+                offsets_file.write(offsets.astype(np.int64, copy=False).tobytes())
+                values_file.write(np.ascontiguousarray(values.flat, dtype=spec["dtype"]).tobytes())
+                spec["number_of_values"] += len(values.flat)
+            spec["shape"][0] += len(values)
+    if spec is None:
+        # Empty columns yield no chunks, their (empty) data tells the kind and dtype.
+        spec = _spec(adapter.data[name])
+        if spec["kind"] == "ragged":
+            (directory / f"{name}.values.bin").touch()
+            (directory / f"{name}.offsets.bin").write_bytes(np.zeros(1, dtype=np.int64).tobytes())
+        else:
+            (directory / f"{name}.bin").touch()
+    return spec
+
+
+def _spec(values) -> dict:
+    """Returns the entry of the manifest of an empty column of the kind and dtype of `values`."""
+    if isinstance(values, RaggedArray):
+        return {"kind": "ragged", "dtype": values.dtype.str, "shape": [0], "number_of_values": 0}
+    return {"kind": "array", "dtype": values.dtype.str, "shape": [0, *values.shape[1:]]}
+
+
+def _map(file_path: Path, dtype, shape) -> np.ndarray:
+    if np.prod(shape) == 0:
+        # Empty files cannot be memory-mapped.
+        empty = np.empty(shape, dtype=dtype)
+        empty.setflags(write=False)
+        return empty
+    return np.memmap(file_path, dtype=dtype, mode="r", shape=tuple(shape))
+
+
+def _cache_keys(adapter_class, file_path: Path, kwargs: dict):
+    """Returns the keys of the resolved path and of the size and modification time of `file_path` as well as the key
+    of the adapter class and `kwargs`.
+    """
+    file_path = Path(file_path).resolve()
+    stat = file_path.stat()
+    path_key = hashlib.sha1(str(file_path).encode()).hexdigest()[:16]
+    stat_key = hashlib.sha1(repr([stat.st_size, stat.st_mtime_ns]).encode()).hexdigest()[:16]
+    entry = [
+        adapter_class.__module__,
+        adapter_class.__qualname__,
+        repr(sorted(kwargs.items())),
+    ]
+    entry_key = hashlib.sha1(repr(entry).encode()).hexdigest()[:16]
+    return path_key, stat_key, entry_key
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""Filtering the rows (e.g. echoes) of a data adapter by a selection, e.g. a time range brushed in a plot.
+
+A selection is a sequence of conditions `(column, low, high)`, each keeping the rows whose value of `column` lies within
+`[low, high]`, all of which need to hold. The pseudo column `INDEX` refers to the position of the rows (e.g. the x axis
+of plots over the samples). The rows within a selection are computed vectorized:
+
+- Conditions on `INDEX` and on sorted columns (e.g. `timestamp` of a recording without out-of-sequence samples) narrow
+  down a contiguous range of rows via binary search, i.e. without a pass over the data.
+- All other conditions are evaluated as one boolean mask over that range only.
+
+Filtering results in a view, i.e. an adapter of the same class on the selected rows only (see `filtered`). Only the
+columns with one value per row (see `DataAdapter.table_columns`) are filtered, the others (e.g. `points`, one row per
+sample rather than per echo) are shared as they are. The filtered columns are slices if the rows are contiguous, else
+copies. Views are cached per selection, thus the rows are computed once per selection and every consumer (e.g. all
+evaluations) shares the view and the data derived from it.
+
+Adapters not holding their data in memory (see `DataAdapter.in_memory`) are filtered chunk by chunk in a single pass,
+holding only the selected rows. Their columns that are not filtered are loaded as a whole though.
+"""
+
+from collections import OrderedDict
+import hashlib
+import threading
+
+import numpy as np
+
+from data_adapter._ragged_array import RaggedArray
+
+# Pseudo column of the position of the rows.
+INDEX = "index"
+# Maximum number of views cached per adapter, the least recently used ones are dropped first.
+MAX_CACHED_VIEWS = 8
+
+
+def normalize(selection) -> tuple:
+    """Returns `selection` (e.g. as parsed from json) as tuple of conditions `(column, low, high)` sorted by column.
+
+    Several conditions on the same column are intersected. Raises `ValueError` if a condition is malformed.
+    """
+    ranges = dict()
+    for condition in selection or tuple():
+        column, low, high = condition
+        low, high = float(low), float(high)
+        if not isinstance(column, str) or np.isnan(low) or np.isnan(high):
+            raise ValueError(f"Malformed condition {condition!r}, expected e.g. ('timestamp', 0, 1).")
+        if column in ranges:
+            low, high = max(low, ranges[column][0]), min(high, ranges[column][1])
+        ranges[column] = (low, high)
+    return tuple((column, *ranges[column]) for column in sorted(ranges))
+
+
+def with_condition(selection, column: str, low: float, high: float) -> tuple:
+    """Returns `selection` with its condition on `column` (if any) replaced by `[low, high]`."""
+    return normalize([c for c in normalize(selection) if c[0] != column] + [(column, low, high)])
+
+
+def filtered(adapter, selection):
+    """Returns the (cached) view of `adapter` on the rows within `selection`, `adapter` itself if it is empty.
+
+    The view has the attributes `source_adapter`, i.e. `adapter`, and `source_rows`, the rows of `adapter` it holds as
+    `slice` or array (see `rows`).
+    """
+    selection = normalize(selection)
+    if not selection:
+        return adapter
+    return adapter.cached(("filtered_views",), _Views).get(selection, lambda: _view(adapter, selection))
+
+
+def rows(adapter, selection):
+    """Returns the rows of the in-memory `adapter` within `selection`.
+
+    Returns:
+        A `slice` if the rows are contiguous, else an int64 array of their positions.
+    """
+    data = adapter.data
+    length = len(data[adapter.table_columns[0]])
+    start, stop = 0, length
+    masked = list()
+    for column, low, high in normalize(selection):
+        if column == INDEX:
+            start = max(start, int(np.clip(np.ceil(low), 0, length)))
+            stop = min(stop, int(np.clip(np.floor(high) + 1, 0, length)))
+        elif _is_sorted(adapter, column):
+            values = data[column]
+            start = max(start, int(np.searchsorted(values, _bound(low, values.dtype, np.ceil), side="left")))
+            stop = min(stop, int(np.searchsorted(values, _bound(high, values.dtype, np.floor), side="right")))
+        else:
+            masked.append((column, low, high))
+    stop = max(start, stop)
+    if not masked or start == stop:
+        return slice(start, stop)
+
+    mask = _mask({column: data[column][start:stop] for column, _, _ in masked}, masked)
+    if mask.all():
+        return slice(start, stop)
+    return start + np.flatnonzero(mask)
+
+
+def source_range(adapter, low: float, high: float):
+    """Returns the range of `INDEX` of the rows (e.g. as selected in a plot) `low` to `high` of the view `adapter`
+    within the adapter it has been filtered from. Ranges of adapters which are no views are returned as they are.
+    """
+    selected = getattr(adapter, "source_rows", None)
+    if selected is None:
+        return low, high
+    if isinstance(selected, slice):
+        return selected.start + low, selected.start + high
+    if len(selected) == 0:
+        return low, high
+    first = int(np.clip(np.ceil(low), 0, len(selected) - 1))
+    last = int(np.clip(np.floor(high), first, len(selected) - 1))
+    return float(selected[first]), float(selected[last])
+
+
+def _view(adapter, selection):
+    table_columns = adapter.table_columns
+    if adapter.in_memory:
+        selected = rows(adapter, selection)
+        data = {column: _take(adapter.data[column], selected) for column in table_columns}
+    else:
+        data, selected = _gather(adapter, selection)
+    for column in adapter.columns:
+        if column not in table_columns:
+            data[column] = adapter.data[column] if adapter.in_memory else _load(adapter, column)
+    token = hashlib.sha1(f"{adapter.data_token}:{selection!r}".encode()).hexdigest()[:16]
+    view = type(adapter).from_data(data, source_token=token, validated=adapter.validated)
+    view.source_adapter = adapter
+    view.source_rows = selected
+    return view
+
+
+def _gather(adapter, selection):
+    """Collects the rows within `selection` chunk by chunk, returns their data and their positions."""
+    columns = adapter.table_columns
+    index_range = next(((low, high) for column, low, high in selection if column == INDEX), (-np.inf, np.inf))
+    parts = {column: list() for column in columns}
+    selected = list()
+    position = 0
+    for chunk in adapter.iter_chunks(columns):
+        length = len(chunk[columns[0]])
+        if position > index_range[1]:
+            break
+        local = np.flatnonzero(_mask({**chunk, INDEX: np.arange(position, position + length)}, selection))
+        for column in columns:
+            parts[column].append(_take(chunk[column], local))
+        selected.append(position + local)
+        position += length
+
+    data = dict()
+    for column in columns:
+        if not parts[column]:
+            data[column] = np.empty(0)
+        elif isinstance(parts[column][0], RaggedArray):
+            data[column] = _read_only(RaggedArray.concatenate(parts[column]))
+        else:
+            data[column] = _read_only(np.concatenate(parts[column]))
+    selected = np.concatenate(selected) if selected else np.empty(0, dtype=np.int64)
+    if len(selected) == 0 or selected[-1] - selected[0] + 1 == len(selected):
+        selected = slice(int(selected[0]), int(selected[-1]) + 1) if len(selected) > 0 else slice(0, 0)
+    return data, selected
+
+
+def _load(adapter, column):
+    parts = [chunk[column] for chunk in adapter.iter_chunks([column])]
+    if parts and isinstance(parts[0], RaggedArray):
+        return _read_only(RaggedArray.concatenate(parts))
+    return _read_only(np.concatenate(parts)) if parts else np.empty(0)
+
+
+def _mask(columns: dict, conditions) -> np.ndarray:
+    mask = None
+    for column, low, high in conditions:
+        if column not in columns:
+            raise KeyError(f"Unknown column '{column}', available are {sorted(columns)}.")
+        values = columns[column]
+        within = (values >= low) & (values <= high)
+        mask = within if mask is None else np.logical_and(mask, within, out=mask)
+    return mask
+
+
+def _is_sorted(adapter, column) -> bool:
+    if column not in adapter.table_columns:
+        raise KeyError(f"Unknown column '{column}', available are {sorted(adapter.table_columns) + [INDEX]}.")
+    values = adapter.data[column]
+    return adapter.cached(("sorted", column), lambda: bool(np.all(values[1:] >= values[:-1])))
+
+
+def _bound(value: float, dtype, to_integer):
+    """Returns `value` as scalar of `dtype`, searching with a scalar of another type would convert the whole column."""
+    if not np.issubdtype(dtype, np.integer):
+        return dtype.type(value)
+    info = np.iinfo(dtype)
+    return dtype.type(min(max(to_integer(value), info.min), info.max))
+
+
+def _take(values, selected):
+    if isinstance(selected, slice):
+        return values[selected]
+    if isinstance(values, RaggedArray):
+        return _read_only(values.take(selected))
+    return _read_only(values[selected])
+
+
+def _read_only(values):
+    for array in [values.values, values.offsets] if isinstance(values, RaggedArray) else [values]:
+        array.setflags(write=False)
+    return values
+
+
+class _Views:
+    def __init__(self):
+        """Least recently used views of one adapter by selection, each one being built once."""
+        self._views = OrderedDict()
+        self._building = dict()
+        self._lock = threading.Lock()
+
+    def get(self, selection, build):
+        with self._lock:
+            if selection in self._views:
+                self._views.move_to_end(selection)
+                return self._views[selection]
+            building = self._building.setdefault(selection, threading.Lock())
+        with building:
+            with self._lock:
+                if selection in self._views:
+                    self._views.move_to_end(selection)
+                    return self._views[selection]
+            view = build()
+            with self._lock:
+                self._views[selection] = view
+                while len(self._views) > MAX_CACHED_VIEWS:
+                    self._views.popitem(last=False)
+                self._building.pop(selection, None)
+        return view
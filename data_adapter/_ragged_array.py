@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+
+import itertools
+
+import numpy as np
+
+
+class RaggedArray:
+    def __init__(self, values: np.ndarray, offsets: np.ndarray):
+        """Compact representation of a sequence of variable-length rows (CSR style).
+
+        All rows are stored back to back in the flat array `values`, row `i` being
+        `values[offsets[i]:offsets[i + 1]]`. Slices of rows share `values` and only slice `offsets`, thus
+        `offsets[0]` is not necessarily zero.
+
+        Args:
+            values: Flat array holding the values of all rows.
+            offsets: Int64 array of length `number of rows + 1` with the start of each row in `values`.
+        """
+        self.values = values
+        self.offsets = offsets
+
+    @classmethod
+    def from_rows(cls, rows, dtype=np.float64):
+        """Creates the ragged array from a sequence of sequences (e.g. a list of lists as parsed from json)."""
+        offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum([len(row) for row in rows], out=offsets[1:])
+        values = np.fromiter(itertools.chain.from_iterable(rows), dtype=dtype, count=offsets[-1])
+        return cls(values, offsets)
+
+    @classmethod
+    def concatenate(cls, arrays):
+        """Concatenates the rows of several ragged arrays into a new (compact) one."""
+        arrays = list(arrays)
+        values = np.concatenate([a.flat for a in arrays])
+        lengths = np.concatenate([a.lengths() for a in arrays])
+        offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        return cls(values, offsets)
+
+    @property
+    def flat(self) -> np.ndarray:
+        """Returns the values of all rows as one flat (zero-copy) array."""
+        return self.values[self.offsets[0] : self.offsets[-1]]
+
+    @property
+    def dtype(self):
+        return self.values.dtype
+
+    @property
+    def nbytes(self) -> int:
+        return self.flat.nbytes + self.offsets.nbytes
+
+    def lengths(self) -> np.ndarray:
+        """Returns the number of values per row."""
+        return np.diff(self.offsets)
+
+    def take(self, rows: np.ndarray):
+        """Returns a new (compact) ragged array of the given rows, e.g. as selected by a boolean mask."""
+        rows = np.asarray(rows, dtype=np.int64)
+        starts = self.offsets[rows]
+        lengths = self.offsets[rows + 1] - starts
+        offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        # The values of all rows gathered at once, i.e. `concatenate([arange(start, stop) for ...])`.
+        index = np.arange(offsets[-1]) + np.repeat(starts - offsets[:-1], lengths)
+        return RaggedArray(self.values[index], offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            assert step == 1, "Only contiguous slices of rows are supported."
+            stop = max(start, stop)
+            return RaggedArray(self.values, self.offsets[start : stop + 1])
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"Row {index} out of range for {len(self)} rows.")
+        return self.values[self.offsets[index] : self.offsets[index + 1]]
+
+    def __iter__(self):
+        for start, end in zip(self.offsets[:-1], self.offsets[1:]):
+            yield self.values[start:end]
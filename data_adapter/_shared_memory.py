@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""Sharing the data of an adapter between processes (dashboards, batch reports, notebooks) via shared memory.
+
+One process publishes the columns of its adapter (ragged ones as flat values and offsets) into a named shared memory
+segment, every other process attaches to it by name and gets an adapter of the same class whose columns are read-only
+views on the segment, i.e. without copying or parsing anything:
+
+    adapter = load_shared(DummyJsonDataAdapter, Path("data/dummy.json"))
+
+The segment starts with a small header (reference count, ready flag and the json manifest of the columns), followed
+by the column buffers. Each process holding the segment counts as one reference, the last one to release it unlinks
+the segment. The reference count is updated under a file lock (POSIX only). Note that a crashed process never
+releases its reference, thus its segment stays until removed via `unlink`.
+"""
+
+import contextlib
+import importlib
+import json
+import logging
+import os
+import sys
+import tempfile
+import weakref
+from multiprocessing import resource_tracker, shared_memory
+from pathlib import Path
+
+import numpy as np
+
+from data_adapter import data_adapter
+from data_adapter._ragged_array import RaggedArray
+
+logger = logging.getLogger(__name__)
+
+# Prefix of the names of all segments, which are limited to 31 characters on some platforms.
+NAME_PREFIX = "evd_"
+# The header holds the reference count, the ready flag and the length of the manifest (as int64 each).
+_HEADER_BYTES = 24
+_ALIGNMENT = 64
+
+
+class SharedDataset:
+    def __init__(self, segment: shared_memory.SharedMemory, manifest: dict):
+        """One reference to a published segment, created via `publish` or `attach`.
+
+        Args:
+            segment: The attached shared memory segment.
+            manifest: The manifest of the columns within the segment, see `publish`. The offsets of the columns are
+                relative to the end of the header and manifest.
+        """
+        self._segment = segment
+        self.manifest = manifest
+        self._data_start = _data_start(manifest)
+        self._pid = os.getpid()
+        self._released = False
+
+    @classmethod
+    def publish(cls, adapter: data_adapter.DataAdapter, name: str):
+        """Copies all columns of `adapter` into a new segment `name`, raising `FileExistsError` if it exists already.
+
+        Returns:
+            The first reference to the segment, which needs to be released once no longer used.
+        """
+        columns = dict()
+        for column_name, column in adapter.data.items():
+            if isinstance(column, RaggedArray):
+                columns[column_name] = {"values": column.flat, "offsets": column.offsets - column.offsets[0]}
+            else:
+                columns[column_name] = {"array": column}
+
+        manifest = {
+            "adapter": f"{type(adapter).__module__}:{type(adapter).__qualname__}",
+            "source_token": adapter.data_token,
+            "validated": adapter.validated,
+            "columns": dict(),
+        }
+        offset = 0
+        for column_name, parts in columns.items():
+            manifest["columns"][column_name] = dict()
+            for part, array in parts.items():
+                manifest["columns"][column_name][part] = {
+                    "dtype": array.dtype.str,
+                    "shape": list(array.shape),
+                    "offset": offset,
+                }
+                offset += _aligned(array.nbytes)
+        encoded = json.dumps(manifest).encode()
+        data_start = _data_start(manifest)
+
+        with _locked(name):
+            segment = _open(name, create=True, size=max(data_start + offset, 1))
+            header = np.ndarray(3, dtype=np.int64, buffer=segment.buf)
+            header[:] = (1, 0, len(encoded))
+            segment.buf[_HEADER_BYTES : _HEADER_BYTES + len(encoded)] = encoded
+            for column_name, parts in columns.items():
+                for part, array in parts.items():
+                    start = data_start + manifest["columns"][column_name][part]["offset"]
+                    view = np.ndarray(array.shape, dtype=array.dtype, buffer=segment.buf, offset=start)
+                    view[...] = array
+                    del view
+            header[1] = 1
+            del header
+        return cls(segment, manifest)
+
+    @classmethod
+    def attach(cls, name: str):
+        """Attaches to the published segment `name`, raising `FileNotFoundError` if there is none.
+
+        Returns:
+            A new reference to the segment, which needs to be released once no longer used.
+        """
+        with _locked(name):
+            segment = _open(name)
+            header = np.ndarray(3, dtype=np.int64, buffer=segment.buf)
+            if header[1] != 1 or header[0] < 1:
+                del header
+                segment.close()
+                raise RuntimeError(f"Shared memory '{name}' has not been published completely, remove it via unlink.")
+            header[0] += 1
+            manifest = json.loads(bytes(segment.buf[_HEADER_BYTES : _HEADER_BYTES + int(header[2])]))
+            del header
+        return cls(segment, manifest)
+
+    @property
+    def name(self) -> str:
+        return self._segment.name
+
+    @property
+    def data(self) -> dict:
+        """Returns all columns as read-only views on the segment, as expected by `DataAdapter.from_data`."""
+        data = dict()
+        for column_name, parts in self.manifest["columns"].items():
+            views = dict()
+            for part, spec in parts.items():
+                views[part] = np.ndarray(
+                    spec["shape"],
+                    dtype=spec["dtype"],
+                    buffer=self._segment.buf,
+                    offset=self._data_start + spec["offset"],
+                )
+                views[part].setflags(write=False)
+            data[column_name] = RaggedArray(views["values"], views["offsets"]) if "offsets" in views else views["array"]
+        return data
+
+    def adapter(self) -> data_adapter.DataAdapter:
+        """Returns an adapter (of the published class) on the data of the segment.
+
+        The reference is handed over to the adapter, i.e. released as soon as the adapter is garbage collected. The
+        data is not validated again, the adapter is `validated` if the publisher has been.
+        """
+        module_name, class_name = self.manifest["adapter"].split(":")
+        adapter_class = getattr(importlib.import_module(module_name), class_name)
+        adapter = adapter_class.from_data(
+            self.data, source_token=self.manifest["source_token"], validated=self.manifest["validated"]
+        )
+        weakref.finalize(adapter, self.release)
+        return adapter
+
+    def release(self):
+        """Releases the reference, the segment is unlinked if it has been the last one.
+
+        Views on the segment stay valid until they are garbage collected. Processes forked from the one holding the
+        reference (e.g. dashboard workers) share it and never release it themselves.
+        """
+        if self._released or os.getpid() != self._pid:
+            return
+        self._released = True
+        with _locked(self.name):
+            header = np.ndarray(3, dtype=np.int64, buffer=self._segment.buf)
+            header[0] -= 1
+            last = header[0] == 0
+            del header
+            if last:
+                _unlink(self._segment)
+        with contextlib.suppress(BufferError):
+            # Fails as long as views on the segment exist, the mapping is then closed once they are gone.
+            self._segment.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.release()
+
+
+def segment_name(adapter_class, file_path: Path, **kwargs) -> str:
+    """Returns the name of the segment of the data of `adapter_class` for `file_path`, see `load_shared`."""
+    module = f"{adapter_class.__module__}.{adapter_class.__qualname__}"
+    return NAME_PREFIX + data_adapter.file_token(file_path, module, sorted(kwargs.items()))
+
+
+def load_shared(adapter_class, file_path: Path, load=None, **kwargs) -> data_adapter.DataAdapter:
+    """Returns the adapter for `file_path` on shared memory, loading and publishing the data if not yet done.
+
+    The segment is named after the input file (see `segment_name`), thus every process on the same machine loading
+    the same, unchanged file with the same adapter shares one copy of the data. The process publishing the data drops
+    its private copy right after.
+
+    Args:
+        adapter_class: The `DataAdapter` subclass to instantiate.
+        file_path: The input file as passed to the adapter.
+        load: Optional callable without arguments creating the adapter if the data is not yet published (e.g. via
+            `_columnar_cache.load_cached`), defaults to calling `adapter_class(file_path, **kwargs)`.
+        **kwargs: Further arguments passed to the constructor of `adapter_class`.
+    """
+    name = segment_name(adapter_class, file_path, **kwargs)
+    try:
+        return SharedDataset.attach(name).adapter()
+    except FileNotFoundError:
+        pass
+    except RuntimeError:
+        # Left behind by a publisher that crashed while publishing, thus replaced by publishing it again.
+        logger.warning("Replacing the incompletely published shared memory '%s'.", name)
+        _unlink_incomplete(name)
+    adapter = load() if load is not None else adapter_class(file_path, **kwargs)
+    try:
+        published = SharedDataset.publish(adapter, name)
+    except FileExistsError:
+        # Someone else has been faster publishing the very same data.
+        return SharedDataset.attach(name).adapter()
+    # The reference of the publisher is handed over to its adapter on the shared data.
+    return published.adapter()
+
+
+def unlink(name: str):
+    """Removes the segment `name` regardless of its references, e.g. after the publishing process crashed."""
+    with _locked(name):
+        with contextlib.suppress(FileNotFoundError):
+            segment = _open(name)
+            _unlink(segment)
+            segment.close()
+
+
+def _unlink_incomplete(name: str):
+    """Removes the segment `name` if it has not been published completely (checked under the lock, so that a segment
+    published completely in the meantime by another process is kept).
+    """
+    with _locked(name):
+        with contextlib.suppress(FileNotFoundError):
+            segment = _open(name)
+            header = np.ndarray(3, dtype=np.int64, buffer=segment.buf)
+            incomplete = header[1] != 1 or header[0] < 1
+            del header
+            if incomplete:
+                _unlink(segment)
+            segment.close()
+
+
+def _aligned(nbytes: int) -> int:
+    return -(-nbytes // _ALIGNMENT) * _ALIGNMENT
+
+
+def _data_start(manifest: dict) -> int:
+    return _aligned(_HEADER_BYTES + len(json.dumps(manifest).encode()))
+
+
+def _open(name: str, create: bool = False, size: int = 0) -> shared_memory.SharedMemory:
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name, create=create, size=size, track=False)
+    segment = shared_memory.SharedMemory(name, create=create, size=size)
+    # Before Python 3.13 every process opening a segment registers it with its resource tracker, which unlinks it when
+    # the process exits, even if others still use it (bpo-39959). Unlinking is done via the reference count instead.
+    resource_tracker.unregister(segment._name, "shared_memory")
+    return segment
+
+
+def _unlink(segment: shared_memory.SharedMemory):
+    if sys.version_info < (3, 13):
+        # `unlink` also unregisters the segment from the resource tracker, which `_open` has done already.
+        resource_tracker.register(segment._name, "shared_memory")
+    segment.unlink()
+
+
+@contextlib.contextmanager
+def _locked(name: str):
+    """Holds the (inter-process) lock of the header of segment `name`."""
+    # Imported here, so that importing this module (e.g. by the dashboard) also works on platforms without `fcntl`.
+    import fcntl
+
+    with open(Path(tempfile.gettempdir()) / f"{name.lstrip('/')}.lock", "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""Validation of the data of an adapter against its schema, so that a broken file fails on load rather than in a plot.
+
+The validation runs in two stages:
+
+- The skeleton of the raw file (its top-level keys and the first `SKELETON_ROWS` values of each column) is checked
+  against the json schema of the adapter via `jsonschema`, e.g. for missing columns or values of the wrong type.
+  Checking every value this way would take minutes for large files.
+- All values are checked column by column against the value rules of the adapter (see `RULES`), vectorized on the
+  columnar arrays and chunk by chunk via `DataAdapter.iter_chunks`, the chunks being checked in parallel. The columns
+  with one value per row (see `DataAdapter.table_columns`) need to have the same length.
+
+All violations are collected into one `SchemaError`, summarizing each rule with the number of offending rows and the
+first few of them.
+"""
+
+import concurrent.futures
+import os
+from typing import Optional
+
+import numpy as np
+
+from data_adapter._ragged_array import RaggedArray
+
+# Number of values per column checked against the json schema.
+SKELETON_ROWS = 16
+# Number of offending rows listed per violated rule.
+MAX_REPORTED_ROWS = 10
+
+# Value rules, each returning the mask of the offending values given the values and the parameter of the rule.
+RULES = {
+    "minimum": lambda values, minimum: values < minimum,
+    "maximum": lambda values, maximum: values > maximum,
+    "finite": lambda values, _: ~np.isfinite(values),
+}
+# Descriptions of the offending values for the summary, given the parameter of the rule.
+_DESCRIPTIONS = {
+    "minimum": "below {0}",
+    "maximum": "above {0}",
+    "finite": "not finite (NaN, null or infinite)",
+}
+
+
+class SchemaError(ValueError):
+    def __init__(self, source, violations: list):
+        """Error raised if data violates its schema.
+
+        Args:
+            source: Name of the validated data (e.g. the input file) for the message.
+            violations: List of violations, each a dictionary with the `column`, the `rule`, a `description`, the
+                number of offending rows (`count`, `None` if unknown) and the first of them (`rows`,
+                `MAX_REPORTED_ROWS` at most).
+        """
+        self.violations = violations
+        lines = [f"{source} violates the schema:"]
+        for v in violations:
+            rows = f", e.g. at rows {v['rows']}" if len(v["rows"]) > 0 else ""
+            count = f"{v['count']} row(s) " if v["count"] is not None else ""
+            lines.append(f"- {v['column']}: {count}{v['description']}{rows}")
+        super().__init__("\n".join(lines))
+
+
+def check_skeleton(raw_data: dict, schema: dict, source="data"):
+    """Checks the top-level keys and the first `SKELETON_ROWS` values of each column of `raw_data` against `schema`.
+
+    Args:
+        raw_data: The parsed json file.
+        schema: The json schema.
+        source: See `SchemaError`.
+    Raises:
+        SchemaError: Listing all violations of the schema.
+    """
+    import jsonschema
+
+    skeleton = {k: v[:SKELETON_ROWS] if isinstance(v, list) else v for k, v in raw_data.items()}
+    violations = list()
+    for error in sorted(jsonschema.Draft7Validator(schema).iter_errors(skeleton), key=lambda e: list(e.path)):
+        path = list(error.path)
+        violations.append(
+            {
+                "column": path[0] if path else "(file)",
+                "rule": error.validator,
+                "description": f"violates '{error.validator}': {error.message}",
+                "count": None,
+                "rows": path[1:2],
+            }
+        )
+    if violations:
+        raise SchemaError(source, violations)
+
+
+def check(adapter, rules: dict, source="data", max_workers: Optional[int] = None):
+    """Checks all values of `adapter` against `rules` chunk by chunk, the chunks being checked in parallel.
+
+    Args:
+        adapter: The data adapter.
+        rules: Mapping of column name to its rules, each a mapping of rule name (see `RULES`) to its parameter, e.g.
+            `{"significance": {"minimum": 0.0, "maximum": 1.0, "finite": True}}`. Ragged columns are checked on all
+            of their values, the offending rows being the rows these are part of.
+        source: See `SchemaError`.
+        max_workers: Maximum number of threads, defaults to the number of cores.
+    Raises:
+        SchemaError: Listing all violations of `rules` and columns of different lengths.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    counts = dict()
+    rows = dict()
+    lengths = dict()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = list()
+        for column in adapter.columns:
+            position = 0
+            for chunk in adapter.iter_chunks([column]):
+                values = chunk[column]
+                if column in rules:
+                    pending.append((column, executor.submit(_check_chunk, values, rules[column], position)))
+                position += len(values)
+                # Bounded, so that streaming adapters hold a few chunks only.
+                if len(pending) > 2 * max_workers:
+                    _collect(*pending.pop(0), counts, rows)
+            lengths[column] = position
+        for column, future in pending:
+            _collect(column, future, counts, rows)
+
+    violations = list()
+    table_columns = [c for c in adapter.table_columns if c in lengths]
+    for column in table_columns[1:]:
+        if lengths[column] != lengths[table_columns[0]]:
+            difference = lengths[column] - lengths[table_columns[0]]
+            violations.append(
+                {
+                    "column": column,
+                    "rule": "length",
+                    "description": f"{'more' if difference > 0 else 'less'} than in '{table_columns[0]}' "
+                    f"({lengths[column]} instead of {lengths[table_columns[0]]} rows)",
+                    "count": abs(difference),
+                    "rows": list(),
+                }
+            )
+    for column, rule in sorted(counts):
+        violations.append(
+            {
+                "column": column,
+                "rule": rule,
+                "description": _DESCRIPTIONS[rule].format(rules[column][rule]),
+                "count": counts[column, rule],
+                "rows": rows[column, rule],
+            }
+        )
+    if violations:
+        raise SchemaError(source, violations)
+
+
+def _check_chunk(values, column_rules: dict, position: int) -> dict:
+    """Returns the number of offending rows and the first of them (shifted by `position`) per violated rule."""
+    flat = values.flat if isinstance(values, RaggedArray) else values
+    result = dict()
+    for rule, parameter in column_rules.items():
+        offending = np.flatnonzero(RULES[rule](flat, parameter))
+        if len(offending) == 0:
+            continue
+        if isinstance(values, RaggedArray):
+            # Offsets of slices do not necessarily start at zero, see `RaggedArray`.
+            offending = np.unique(np.searchsorted(values.offsets, offending + values.offsets[0], side="right") - 1)
+        result[rule] = (len(offending), (position + offending[:MAX_REPORTED_ROWS]).tolist())
+    return result
+
+
+def _collect(column, future, counts: dict, rows: dict):
+    """Adds the result of `_check_chunk` to the totals, the chunks of a column being collected in order."""
+    for rule, (count, first_rows) in future.result().items():
+        key = (column, rule)
+        counts[key] = counts.get(key, 0) + count
+        rows[key] = (rows.get(key, list()) + first_rows)[:MAX_REPORTED_ROWS]
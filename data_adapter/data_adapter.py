@@ -1,9 +1,65 @@
 #!/usr/bin/env python3
 
 import abc
+import hashlib
+import threading
+import typing
+import uuid
+from pathlib import Path
+
+from data_adapter import _filter
+from data_adapter import _validation
+
+if typing.TYPE_CHECKING:
+    # Pandas is only imported once a data frame is built, since importing it takes a while.
+    import pandas as pd
+
+
+# Default number of rows per chunk for the chunk-wise iteration via `DataAdapter.iter_chunks`.
+DEFAULT_CHUNK_SIZE = 1 << 20
 
 
 class DataAdapter(abc.ABC):
+    # Rules the values of each column have to follow, checked by `validate`, see `_validation.check`.
+    VALUE_RULES: typing.ClassVar[dict] = dict()
+
+    def __init__(self, source_token: typing.Optional[str] = None):
+        """Base class constructor setting up the cache for derived data (e.g. data frames).
+
+        Derived data is built once on first access via `cached` and then shared by every consumer
+        (i.e. all evaluations). Whenever the underlying data changes `invalidate` has to be called.
+
+        Args:
+            source_token: Optional string identifying the source of the data (e.g. via `file_token`), which stays the
+                same across processes. If not given, a random one is used.
+        """
+        self._cache = dict()
+        self._cache_lock = threading.RLock()
+        self._build_locks = dict()
+        self._data_version = 0
+        self._source_token = source_token or uuid.uuid4().hex
+        self._validated = False
+
+    @classmethod
+    def from_data(cls, data: dict, source_token: typing.Optional[str] = None, validated: bool = False):
+        """Creates an adapter from already loaded data (e.g. from the columnar cache), bypassing the file reading.
+
+        The default implementation assumes that the subclass holds all of its data in `self._data` (which is
+        returned by `data`) and keeps everything else as class attributes. Subclasses deviating from that need
+        to override this method.
+
+        Args:
+            data: Mapping of column name to array (or `RaggedArray` for ragged columns), as returned by `data`.
+            source_token: See constructor.
+            validated: Whether `data` has been checked via `validate` already (e.g. before it has been cached), see
+                `validated`. The data is not checked again.
+        """
+        adapter = cls.__new__(cls)
+        DataAdapter.__init__(adapter, source_token)
+        adapter._data = data
+        adapter._validated = validated
+        return adapter
+
     @property
     @abc.abstractmethod
     def data(self):
@@ -13,3 +69,173 @@ class DataAdapter(abc.ABC):
             The data as read from file.
         """
         pass
+
+    @property
+    def columns(self) -> list:
+        """Returns the names of the columns in `data`."""
+        return list(self.data)
+
+    @property
+    def table_columns(self) -> list:
+        """Returns the names of the columns with one value per row, i.e. the ones filtered by `filtered`.
+
+        By default these are all columns with as many rows as the first one, subclasses knowing their schema should
+        override this method.
+        """
+        columns = self.columns
+        return [c for c in columns if len(self.data[c]) == len(self.data[columns[0]])]
+
+    @property
+    def point_dimensions(self) -> typing.Optional[int]:
+        """Returns the number of coordinates per point within the rows of `points`, which hold the coordinates of their
+        points interleaved (e.g. `x0, y0, x1, y1, ...` for 2), `None` if the adapter declares no such layout.
+
+        Evaluations of the points as coordinates (e.g. the reflex point density) are only available if declared.
+        """
+        return None
+
+    @property
+    def nbytes(self) -> int:
+        """Returns the memory footprint of the data held by the adapter in bytes.
+
+        Only the (NumPy) buffers of the columns in `data` are counted, the (small) Python objects around
+        them are neglected.
+        """
+        return sum(column.nbytes for column in self.data.values())
+
+    @property
+    def in_memory(self) -> bool:
+        """Returns whether `data` is held in memory, otherwise consumers should prefer `iter_chunks`."""
+        return True
+
+    @property
+    def validated(self) -> bool:
+        """Returns whether the data has passed `validate`, e.g. on construction."""
+        return self._validated
+
+    @property
+    def data_version(self) -> int:
+        """Returns a counter that is increased every time the underlying data changes."""
+        return self._data_version
+
+    @property
+    def data_token(self) -> str:
+        """Returns a string identifying the current data, changing whenever the data changes.
+
+        Results derived from the data (e.g. figures) can be cached under this token, also across processes if the
+        adapter has been constructed with a `source_token`.
+        """
+        return f"{self._source_token}:{self._data_version}"
+
+    def cached(self, key, builder):
+        """Returns the derived object stored under `key`, building it via `builder` on first access.
+
+        Concurrent requests of the same key wait for a single build, while different keys are built in parallel.
+
+        Args:
+            key: Hashable key identifying the derived object.
+            builder: Callable without arguments creating the derived object.
+        Returns:
+            The cached object. Note that it is shared, thus consumers must not modify it in place.
+        """
+        with self._cache_lock:
+            if key in self._cache:
+                return self._cache[key]
+            build_lock = self._build_locks.setdefault(key, threading.Lock())
+        with build_lock:
+            with self._cache_lock:
+                if key in self._cache:
+                    return self._cache[key]
+                data_version = self._data_version
+            value = builder()
+            with self._cache_lock:
+                # Objects built from data that has changed in the meantime are outdated already.
+                if data_version == self._data_version:
+                    self._cache[key] = value
+                    self._build_locks.pop(key, None)
+            return value
+
+    def clear_cache(self):
+        """Drops all cached derived objects, they will be re-built on next access."""
+        with self._cache_lock:
+            self._cache.clear()
+
+    def invalidate(self):
+        """Marks the underlying data as changed, i.e. drops the cache and increases `data_version`."""
+        with self._cache_lock:
+            self._data_version += 1
+            self._cache.clear()
+
+    def frame(self, columns) -> "pd.DataFrame":
+        """Returns a (cached) data frame holding the given columns of `data`.
+
+        The frame does not copy the column arrays but holds views on them.
+
+        Args:
+            columns: Iterable of column names in `data`.
+        """
+        import pandas as pd
+
+        columns = tuple(columns)
+        return self.cached(
+            ("frame", columns),
+            lambda: pd.DataFrame({c: self.data[c] for c in columns}, copy=False),
+        )
+
+    def filtered(self, selection) -> "DataAdapter":
+        """Returns an adapter on the rows within `selection`, e.g. `[("timestamp", start, end)]`, see `_filter`.
+
+        Only the `table_columns` are filtered. The rows are computed once per selection and the resulting adapter is
+        cached, thus all consumers share it and the data derived from it. An empty selection returns this adapter
+        itself.
+
+        Args:
+            selection: Sequence of conditions `(column, low, high)`, all of which need to hold for a row.
+        """
+        return _filter.filtered(self, selection)
+
+    def validate(self, source="data", max_workers: typing.Optional[int] = None):
+        """Checks all values against `VALUE_RULES` and that all `table_columns` have the same length.
+
+        The checks are vectorized and run chunk by chunk (via `iter_chunks`) in parallel, see `_validation.check`.
+        Adapters created via `from_data` (e.g. from the columnar cache or shared memory) are not checked on creation,
+        `validated` tells whether their data has been checked before.
+
+        Args:
+            source: Name of the data (e.g. the input file) for the error message.
+            max_workers: Maximum number of threads, defaults to the number of cores.
+        Raises:
+            _validation.SchemaError: Summarizing all violations with the first offending rows.
+        """
+        _validation.check(self, self.VALUE_RULES, source, max_workers)
+        self._validated = True
+
+    def iter_chunks(self, columns, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        """Iterates chunk-wise over the given columns of `data`.
+
+        The default implementation yields (zero-copy) slices of the columns held in memory. Adapters for data that
+        does not fit into memory override this method to read the chunks incrementally, thus evaluations using it
+        work with a memory ceiling of roughly one chunk.
+
+        Args:
+            columns: Iterable of column names in `data`, all of them need to have the same length.
+            chunk_size: The (maximum) number of rows per chunk.
+        Yields:
+            Dictionaries of column name to the chunk of that column.
+        """
+        columns = list(columns)
+        length = len(self.data[columns[0]])
+        for start in range(0, length, chunk_size):
+            yield {c: self.data[c][start : start + chunk_size] for c in columns}
+
+
+def file_token(file_path: Path, *options) -> str:
+    """Returns a token identifying the content of `file_path` by its resolved path, size and modification time.
+
+    Args:
+        file_path: The input file.
+        *options: Further (representable) options changing the data read from the file, e.g. dtypes.
+    """
+    file_path = Path(file_path).resolve()
+    stat = file_path.stat()
+    return hashlib.sha1(f"{file_path}:{stat.st_size}:{stat.st_mtime_ns}:{options!r}".encode()).hexdigest()[:16]
@@ -1,55 +1,142 @@
 #!/usr/bin/env python3
 
-import pandas as pd
 from pathlib import Path
 import json
+import typing
 
+import numpy as np
+
+from data_adapter import _validation
 from data_adapter import data_adapter
+from data_adapter._ragged_array import RaggedArray
+
+if typing.TYPE_CHECKING:
+    import pandas as pd
 
 
 class DummyJsonDataAdapter(data_adapter.DataAdapter):
-    def __init__(self, file_path: Path):
+    # The dtypes every column is stored with, unless overridden via the constructor. For `points` the
+    # dtype applies to the (flat) values of all samples.
+    DEFAULT_DTYPES: typing.ClassVar[dict] = {
+        "timestamp": np.int64,
+        "echo_distance": np.float32,
+        "significance": np.float32,
+        "amplitude": np.float32,
+        "points": np.float32,
+    }
+
+    # Json schema of the file, checked on its first values only (see `_validation.check_skeleton`).
+    SCHEMA: typing.ClassVar[dict] = {
+        "type": "object",
+        "required": ["timestamp", "echo_distance", "significance", "amplitude", "points"],
+        "properties": {
+            "timestamp": {"type": "array", "items": {"type": "integer"}},
+            "echo_distance": {"type": "array", "items": {"type": "number"}},
+            "significance": {"type": "array", "items": {"type": "number"}},
+            "amplitude": {"type": "array", "items": {"type": "number"}},
+            "points": {"type": "array", "items": {"type": "array", "items": {"type": "number"}}},
+        },
+    }
+    # All values are checked against these rules, see `DataAdapter.validate`. Out-of-sequence timestamps are valid,
+    # they are reported by the timestamps evaluation.
+    VALUE_RULES: typing.ClassVar[dict] = {
+        "timestamp": {"minimum": 0},
+        "echo_distance": {"finite": True, "minimum": 0.0},
+        "significance": {"finite": True, "minimum": 0.0, "maximum": 1.0},
+        "amplitude": {"finite": True},
+        "points": {"finite": True},
+    }
+
+    _columns: typing.ClassVar[list] = [
+        "timestamp",
+        "echo_distance",
+        "significance",
+        "amplitude",
+        "points",
+    ]
+    _name = "Dummy Data"
+
+    def __init__(self, file_path: Path, dtypes: typing.Optional[dict] = None, validate: bool = True):
         """Example Json Data Adapter. This is just a toy example.
         More complex data structures might be better of divided into a dedicated
         reader and a data adapter. For this example, reading is simply a one-liner
         thus it doesn't make sense to overcomplicate things here.
         Also the 'adapter' part, is just to provide class properties for the data access.
+
+        Every column is converted once into a contiguous (typed) NumPy array, the parsed Python lists are
+        dropped right after the conversion.
+
+        Args:
+            file_path: Path to the json file to read.
+            dtypes: Optional mapping of column name to dtype, overriding the entries in `DEFAULT_DTYPES`.
+            validate: Whether to check the data against `SCHEMA` and `VALUE_RULES`, raising a
+                `_validation.SchemaError` on violations.
         """
         assert file_path.is_file()
+        super().__init__(data_adapter.file_token(file_path, dtypes))
         with open(file_path) as jf:
-            self._data = json.load(jf)
-
-        self._columns = [
-            "timestamp",
-            "echo_distance",
-            "significance",
-            "amplitude",
-            "points",
-        ]
-        self._name = "Dummy Data"
-        assert all([e in self._data for e in self._columns])
+            raw_data = json.load(jf)
+
+        if validate:
+            _validation.check_skeleton(raw_data, self.SCHEMA, source=file_path)
+        assert all([e in raw_data for e in self._columns])
+
+        dtypes = {**self.DEFAULT_DTYPES, **(dtypes or dict())}
+        self._data = dict()
+        for column in self._columns:
+            # Pop the raw lists one by one, so that at most one column is held twice at any time.
+            values = raw_data.pop(column)
+            if column == "points":
+                self._data[column] = _read_only_rows(RaggedArray.from_rows(values, dtype=dtypes[column]))
+            else:
+                self._data[column] = _read_only(np.asarray(values, dtype=dtypes[column]))
+            del values
+        if validate:
+            self.validate(source=file_path)
 
     @property
     def data(self) -> dict:
-        """Returns all the data.t"""
+        """Returns all the data."""
         return self._data
 
     @property
-    def timestamps(self, numpy=False):
+    def timestamps(self) -> np.ndarray:
         """Returns the timestamps (of the respective echo)."""
-        return self._data["timestamp"]
+        return self.data["timestamp"]
 
     @property
-    def echoes(self):
-        """Returns the raw echoes."""
-        tmp = {
-            "echo_distance": self._data["echo_distance"],
-            "significance": self._data["significance"],
-            "amplitude": self._data["amplitude"],
-        }
-        return pd.DataFrame(tmp)
+    def echo_columns(self) -> list:
+        """Returns the names of the columns in `echoes`."""
+        return ["echo_distance", "significance", "amplitude"]
 
     @property
-    def points(self):
-        "Returns the points laterated out of the raw echoes."
-        return self._data["points"]
+    def table_columns(self) -> list:
+        """Returns the columns with one value per echo, i.e. all but `points` (one row per sample)."""
+        return ["timestamp"] + self.echo_columns
+
+    @property
+    def echoes(self) -> "pd.DataFrame":
+        """Returns the raw echoes. The frame is built once and shared, thus must not be modified in place."""
+        return self.frame(self.echo_columns)
+
+    @property
+    def points(self) -> RaggedArray:
+        "Returns the points laterated out of the raw echoes, one row per sample."
+        return self.data["points"]
+
+    @property
+    def point_dimensions(self) -> int:
+        """Returns 2, each row of `points` holds the interleaved x and y coordinates of the points of its sample."""
+        return 2
+
+
+def _read_only(array: np.ndarray) -> np.ndarray:
+    # The arrays are shared by all consumers (e.g. cached data frames), so accidental in place changes are refused.
+    array.setflags(write=False)
+    return array
+
+
+def _read_only_rows(rows: RaggedArray) -> RaggedArray:
+    _read_only(rows.values)
+    _read_only(rows.offsets)
+    return rows
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+
+import contextlib
+import re
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from data_adapter import data_adapter
+from data_adapter._ragged_array import RaggedArray
+from data_adapter.dummy_json_data_adapter import DummyJsonDataAdapter, _read_only, _read_only_rows
+
+_NON_WHITESPACE = re.compile(rb"\S")
+_BRACKETS = re.compile(rb"[\[\]]")
+
+
+class StreamingJsonDataAdapter(DummyJsonDataAdapter):
+    # Number of bytes read from file at once.
+    BLOCK_SIZE = 1 << 22
+
+    def __init__(self, file_path: Path, dtypes: Optional[dict] = None, validate: bool = False):
+        """Json Data Adapter for the same schema as `DummyJsonDataAdapter` but for files larger than memory.
+
+        The constructor only scans the file once to find where each column starts. The data itself is parsed
+        incrementally, chunk by chunk, when iterating via `iter_chunks`. Accessing `data` (or any property based on
+        it) still loads the whole file, thus evaluations meant to work on large files should use `iter_chunks` only.
+
+        Args:
+            file_path: Path to the json file to read.
+            dtypes: Optional mapping of column name to dtype, overriding the entries in `DEFAULT_DTYPES`.
+            validate: Whether to check all values against `VALUE_RULES` right away, raising a `_validation.SchemaError`
+                on violations. Off by default, since it takes an extra pass parsing the whole file before any
+                evaluation runs (see `DataAdapter.validate` to check later). The types of the values are checked by
+                parsing already.
+        """
+        assert file_path.is_file()
+        data_adapter.DataAdapter.__init__(self, data_adapter.file_token(file_path, dtypes))
+
+        self._file_path = file_path
+        self._dtypes = {**self.DEFAULT_DTYPES, **(dtypes or dict())}
+        self._data = None
+        with open(file_path, "rb") as jf:
+            self._column_offsets = _index_columns(_Scanner(jf, 0, self.BLOCK_SIZE))
+        assert all([e in self._column_offsets for e in self._columns])
+        if validate:
+            self.validate(source=file_path)
+
+    @property
+    def data(self) -> dict:
+        """Returns all the data, reading the whole file on first access."""
+        if self._data is None:
+            loaded = dict()
+            for column in self._columns:
+                chunks = [chunk[column] for chunk in self.iter_chunks([column])]
+                if column == "points":
+                    points = _join(chunks, ragged=True) if chunks else RaggedArray.from_rows([], self._dtypes[column])
+                    loaded[column] = _read_only_rows(points)
+                elif len(chunks) > 0:
+                    loaded[column] = _read_only(np.concatenate(chunks))
+                else:
+                    loaded[column] = _read_only(np.empty(0, dtype=self._dtypes[column]))
+            self._data = loaded
+        return self._data
+
+    @property
+    def columns(self) -> list:
+        """Returns the names of the columns, without loading them."""
+        return list(self._columns)
+
+    @property
+    def in_memory(self) -> bool:
+        """Returns whether the whole data has been loaded already (i.e. via `data`)."""
+        return self._data is not None
+
+    @property
+    def nbytes(self) -> int:
+        """Returns the memory footprint of the data loaded so far in bytes, i.e. zero as long as only streaming."""
+        if self._data is None:
+            return 0
+        return super().nbytes
+
+    def iter_chunks(self, columns, chunk_size: int = data_adapter.DEFAULT_CHUNK_SIZE):
+        """Iterates chunk-wise over the given columns, reading them incrementally from file.
+
+        At most `chunk_size` rows plus one block of raw bytes per column are held in memory at any time. If the
+        whole data has been loaded already (i.e. via `data`), the chunks are slices of it instead.
+
+        Args:
+            columns: Iterable of column names, all of them need to have the same length.
+            chunk_size: The (maximum) number of rows per chunk.
+        Yields:
+            Dictionaries of column name to the chunk of that column.
+        """
+        if self._data is not None:
+            yield from super().iter_chunks(columns, chunk_size)
+            return
+
+        columns = list(columns)
+        # One file per column, all of them are closed once the iteration ends (or is abandoned).
+        with contextlib.ExitStack() as files:
+            readers = [
+                _rechunk(
+                    self._iter_column(column, files.enter_context(open(self._file_path, "rb"))),
+                    chunk_size,
+                    ragged=column == "points",
+                )
+                for column in columns
+            ]
+            for chunks in zip(*readers):
+                yield dict(zip(columns, chunks))
+
+    def _iter_column(self, column, jf):
+        scanner = _Scanner(jf, self._column_offsets[column], self.BLOCK_SIZE)
+        if column == "points":
+            return _iter_nested_array(scanner, self._dtypes[column])
+        return _iter_flat_array(scanner, self._dtypes[column])
+
+
+class _Scanner:
+    """Minimal buffered reader for scanning through json files of (nested) arrays of numbers."""
+
+    def __init__(self, file, offset: int, block_size: int):
+        file.seek(offset)
+        self._file = file
+        self.block_size = block_size
+        self._buffer = b""
+        self._position = 0
+        self._offset = offset
+
+    def tell(self) -> int:
+        return self._offset + self._position
+
+    def fill(self) -> bool:
+        """Appends the next block of the file to the (not yet consumed part of the) buffer."""
+        block = self._file.read(self.block_size)
+        if not block:
+            return False
+        self._offset += self._position
+        self._buffer = self._buffer[self._position :] + block
+        self._position = 0
+        return True
+
+    def peek(self) -> bytes:
+        """Skips all whitespace and returns the next character without consuming it, empty at end of file."""
+        while True:
+            match = _NON_WHITESPACE.search(self._buffer, self._position)
+            if match:
+                self._position = match.start()
+                return self._buffer[self._position : self._position + 1]
+            self._position = len(self._buffer)
+            if not self.fill():
+                return b""
+
+    def consume(self, expected: bytes):
+        character = self.peek()
+        if character != expected:
+            raise ValueError(f"Expected {expected!r} at byte {self.tell()}, got {character!r}.")
+        self._position += 1
+
+    def read_until(self, terminator: bytes, at_most: Optional[int] = None):
+        """Consumes and returns everything up to (excluding) `terminator`, which is consumed as well.
+
+        If `at_most` is given and the terminator is not within the buffer, the longest buffered part up to and
+        excluding the last comma is returned instead (consuming the comma), as long as it is longer than
+        `at_most` bytes. This allows processing arrays which are longer than the buffer.
+
+        Returns:
+            Tuple of the text read and whether the terminator has been reached.
+        """
+        while True:
+            end = self._buffer.find(terminator, self._position)
+            if end >= 0:
+                text = self._buffer[self._position : end]
+                self._position = end + len(terminator)
+                return text, True
+            if at_most is not None and len(self._buffer) - self._position > at_most:
+                cut = self._buffer.rfind(b",", self._position)
+                if cut > self._position:
+                    text = self._buffer[self._position : cut]
+                    self._position = cut + 1
+                    return text, False
+            if not self.fill():
+                raise ValueError(f"Unexpected end of file, expected {terminator!r}.")
+
+    def skip_array(self):
+        self.consume(b"[")
+        depth = 1
+        while True:
+            for match in _BRACKETS.finditer(self._buffer, self._position):
+                depth += 1 if match.group() == b"[" else -1
+                if depth == 0:
+                    self._position = match.end()
+                    return
+            self._position = len(self._buffer)
+            if not self.fill():
+                raise ValueError("Unexpected end of file within array.")
+
+
+def _index_columns(scanner: _Scanner) -> dict:
+    """Returns the byte offset of the (array) value of each key in the top-level object."""
+    offsets = dict()
+    scanner.consume(b"{")
+    while True:
+        character = scanner.peek()
+        if character == b"}":
+            return offsets
+        if character == b",":
+            scanner.consume(b",")
+            continue
+        scanner.consume(b'"')
+        key = scanner.read_until(b'"')[0].decode()
+        scanner.consume(b":")
+        scanner.peek()
+        offsets[key] = scanner.tell()
+        scanner.skip_array()
+
+
+def _parse_numbers(text: bytes, dtype) -> np.ndarray:
+    if not text.strip():
+        return np.empty(0, dtype=dtype)
+    values = np.fromstring(text, dtype=dtype, sep=",")
+    if len(values) != text.count(b",") + 1:
+        raise ValueError(f"Could not parse numbers (as {np.dtype(dtype)}) from '{text[:64]!r}...'.")
+    return values
+
+
+def _iter_flat_array(scanner: _Scanner, dtype):
+    """Yields consecutive parts of a flat array of numbers, each limited to about one block of text."""
+    scanner.consume(b"[")
+    terminated = False
+    while not terminated:
+        text, terminated = scanner.read_until(b"]", at_most=scanner.block_size // 2)
+        values = _parse_numbers(text, dtype)
+        if len(values) > 0:
+            yield values
+
+
+def _iter_nested_array(scanner: _Scanner, dtype):
+    """Yields consecutive parts of an array of arrays of numbers as `RaggedArray`."""
+    scanner.consume(b"[")
+    samples = list()
+    while True:
+        character = scanner.peek()
+        if character == b"]":
+            scanner.consume(b"]")
+            break
+        if character == b",":
+            scanner.consume(b",")
+            continue
+        scanner.consume(b"[")
+        samples.append(_parse_numbers(scanner.read_until(b"]")[0], dtype))
+        if len(samples) >= 1024:
+            yield _to_ragged(samples, dtype)
+            samples = list()
+    if samples:
+        yield _to_ragged(samples, dtype)
+
+
+def _to_ragged(samples, dtype) -> RaggedArray:
+    offsets = np.zeros(len(samples) + 1, dtype=np.int64)
+    np.cumsum([len(s) for s in samples], out=offsets[1:])
+    return RaggedArray(np.concatenate(samples).astype(dtype, copy=False), offsets)
+
+
+def _rechunk(parts, chunk_size: int, ragged: bool):
+    """Combines the arbitrarily sized `parts` of a column into chunks of exactly `chunk_size` rows (but the last)."""
+    pending = list()
+    pending_length = 0
+    for part in parts:
+        pending.append(part)
+        pending_length += len(part)
+        while pending_length >= chunk_size:
+            joined = _join(pending, ragged)
+            yield joined[:chunk_size]
+            pending = [joined[chunk_size:]]
+            pending_length -= chunk_size
+    if pending_length > 0:
+        yield _join(pending, ragged)
+
+
+def _join(parts, ragged: bool):
+    if ragged:
+        return RaggedArray.concatenate(parts)
+    return np.concatenate(parts)
@@ -5,24 +5,50 @@ import dash
 from dash import dcc
 from dash import html
 import glob
-import importlib
-import inspect
+import logging
 import os
 from pathlib import Path
+import tempfile
 
-from evaluation_semantics.base import EvaluationSemanticsBase
+from data_adapter._adapter_pool import AdapterPool
+from data_adapter._columnar_cache import load_cached
+from data_adapter._shared_memory import load_shared
+from evaluation_semantics import _metrics
+from evaluation_semantics import _payload
+from evaluation_semantics import _cross_filter
+from evaluation_semantics import _recordings
+from evaluation_semantics import _registry
+from evaluation_semantics import _serving
+from evaluation_semantics import base
 
 
 def available_data_adapters():
-    folder = Path(__file__).parent / "data_adapter"
-    adapters = {}
-    files = folder.glob("*.py")
-    for file in files:
-        if file.name.startswith("_") or file.name == "data_adapter.py":
-            continue
-        class_name = file.stem.title().replace("_", "")
-        adapters[class_name] = file.stem
-    return adapters
+    # Only the names, the modules are imported once an adapter gets loaded.
+    return _registry.available_data_adapters()
+
+
+def load_adapter(data_adapter, input_file, cache_directory=None, shared_memory=False):
+    """Instantiates the data adapter named `data_adapter` (see `available_data_adapters`) for `input_file`.
+
+    Args:
+        data_adapter: Class name of the data adapter.
+        input_file: Input file to evaluate.
+        cache_directory: Optional directory of the columnar cache, see `data_adapter._columnar_cache.load_cached`.
+        shared_memory: Whether to share the data with all other processes loading the same file, see
+            `data_adapter._shared_memory.load_shared`.
+    """
+    # Dynamically import import the adapters (i.e. this code does not need to be changed, when
+    # adding a new DataAdapter implementation for another data source.
+    imported_class = available_data_adapters()[data_adapter].load()
+
+    def _load():
+        if cache_directory is None:
+            return imported_class(input_file)  # Instantiate the adapter here.
+        return load_cached(imported_class, input_file, cache_directory)
+
+    if shared_memory:
+        return load_shared(imported_class, input_file, _load)
+    return _load()
 
 
 def _parse_args():
@@ -47,56 +73,188 @@ def _parse_args():
         required=True,
         help="Data Adapter to use.",
     )
+    parser.add_argument(
+        "--recordings",
+        nargs="+",
+        default=list(),
+        help="Glob patterns (e.g. 'data/**/*.json') of further input files, which can be switched to at runtime. "
+        "Loaded files are kept in a pool, see --recording_pool_megabytes.",
+    )
+    parser.add_argument(
+        "--recording_pool_megabytes",
+        type=int,
+        default=None,
+        help="With --recordings, the memory budget of the loaded files, the least recently used ones are evicted "
+        "beyond it. Defaults to half of the physical memory.",
+    )
     parser.add_argument(
         "-p",
         "--port",
+        type=int,
         default=8050,
         help="The port to be used by the dashboard.",
     )
+    parser.add_argument(
+        "--host",
+        default="127.0.0.1",
+        help="The host (interface) to listen on, e.g. 0.0.0.0 to serve other machines.",
+    )
+    parser.add_argument(
+        "--production",
+        action="store_true",
+        help="Serve by preforked worker processes (gunicorn if installed) with debug off instead of the development "
+        "server. The data is loaded (and warmed up with --warmup) once before forking and shared by all workers.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count(),
+        help="With --production, the number of worker processes, defaults to the number of CPUs.",
+    )
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=4,
+        help="With --production, the number of threads handling requests per worker.",
+    )
+    parser.add_argument(
+        "-c",
+        "--cache_directory",
+        type=Path,
+        default=None,
+        help="Optional directory for the columnar cache of input files. "
+        "If given, the input file is only parsed on first use and memory-mapped afterwards.",
+    )
+    parser.add_argument(
+        "--shared_memory",
+        action="store_true",
+        help="Share the data via shared memory with all other processes (dashboards, batch reports, notebooks) "
+        "loading the same file, only the first one parses it.",
+    )
+    parser.add_argument(
+        "--figure_cache_entries",
+        type=int,
+        default=64,
+        help="Maximum number of evaluation results (figures) held in memory.",
+    )
+    parser.add_argument(
+        "--figure_cache_megabytes",
+        type=int,
+        default=256,
+        help="Maximum size of all evaluation results (figures) held in memory, in serialized form.",
+    )
+    parser.add_argument(
+        "--figure_cache_directory",
+        type=Path,
+        default=None,
+        help="Optional directory to keep the serialized evaluation results (figures) across restarts.",
+    )
+    parser.add_argument(
+        "--background",
+        action="store_true",
+        help="Compute the figures as background jobs in local processes, showing their progress. "
+        "Requires `diskcache` (`pip install dash[diskcache]`). Filtering by a range selected in a plot is not "
+        "available then.",
+    )
+    parser.add_argument(
+        "--background_cache_directory",
+        type=Path,
+        default=Path(tempfile.gettempdir()) / "evaluation_dashboard_jobs",
+        help="Directory of the disk cache used by the background jobs.",
+    )
+    parser.add_argument(
+        "--warmup",
+        action="store_true",
+        help="Compute all evaluations concurrently at startup, so that they are served from the figure cache.",
+    )
+    parser.add_argument(
+        "--warmup_workers",
+        type=int,
+        default=None,
+        help="Number of threads used by --warmup, defaults to the one of `concurrent.futures.ThreadPoolExecutor`.",
+    )
+    parser.add_argument(
+        "--plain_json",
+        action="store_true",
+        help="Send the arrays of the figures as plain json lists instead of typed arrays (e.g. to inspect them).",
+    )
+    parser.add_argument(
+        "--compression_threshold",
+        type=int,
+        default=_payload.MIN_COMPRESSED_BYTES,
+        help="Minimum size in bytes of responses compressed with brotli (if installed) or gzip, negative to disable.",
+    )
+    parser.add_argument(
+        "--metrics",
+        action="store_true",
+        help="Record the performance of all evaluations and callbacks, exposed as Prometheus text on `/metrics`. "
+        "This includes the payload sizes of the evaluations with and without typed arrays and compression.",
+    )
+    parser.add_argument(
+        "--trace_memory",
+        action="store_true",
+        help="With --metrics, also record the peak memory of the evaluations (slows down allocations).",
+    )
+    parser.add_argument(
+        "--performance_panel",
+        action="store_true",
+        help="With --metrics, add a (collapsed) panel showing the metrics to the dashboard.",
+    )
     return parser.parse_args()
 
 
-def get_all_available_evaluations():
-    # Dynamically loading all available evaluations
-    EVALUATIONS_DIRECTORY_NAME = "evaluation_semantics"
-    evaluations_directory = Path(__file__).parent / EVALUATIONS_DIRECTORY_NAME
-    files = glob.glob(str(evaluations_directory / "*.py"))
-    module_names = [os.path.splitext(os.path.basename(module))[0] for module in files]
-    evaluations = list()
-    for module_name in module_names:
-        # Ignoring 'private' modules and the `base` module.
-        if module_name.startswith("_") or "base" in module_name:
-            continue
-
-        # Importing like 'import evaluation_semantics.measurement_count'
-        module = importlib.import_module(f"{EVALUATIONS_DIRECTORY_NAME}.{module_name}")
+def get_all_available_evaluations(adapter, mode="dashboard", names=None):
+    """Instantiates the available evaluations (see `_registry.available_evaluations`) for `adapter`.
 
-        # Filter out all members which are not sub classes of EvaluationSemanticsBase.
-        for _, member_type in inspect.getmembers(module):
-            if not inspect.isclass(member_type):
-                continue
-            if not issubclass(member_type, EvaluationSemanticsBase):
-                continue
-            evaluations.append(member_type(adapter, mode="dashboard"))
-    return evaluations
+    Args:
+        adapter: The data adapter.
+        mode: Mode of the evaluations, either 'dashboard' or 'notebook'.
+        names: Optional names of the evaluations to instantiate, all if `None`. Only their modules are imported.
+    """
+    # Dynamically loading the available evaluations, heavy dependencies are only imported once they are computed.
+    entries = _registry.available_evaluations()
+    return [entries[name].load()(adapter, mode=mode) for name in (names or entries)]
 
 
 if __name__ == "__main__":
     args = _parse_args()
 
-    # Dynamically import import the adapters (i.e. this code does not need to be changed, when
-    # adding a new DataAdapter implementation for another data source.
-    adapters = available_data_adapters()
-    module_name = adapters[args.data_adapter]
-    imported_module = importlib.import_module(f"data_adapter.{module_name}")
-    imported_class = getattr(imported_module, args.data_adapter)
-    adapter = imported_class(args.input_file)  # Instantiate the adapter here.
+    recordings = sorted(
+        {str(args.input_file)} | {f for pattern in args.recordings for f in glob.glob(pattern, recursive=True)}
+    )
+    if len(recordings) > 1:
+        if args.background:
+            raise SystemExit("--background does not support switching --recordings, the jobs only see the input file.")
+        pool = AdapterPool(
+            lambda f: load_adapter(args.data_adapter, Path(f), args.cache_directory, args.shared_memory),
+            max_bytes=args.recording_pool_megabytes << 20 if args.recording_pool_megabytes is not None else None,
+        )
+        adapter = _recordings.ActiveAdapter(pool, recordings, str(args.input_file))
+        pool.get(str(args.input_file))
+    else:
+        adapter = load_adapter(args.data_adapter, args.input_file, args.cache_directory, args.shared_memory)
 
-    all_available_evaluations = get_all_available_evaluations()
+    base.configure_figure_cache(
+        max_entries=args.figure_cache_entries,
+        max_bytes=args.figure_cache_megabytes << 20,
+        directory=args.figure_cache_directory,
+    )
+    base.configure_payloads(typed_arrays=not args.plain_json, report_sizes=args.metrics)
+    # Background jobs run in other processes, which do not see the selection of the request filtering the data.
+    filtered_adapter = _cross_filter.FilteredAdapter(adapter) if not args.background else None
+    all_available_evaluations = get_all_available_evaluations(filtered_adapter or adapter)
     evaluation_dropdown = [{"value": a.get_name(), "label": a.get_name()} for a in all_available_evaluations]
     html_container = list()
+    performance_container = list()
+    recording_container = list()
+    filter_container = list()
+    if isinstance(adapter, _recordings.ActiveAdapter):
+        _recordings.create_html(recording_container, adapter)
+    if filtered_adapter is not None:
+        _cross_filter.create_html(filter_container)
 
-    app = dash.Dash(__name__)
+    # Evaluations add components (e.g. graphs with own callbacks) only once they are selected.
+    app = dash.Dash(__name__, suppress_callback_exceptions=True)
     app.layout = html.Div(
         children=[
             html.Div(
@@ -110,12 +268,16 @@ if __name__ == "__main__":
                                 """This dashboard visualizes various fields of the data. It can be used to get
                                     an overall understanding of the measurements. """
                             ),
+                            html.Div(id="recording-container", children=recording_container),
                             html.P("Pick one or more evaluation options from the dropdown below."),
                             dcc.Dropdown(
                                 id="dropdown-selection-evaluation",
                                 multi=True,
                                 options=evaluation_dropdown,
                             ),
+                            html.Div(id="filter-container", children=filter_container),
+                            dcc.Store(id=base.SELECTION_STORE_ID),
+                            html.Div(id="performance-container", children=performance_container),
                         ],
                     ),
                     html.Div(
@@ -130,9 +292,40 @@ if __name__ == "__main__":
         ]
     )
 
+    manager = base.create_background_manager(args.background_cache_directory, adapter) if args.background else None
     for e in all_available_evaluations:
         # Please be aware the order of the following two method calls must not be changed.
         e.create_html(html_container)
         e.register(app)
+        if manager is not None:
+            e.create_background_html(html_container)
+            e.register_background(app, manager)
+    base.register_dispatcher(app, all_available_evaluations, background=manager is not None)
+    if isinstance(adapter, _recordings.ActiveAdapter):
+        _recordings.register(app, adapter)
+    if filtered_adapter is not None:
+        _cross_filter.register(app, filtered_adapter, all_available_evaluations)
+
+    if args.metrics:
+        if args.trace_memory:
+            base.METRICS.enable_memory_tracing()
+        if args.performance_panel:
+            _metrics.create_html(performance_container)
+        _metrics.register(app, base.METRICS, panel=args.performance_panel)
+    if args.compression_threshold >= 0:
+        # Registered last, so that it runs first and the metrics see the compressed responses.
+        _payload.register_compression(app, min_bytes=args.compression_threshold)
+
+    if args.production:
+        logging.basicConfig(level=logging.INFO)
+        # Computed once here and shared by all workers, see `_serving`.
+        if args.warmup:
+            base.warm_up(all_available_evaluations, max_workers=args.warmup_workers)
+        _serving.serve(app, args.host, args.port, workers=args.workers, threads=args.threads)
+    else:
+        # In debug mode this script runs twice, the first process only watches for changes and restarts the second one.
+        if args.warmup and os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+            logging.basicConfig(level=logging.INFO)
+            base.warm_up(all_available_evaluations, max_workers=args.warmup_workers)
 
-    app.run_server(debug=True, port=args.port)
+        app.run_server(debug=True, host=args.host, port=args.port)
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""Headless batch report: runs all evaluations over many input files without starting the dashboard.
+
+Every input file is evaluated in its own worker process, for each one a directory with the figures (as static html
+report, png images and/or plotly json) is written to the output directory, alongside a `summary.json` over all files.
+"""
+
+import argparse
+import concurrent.futures
+import glob
+import hashlib
+import html
+import json
+import os
+from pathlib import Path
+import re
+import time
+import traceback
+from typing import Optional
+
+import plotly.graph_objects as go
+import plotly.io
+
+from evaluation_dashboard import available_data_adapters, get_all_available_evaluations, load_adapter
+from evaluation_semantics import _registry
+
+FORMATS = ("html", "png", "json")
+# Failures of an input file (e.g. a missing, malformed or invalid one, the adapters asserting the file and its columns)
+# and of an evaluation on its data, which are reported in the summary. Anything else is a bug and fails the batch.
+INPUT_ERRORS = (OSError, ValueError, AssertionError, MemoryError)
+EVALUATION_ERRORS = (OSError, ValueError, ArithmeticError, IndexError, MemoryError)
+
+
+def _parse_args():
+    """
+    Define and parse the command line arguments.
+    @return: argparse.Namespace Command line arguments specified by the user.
+    """
+    parser = argparse.ArgumentParser(description="Evaluation report")
+    parser.add_argument(
+        "-i",
+        "--input_files",
+        required=True,
+        help="Glob pattern of the input files to evaluate (quote it to prevent expansion by the shell).",
+    )
+    parser.add_argument(
+        "-da",
+        "--data_adapter",
+        choices=available_data_adapters().keys(),
+        default=None,
+        required=True,
+        help="Data Adapter to use.",
+    )
+    parser.add_argument(
+        "-o",
+        "--output_directory",
+        type=Path,
+        required=True,
+        help="Directory the reports and the summary are written to.",
+    )
+    parser.add_argument(
+        "-f",
+        "--formats",
+        nargs="+",
+        choices=FORMATS,
+        default=["html"],
+        help="Output formats: one static html report per input file, and/or one png (requires `kaleido`) or plotly "
+        "json file per figure.",
+    )
+    parser.add_argument(
+        "-e",
+        "--evaluations",
+        nargs="+",
+        choices=_registry.available_evaluations().keys(),
+        default=None,
+        help="Evaluations to run, all by default. Only the modules of these evaluations are imported.",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=os.cpu_count(),
+        help="Number of worker processes, defaults to the number of CPUs.",
+    )
+    parser.add_argument(
+        "-c",
+        "--cache_directory",
+        type=Path,
+        default=None,
+        help="Optional directory for the columnar cache of input files, see `evaluation_dashboard.py`.",
+    )
+    parser.add_argument(
+        "--shared_memory",
+        action="store_true",
+        help="Attach to the data of input files already loaded by other processes (e.g. a dashboard) via shared "
+        "memory, see `evaluation_dashboard.py`.",
+    )
+    return parser.parse_args()
+
+
+def report(
+    input_file: Path,
+    output_directory: Path,
+    data_adapter: str,
+    formats,
+    cache_directory: Optional[Path] = None,
+    evaluation_names=None,
+    shared_memory: bool = False,
+):
+    """Runs all evaluations on `input_file` and writes their figures to `output_directory`.
+
+    Args:
+        input_file: The input file to evaluate.
+        output_directory: Directory the figures (and the html report) of this file are written to.
+        data_adapter: Class name of the data adapter, see `evaluation_dashboard.available_data_adapters`.
+        formats: Output formats, a subset of `FORMATS`.
+        cache_directory: Optional directory for the columnar cache of input files.
+        evaluation_names: Optional names of the evaluations to run, all if `None`.
+        shared_memory: Whether to share the data of `input_file` via shared memory, see `evaluation_dashboard.py`.
+    Returns:
+        The summary of this file as dictionary, failures of the file or of an evaluation (see `INPUT_ERRORS` and
+        `EVALUATION_ERRORS`) are reported therein rather than raised.
+    """
+    start = time.perf_counter()
+    summary = {"input_file": str(input_file), "output_directory": str(output_directory), "evaluations": dict()}
+    try:
+        adapter = load_adapter(data_adapter, input_file, cache_directory, shared_memory)
+        evaluations = get_all_available_evaluations(adapter, mode="notebook", names=evaluation_names)
+    except INPUT_ERRORS:
+        summary.update(status="failed", error=traceback.format_exc(), seconds=time.perf_counter() - start)
+        return summary
+
+    output_directory.mkdir(parents=True, exist_ok=True)
+    sections = list()
+    for evaluation in sorted(evaluations, key=lambda e: e.get_name()):
+        evaluation_start = time.perf_counter()
+        entry = summary["evaluations"][evaluation.get_name()] = {"outputs": list()}
+        try:
+            figures = _figures(evaluation)
+            for suffix, figure in figures:
+                name = _slug(evaluation.get_name() + suffix)
+                if "png" in formats:
+                    figure.write_image(output_directory / f"{name}.png")
+                    entry["outputs"].append(f"{name}.png")
+                if "json" in formats:
+                    (output_directory / f"{name}.json").write_text(plotly.io.to_json(figure))
+                    entry["outputs"].append(f"{name}.json")
+            sections.append((evaluation, [figure for _, figure in figures]))
+            entry["status"] = "ok"
+        except EVALUATION_ERRORS:
+            entry.update(status="failed", error=traceback.format_exc())
+        entry["seconds"] = time.perf_counter() - evaluation_start
+
+    if "html" in formats:
+        (output_directory / "report.html").write_text(_html_report(input_file, sections))
+        summary["report"] = "report.html"
+    failed = any(e["status"] != "ok" for e in summary["evaluations"].values())
+    summary.update(status="failed" if failed else "ok", seconds=time.perf_counter() - start)
+    return summary
+
+
+def _figures(evaluation):
+    """Returns all figures of `evaluation` as list of tuples of a name suffix and the figure."""
+    figures = list()
+    for args in evaluation.get_warmup_arguments():
+        # The arguments are passed the same way as by `base.return_data_or_empty_list`.
+        figure = evaluation.get_figure(args) if len(args) > 0 else evaluation.get_figure()
+        if isinstance(figure, go.Figure):
+            figures.append(("".join(f"-{a}" for a in args if a is not None), figure))
+    return figures
+
+
+def _html_report(input_file, sections):
+    body = [f"<h1>{html.escape(str(input_file))}</h1>"]
+    include_plotlyjs = "cdn"
+    for evaluation, figures in sections:
+        body.append(f"<h2>{html.escape(evaluation.get_name())}</h2>")
+        body.extend(f"<p>{html.escape(text)}</p>" for text in _texts(evaluation.get_info_text()))
+        for figure in figures:
+            body.append(figure.to_html(full_html=False, include_plotlyjs=include_plotlyjs))
+            # The plotly library only needs to be loaded once per report.
+            include_plotlyjs = False
+    return '<html><head><meta charset="utf-8"/></head><body>{}</body></html>'.format("\n".join(body))
+
+
+def _texts(component):
+    """Returns all strings within (a list of nested) dash html components."""
+    if component is None:
+        return list()
+    if isinstance(component, str):
+        return [component]
+    if isinstance(component, (list, tuple)):
+        return [text for c in component for text in _texts(c)]
+    return _texts(getattr(component, "children", None))
+
+
+def _slug(name: str) -> str:
+    return re.sub(r"[^0-9A-Za-z.-]+", "_", name).strip("_").lower()
+
+
+def _output_names(input_files):
+    """Returns a distinct name of the output directory for each input file, its stem if unique."""
+    stems = [f.stem for f in input_files]
+    return [
+        f"{f.stem}-{hashlib.sha1(str(f.resolve()).encode()).hexdigest()[:8]}" if stems.count(f.stem) > 1 else f.stem
+        for f in input_files
+    ]
+
+
+if __name__ == "__main__":
+    args = _parse_args()
+
+    input_files = sorted(Path(f) for f in glob.glob(args.input_files, recursive=True))
+    assert len(input_files) > 0, f"No input files match '{args.input_files}'."
+    if "png" in args.formats:
+        try:
+            import kaleido  # noqa: F401
+        except ImportError as e:
+            raise ImportError("Writing png images requires `kaleido`, install it via `pip install kaleido`.") from e
+
+    start = time.perf_counter()
+    summaries = list()
+    with concurrent.futures.ProcessPoolExecutor(max_workers=args.workers) as executor:
+        futures = [
+            executor.submit(
+                report,
+                input_file,
+                args.output_directory / name,
+                args.data_adapter,
+                args.formats,
+                args.cache_directory,
+                args.evaluations,
+                args.shared_memory,
+            )
+            for input_file, name in zip(input_files, _output_names(input_files))
+        ]
+        for future in futures:
+            summaries.append(future.result())
+            print(f"{summaries[-1]['status']:>6} {summaries[-1]['seconds']:8.2f} s {summaries[-1]['input_file']}")
+
+    summary = {
+        "data_adapter": args.data_adapter,
+        "formats": args.formats,
+        "seconds": time.perf_counter() - start,
+        "failed": sum(s["status"] != "ok" for s in summaries),
+        "files": summaries,
+    }
+    args.output_directory.mkdir(parents=True, exist_ok=True)
+    (args.output_directory / "summary.json").write_text(json.dumps(summary, indent=2))
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Reductions over the columns of a `DataAdapter` computed chunk by chunk via `DataAdapter.iter_chunks`.
+
+For in-memory adapters the chunks are zero-copy slices, for streaming adapters only one chunk is held in memory
+at any time. Thus evaluations built on these helpers work for files larger than memory.
+"""
+
+import numpy as np
+
+
+def min_max(adapter, column):
+    """Returns the minimum and maximum of `column`, `(nan, nan)` if empty."""
+    minimum, maximum = np.inf, -np.inf
+    for chunk in adapter.iter_chunks([column]):
+        values = chunk[column]
+        if len(values) > 0:
+            minimum = min(minimum, np.min(values))
+            maximum = max(maximum, np.max(values))
+    if minimum > maximum:
+        return np.nan, np.nan
+    return minimum, maximum
+
+
+def histogram(adapter, column, bins: int, value_range=None):
+    """Computes the histogram of `column` with `bins` equally sized bins over its full value range.
+
+    Args:
+        adapter: The data adapter.
+        column: Name of the column.
+        bins: Number of bins.
+        value_range: The minimum and maximum of `column` if already known, see `min_max`.
+    Returns:
+        Tuple of the counts and the bin edges, as for `np.histogram`.
+    """
+    if value_range is None:
+        value_range = min_max(adapter, column)
+    if np.isnan(value_range[0]):
+        value_range = (0.0, 1.0)
+    counts = np.zeros(bins, dtype=np.int64)
+    edges = np.histogram_bin_edges([], bins=bins, range=value_range)
+    for chunk in adapter.iter_chunks([column]):
+        counts += np.histogram(chunk[column], bins=edges)[0]
+    return counts, edges
+
+
+def differences(adapter, column) -> np.ndarray:
+    """Returns the difference of each value in `column` to its predecessor, zero for the very first one."""
+    parts = list()
+    previous = None
+    for chunk in adapter.iter_chunks([column]):
+        values = chunk[column]
+        if len(values) == 0:
+            continue
+        parts.append(np.diff(values, prepend=values[0] if previous is None else previous))
+        previous = values[-1]
+    if not parts:
+        return np.empty(0)
+    return np.concatenate(parts)
+
+
+def lengths(adapter, column) -> np.ndarray:
+    """Returns the length of each row of the ragged `column` (i.e. a `RaggedArray`)."""
+    parts = [chunk[column].lengths() for chunk in adapter.iter_chunks([column])]
+    if not parts:
+        return np.empty(0, dtype=np.int64)
+    return np.concatenate(parts)
+
+
+def concatenate(adapter, column) -> np.ndarray:
+    """Returns `column` as one contiguous array, i.e. a copy which is safe to be modified in place."""
+    parts = [chunk[column] for chunk in adapter.iter_chunks([column])]
+    if not parts:
+        return np.empty(0)
+    return np.concatenate(parts)
+
+
+def pairs(adapter, column) -> np.ndarray:
+    """Returns the values of the ragged `column`, each row holding interleaved x and y coordinates, as pairs.
+
+    The pairs of all rows are concatenated in row order.
+
+    Returns:
+        Float64 array of shape `(n, 2)`.
+    Raises:
+        ValueError: If the adapter does not declare its points as x and y coordinates (see
+            `DataAdapter.point_dimensions`) or if a row holds an unpaired value.
+    """
+    if adapter.point_dimensions != 2:
+        raise ValueError(f"The rows of '{column}' are not declared as x and y coordinates (see `point_dimensions`).")
+    parts = list()
+    position = 0
+    for chunk in adapter.iter_chunks([column]):
+        rows = chunk[column]
+        odd = np.flatnonzero(rows.lengths() % 2 == 1)
+        if len(odd) > 0:
+            first_rows = (position + odd[:10]).tolist()
+            raise ValueError(f"{len(odd)} row(s) of '{column}' hold an unpaired coordinate, e.g. at rows {first_rows}.")
+        parts.append(rows.flat.reshape(-1, 2))
+        position += len(rows)
+    if not parts:
+        return np.empty((0, 2))
+    return np.concatenate(parts, dtype=np.float64)
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""Cross-filtering: a range selected (via box select) in one plot filters the echoes of all evaluations.
+
+The evaluations are created once for a `FilteredAdapter`, which forwards everything to the view of the adapter on the
+rows within the selection of the request (see `DataAdapter.filtered`). Thus every evaluation is computed on the
+selected rows only without knowing about the filter, and its features and figures are cached per selection. The
+selection is kept in a cookie, i.e. per browser session as the selected recording (see `_recordings`).
+
+Only the columns with one value per echo are filtered (see `DataAdapter.table_columns`). Evaluations of the other
+columns (e.g. the reflex points, one row per sample) always show all of their data, they are listed as not filtered in
+the description of the selection (see `EvaluationSemanticsBase.is_filtered`).
+
+The plots a range can be selected in are declared by the evaluations via `get_filter_sources`. Selecting a range
+replaces the condition on the column of the plot, conditions on other columns are kept until cleared.
+"""
+
+import json
+
+from dash import ctx, html, no_update
+from dash.dependencies import Input, Output, State
+import flask
+
+from data_adapter import _filter
+from evaluation_semantics import base
+
+COOKIE_NAME = "evaluation-filter"
+DESCRIPTION_ID = "cross-filter-description"
+CLEAR_ID = "button-clear-filter"
+
+
+class FilteredAdapter:
+    def __init__(self, adapter):
+        """Proxy of the view of `adapter` on the rows within the selection of the current request (see `selection`),
+        i.e. `adapter` itself if nothing is selected or outside of requests (e.g. during the warm-up).
+        """
+        self.unfiltered = adapter
+
+    def current(self):
+        """Returns the view of the adapter on the rows selected by the current request."""
+        return self.unfiltered.filtered(selection())
+
+    def __getattr__(self, name):
+        return getattr(self.current(), name)
+
+
+def selection() -> tuple:
+    """Returns the selection of the current request, empty if there is none (or an invalid one) or outside requests."""
+    if not flask.has_request_context():
+        return tuple()
+    if "cross_filter" not in flask.g:
+        try:
+            flask.g.cross_filter = _filter.normalize(json.loads(flask.request.cookies.get(COOKIE_NAME, "[]")))
+        except (TypeError, ValueError):
+            flask.g.cross_filter = tuple()
+    return flask.g.cross_filter
+
+
+def create_html(element):
+    """Adds the description of the current selection and the button clearing it to `element`."""
+    element.append(html.P(id=DESCRIPTION_ID))
+    element.append(html.Button("Clear filter", id=CLEAR_ID))
+
+
+def register(app, adapter: FilteredAdapter, evaluations):
+    """Registers the callbacks filtering by the ranges selected in the plots declared by `evaluations` (see
+    `get_filter_sources`), clearing the selection and describing it.
+
+    On every change of the selection all selected evaluations are re-computed, exactly as on switching recordings.
+    """
+    unfiltered = [e.get_name() for e in evaluations if not e.is_filtered()]
+
+    for evaluation in evaluations:
+        for graph_id, column in evaluation.get_filter_sources():
+            _register_source(app, adapter, graph_id, column)
+
+    def _function_clear_filter(n_clicks, selected_dropdown_values):
+        if not n_clicks:
+            return no_update, no_update
+        ctx.response.delete_cookie(COOKIE_NAME)
+        return list(), selected_dropdown_values
+
+    def _function_describe_filter(_):
+        current = selection()
+        if not current:
+            return "Not filtered. Select a range (via box select) in the timestamps or a histogram to filter by it."
+        conditions = ", ".join(f"{column} within [{low:.6g}, {high:.6g}]" for column, low, high in current)
+        view = adapter.current()
+        description = f"Filtered to {conditions}: {len(view.data[view.table_columns[0]])} echoes."
+        if unfiltered:
+            description += f" Not filtered (showing all samples): {', '.join(unfiltered)}."
+        return description
+
+    app.callback(
+        [
+            Output(base.SELECTION_STORE_ID, "data", allow_duplicate=True),
+            Output("dropdown-selection-evaluation", "value", allow_duplicate=True),
+        ],
+        [Input(CLEAR_ID, "n_clicks")],
+        [State("dropdown-selection-evaluation", "value")],
+        prevent_initial_call=True,
+    )(_function_clear_filter)
+
+    # The selection store changes after every (re-)computation, including the ones triggered by filtering.
+    app.callback(
+        Output(DESCRIPTION_ID, "children"),
+        [Input(base.SELECTION_STORE_ID, "data")],
+    )(_function_describe_filter)
+
+
+def _register_source(app, adapter, graph_id, column):
+    """Registers the callback filtering by the range selected along the x axis of the graph `graph_id`, which shows
+    `column` (or the column named by the value of the state `column`).
+    """
+    states = [column] if isinstance(column, State) else list()
+
+    def _function_filter(selected_data, selected_dropdown_values, *state_values):
+        selected_range = _selected_range(selected_data)
+        name = state_values[0] if states else column
+        if selected_range is None or not name:
+            return no_update, no_update
+        low, high = selected_range
+        if name == _filter.INDEX:
+            # The positions shown are the ones within the current view.
+            low, high = _filter.source_range(adapter.current(), low, high)
+        current = _filter.with_condition(selection(), name, low, high)
+        ctx.response.set_cookie(COOKIE_NAME, json.dumps(current), samesite="Lax")
+        return list(), selected_dropdown_values
+
+    app.callback(
+        [
+            Output(base.SELECTION_STORE_ID, "data", allow_duplicate=True),
+            Output("dropdown-selection-evaluation", "value", allow_duplicate=True),
+        ],
+        [Input(graph_id, "selectedData")],
+        [State("dropdown-selection-evaluation", "value")] + states,
+        prevent_initial_call=True,
+    )(_function_filter)
+
+
+def _selected_range(selected_data):
+    """Returns the range along the x axis (of any subplot) of a box selection, `None` if there is none."""
+    if not selected_data or not selected_data.get("range"):
+        return None
+    for axis, value_range in sorted(selected_data["range"].items()):
+        if axis.startswith("x"):
+            return min(value_range), max(value_range)
+    return None
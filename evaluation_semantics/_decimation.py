@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Min/max decimation of long series for plotting, shared by all evaluations plotting one value per sample.
+
+Instead of sending every sample to the browser, the (visible part of the) series is split into buckets and only
+the minimum and maximum of each bucket is kept. Thus spikes stay visible while the number of points is bounded by
+the pixel budget. Zooming in re-decimates the visible range only, down to full resolution.
+"""
+
+from dash import no_update
+from dash.dependencies import Input, Output
+import numpy as np
+
+import evaluation_semantics.base as base
+
+# Maximum number of points per trace, about the number of horizontal pixels of a plot.
+DEFAULT_PIXEL_BUDGET = 2 * base.DASHBOARD_WIDTH
+
+
+def decimate(values: np.ndarray, index_range=None, budget: int = DEFAULT_PIXEL_BUDGET):
+    """Reduces `values` (within `index_range`) to at most `budget` points, keeping the minimum and maximum per bucket.
+
+    Args:
+        values: The series, one value per sample.
+        index_range: Optional tuple of the (float) lower and upper sample index to keep, everything if `None`.
+        budget: Maximum number of points returned.
+    Returns:
+        Tuple of the sample indices and the values at these indices, both in order of the sample index.
+    """
+    start, stop = 0, len(values)
+    if index_range is not None:
+        start = int(np.clip(np.floor(index_range[0]), 0, len(values)))
+        stop = int(np.clip(np.ceil(index_range[1]) + 1, start, len(values)))
+    visible = values[start:stop]
+    if len(visible) <= budget:
+        return np.arange(start, stop), visible
+
+    bucket_size = int(np.ceil(len(visible) / (budget // 2)))
+    number_of_buckets = int(np.ceil(len(visible) / bucket_size))
+    # Pad the last bucket with its last value, so that all buckets can be reduced at once.
+    padded = np.pad(visible, (0, number_of_buckets * bucket_size - len(visible)), mode="edge")
+    buckets = padded.reshape(number_of_buckets, bucket_size)
+    offsets = np.arange(number_of_buckets)[:, np.newaxis] * bucket_size
+    positions = np.column_stack([np.argmin(buckets, axis=1), np.argmax(buckets, axis=1)])
+    positions = np.sort(np.minimum(positions + offsets, len(visible) - 1), axis=1).ravel()
+    return positions + start, visible[positions]
+
+
+def register_zoom(app, graph_id: str, get_figure, axes=("xaxis",)):
+    """Registers the callback re-creating the figure of `graph_id` for the visible range whenever it is zoomed.
+
+    Args:
+        app: The dash app where the callback needs to be registered.
+        graph_id: Id of the `dcc.Graph`.
+        get_figure: Method of the evaluation taking the visible range of sample indices (`None` for everything) and
+            returning the `dcc.Graph`.
+        axes: Names of the x axes (i.e. of all subplots) the zoom can originate from.
+    """
+
+    def _function_return_zoomed_figure(relayout_data):
+        return zoomed_figure(relayout_data, get_figure, axes)
+
+    app.callback(
+        Output(graph_id, "figure"),
+        [Input(graph_id, "relayoutData")],
+        prevent_initial_call=True,
+    )(_function_return_zoomed_figure)
+
+
+def zoomed_figure(relayout_data, get_figure, axes=("xaxis",)):
+    """Returns the figure for the range zoomed to according to `relayout_data`, `no_update` if not zoomed.
+
+    Args:
+        relayout_data: The `relayoutData` property as passed to the callback.
+        get_figure: See `register_zoom`.
+        axes: See `register_zoom`.
+    """
+    for axis in axes:
+        visible_range = base.relayout_range(relayout_data, axis)
+        if visible_range is not False:
+            with get_figure.__self__.measure("zoom"):
+                return base.encode_payload(get_figure(visible_range).figure)
+    return no_update
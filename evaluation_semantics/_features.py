@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""Store of derived features (intermediate results such as ranks or differences) shared by all evaluations.
+
+A feature is referred to by its name and arguments written like a call, e.g. `ranks(amplitude)` or
+`histogram(amplitude, 100)`. It is computed lazily on first request and kept in the cache of the adapter (see
+`DataAdapter.cached`), thus every further consumer reuses it and it is dropped as soon as the data of the adapter
+changes. Features may request further features, e.g. `histogram` builds on `min_max`.
+
+Evaluations declare the features they consume via `EvaluationSemanticsBase.get_features`, so that these can be
+computed upfront (see `prefetch`). New features are registered via the `feature` decorator.
+"""
+
+import concurrent.futures
+from typing import Optional
+
+import numpy as np
+
+from evaluation_semantics import _chunked
+
+_FEATURES = dict()
+
+
+def feature(function):
+    """Decorator registering `function(adapter, *args)` as feature named after the function."""
+    _FEATURES[function.__name__] = function
+    return function
+
+
+def get(adapter, spec: str):
+    """Returns the feature `spec` (e.g. `"diff(timestamp)"`) of `adapter`, computing it on first request.
+
+    Returns:
+        The feature. Note that it is shared, thus consumers must not modify it in place.
+    """
+    name, args = parse(spec)
+    if name not in _FEATURES:
+        raise KeyError(f"Unknown feature '{name}', available are {sorted(_FEATURES)}.")
+    source = getattr(adapter, "source_adapter", None)
+    if source is not None and _is_shared(adapter, args):
+        # Features of columns that are not filtered are the same for a view (see `DataAdapter.filtered`) and its source.
+        return get(source, spec)
+    return adapter.cached(("feature", name, args), lambda: _FEATURES[name](adapter, *args))
+
+
+def prefetch(adapter, specs, max_workers: Optional[int] = None):
+    """Computes all features in `specs` concurrently (features requested several times are computed once)."""
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        list(executor.map(lambda spec: get(adapter, spec), sorted(set(specs))))
+
+
+def parse(spec: str):
+    """Splits `spec` into the name of the feature and the tuple of its arguments, integers being converted.
+
+    Example:
+        `parse("histogram(amplitude, 100)")` returns `("histogram", ("amplitude", 100))`.
+    """
+    name, _, args = spec.partition("(")
+    if args and not args.endswith(")"):
+        raise ValueError(f"Malformed feature '{spec}', expected e.g. 'ranks(amplitude)'.")
+    args = [a.strip() for a in args[:-1].split(",")] if args[:-1].strip() else list()
+    return name.strip(), tuple(int(a) if a.lstrip("-").isdigit() else a for a in args)
+
+
+def _is_shared(view, args) -> bool:
+    """Returns whether all columns among `args` are shared by `view` with its source, i.e. are not filtered."""
+    columns = [a for a in args if isinstance(a, str) and a in view.columns]
+    return bool(columns) and not any(c in view.table_columns for c in columns)
+
+
+def _read_only(array: np.ndarray) -> np.ndarray:
+    array.setflags(write=False)
+    return array
+
+
+@feature
+def min_max(adapter, column):
+    """Minimum and maximum of `column`, see `_chunked.min_max`."""
+    return _chunked.min_max(adapter, column)
+
+
+@feature
+def histogram(adapter, column, bins):
+    """Counts and bin edges of `column` with `bins` bins over its full value range, see `_chunked.histogram`."""
+    counts, edges = _chunked.histogram(adapter, column, bins, value_range=get(adapter, f"min_max({column})"))
+    return _read_only(counts), _read_only(edges)
+
+
+@feature
+def diff(adapter, column):
+    """Difference of each value of `column` to its predecessor, see `_chunked.differences`."""
+    return _read_only(_chunked.differences(adapter, column))
+
+
+@feature
+def lengths(adapter, column):
+    """Number of values per row of the ragged `column`, see `_chunked.lengths`."""
+    return _read_only(_chunked.lengths(adapter, column))
+
+
+@feature
+def ranks(adapter, column):
+    """(Mid-)ranks of the values of `column`, ties getting the average of their ranks."""
+    import scipy.stats as stats
+
+    return _read_only(stats.rankdata(_chunked.concatenate(adapter, column)))
+
+
+@feature
+def rank_lookup(adapter, column, bins):
+    """Approximate ranks of `column` from its histogram with `bins` bins, values within one bin being ties.
+
+    Returns:
+        Tuple of the bin edges and the mid-rank of the values falling into each bin.
+    """
+    counts, edges = get(adapter, f"histogram({column}, {bins})")
+    return edges, _read_only(np.cumsum(counts) - counts + (counts + 1) / 2)
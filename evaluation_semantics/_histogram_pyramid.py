@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+
+import numpy as np
+
+from evaluation_semantics import _features
+
+
+class HistogramPyramid:
+    # Number of bins of the finest level, a power of two so that every coarser level halves it.
+    FINEST_NUMBER_OF_BINS = 1 << 16
+
+    def __init__(self, counts: np.ndarray, edges: np.ndarray):
+        """Histograms of one column at several resolutions, from `len(counts)` bins down to a single bin.
+
+        Each level is derived from the next finer one by summing up pairs of bins, thus building the pyramid costs a
+        single pass over the data. Any (zoomed in) range can then be re-binned from the precomputed levels without
+        touching the data again.
+
+        Args:
+            counts: Counts of the finest level, the number of bins needs to be a power of two.
+            edges: Bin edges of the finest level.
+        """
+        self._range = (float(edges[0]), float(edges[-1]))
+        self._levels = [counts]
+        while len(self._levels[-1]) > 1:
+            self._levels.append(self._levels[-1].reshape(-1, 2).sum(axis=1))
+
+    @property
+    def value_range(self):
+        """Returns the range of values covered by the pyramid."""
+        return self._range
+
+    @classmethod
+    def from_adapter(cls, adapter, column):
+        """Returns the pyramid for `column` of `adapter`, i.e. the feature `histogram_pyramid(column)`."""
+        return _features.get(adapter, f"histogram_pyramid({column})")
+
+    def histogram(self, value_range=None, bins: int = 100):
+        """Returns the histogram of the values within `value_range` with at least `bins` bins (if available).
+
+        Args:
+            value_range: Tuple of the lower and upper limit, the full range if `None`.
+            bins: Minimum number of bins within `value_range`. The coarsest level providing that many is used, the
+                finest level if none does.
+        Returns:
+            Tuple of the counts and the bin edges, as for `np.histogram`.
+        """
+        low, high = self._range
+        if value_range is None:
+            value_range = self._range
+        start, stop = max(value_range[0], low), min(value_range[1], high)
+        if start >= stop or high <= low:
+            return self._levels[-1], np.array([low, high])
+
+        fraction = (stop - start) / (high - low)
+        level = next(
+            (level for level in reversed(self._levels) if len(level) * fraction >= bins),
+            self._levels[0],
+        )
+        width = (high - low) / len(level)
+        first = int(np.clip(np.floor((start - low) / width), 0, len(level) - 1))
+        last = int(np.clip(np.ceil((stop - low) / width), first + 1, len(level)))
+        edges = low + width * np.arange(first, last + 1)
+        return level[first:last], edges
+
+
+@_features.feature
+def histogram_pyramid(adapter, column):
+    """Histogram pyramid of `column`, built from its finest histogram."""
+    return HistogramPyramid(*_features.get(adapter, f"histogram({column}, {HistogramPyramid.FINEST_NUMBER_OF_BINS})"))
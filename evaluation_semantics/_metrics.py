@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""Performance metrics of the evaluations and the dashboard callbacks.
+
+For each evaluation call (see `base.return_data_or_empty_list` and `EvaluationSemanticsBase.measure`) the compute
+time, the time to serialize its result, the size of the serialized result (optionally also compressed and with plain
+json arrays, see `base.configure_payloads`) and the increase of the peak memory are recorded. For each dash callback
+the handling time of its requests and the size of its responses are recorded. Everything is exposed as Prometheus
+text on `/metrics` and optionally in a (collapsed) performance panel.
+
+Note that the peak memory is only traced while tracing is enabled (see `Metrics.enable_memory_tracing`, which slows
+down allocations) and is only approximate if several calls run concurrently. Metrics of background jobs (computed in
+other processes) are not included.
+"""
+
+from collections import defaultdict
+import contextlib
+import re
+import threading
+import time
+import tracemalloc
+
+from dash import dash_table, dcc, html
+from dash.dependencies import Input, Output
+import flask
+
+PANEL_ID = "performance-panel"
+# Seconds between updates of the performance panel.
+PANEL_UPDATE_INTERVAL = 5
+
+# Name, type and help of the exported metrics, the samples of each are keyed by their labels.
+_METRICS = {
+    "evaluation_calls_total": ("counter", "Number of evaluation calls, by cache result."),
+    "evaluation_compute_seconds": ("summary", "Wall time to compute the result of an evaluation call."),
+    "evaluation_serialization_seconds": ("summary", "Wall time to serialize the result of an evaluation call."),
+    "evaluation_payload_bytes": ("summary", "Size of the serialized result of an evaluation call, as cached and sent."),
+    "evaluation_compressed_payload_bytes": ("summary", "Size of the serialized result after compression."),
+    "evaluation_plain_payload_bytes": ("summary", "Size of the serialized result with arrays as plain json lists."),
+    "evaluation_plain_compressed_payload_bytes": ("summary", "Size of the plain serialized result after compression."),
+    "evaluation_peak_memory_bytes": ("gauge", "Largest increase of the peak memory during an evaluation call."),
+    "callback_request_seconds": ("summary", "Wall time to handle a request of a dash callback."),
+    "callback_response_bytes": ("summary", "Size of the responses of a dash callback, as sent (i.e. compressed)."),
+}
+
+
+class Metrics:
+    def __init__(self, enabled: bool = True):
+        """Thread-safe store of all metrics, summaries being kept as count, sum and maximum.
+
+        Args:
+            enabled: Whether anything is recorded, disabled metrics ignore all calls (e.g. without `--metrics`).
+        """
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._counters = defaultdict(int)
+        self._summaries = defaultdict(lambda: [0, 0.0, 0.0])
+
+    @staticmethod
+    def enable_memory_tracing():
+        """Starts tracing allocations, which is required to record the peak memory of evaluation calls."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def count(self, name: str, **labels):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[(name, _labels(labels))] += 1
+
+    def observe(self, name: str, value: float, **labels):
+        if not self.enabled:
+            return
+        with self._lock:
+            summary = self._summaries[(name, _labels(labels))]
+            summary[0] += 1
+            summary[1] += value
+            summary[2] = max(summary[2], value)
+
+    @contextlib.contextmanager
+    def measure(self, evaluation: str, method: str):
+        """Context manager recording compute time (and peak memory if traced) of the enclosed evaluation call."""
+        if not self.enabled:
+            yield
+            return
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            baseline = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(
+                "evaluation_compute_seconds", time.perf_counter() - start, evaluation=evaluation, method=method
+            )
+            if tracing:
+                peak = tracemalloc.get_traced_memory()[1] - baseline
+                self.observe("evaluation_peak_memory_bytes", max(peak, 0), evaluation=evaluation, method=method)
+
+    def clear(self):
+        with self._lock:
+            self._counters.clear()
+            self._summaries.clear()
+
+    def to_prometheus(self) -> str:
+        """Returns all metrics in the Prometheus text exposition format."""
+        lines = list()
+        with self._lock:
+            for name, (kind, description) in _METRICS.items():
+                lines += [f"# HELP {name} {description}", f"# TYPE {name} {kind}"]
+                if kind == "counter":
+                    lines += [
+                        f"{n}{_format(labels)} {v}" for (n, labels), v in sorted(self._counters.items()) if n == name
+                    ]
+                    continue
+                for (n, labels), (count, total, maximum) in sorted(self._summaries.items()):
+                    if n != name:
+                        continue
+                    if kind == "gauge":
+                        lines.append(f"{name}{_format(labels)} {maximum:g}")
+                    else:
+                        lines += [
+                            f"{name}_count{_format(labels)} {count}",
+                            f"{name}_sum{_format(labels)} {total:g}",
+                            f"{name}_max{_format(labels)} {maximum:g}",
+                        ]
+        return "\n".join(lines) + "\n"
+
+    def to_rows(self) -> list:
+        """Returns one row (dictionary) per evaluation call and callback, as shown by the performance panel."""
+        rows = defaultdict(dict)
+        with self._lock:
+            for (name, labels), (count, total, maximum) in self._summaries.items():
+                labels = dict(labels)
+                row = rows[labels.get("evaluation", "callback"), labels.get("method", labels.get("callback"))]
+                prefix = name.split("_", 1)[1]
+                row["calls"] = max(row.get("calls", 0), count)
+                row[f"{prefix} (mean)"] = total / count
+                row[f"{prefix} (max)"] = maximum
+        return [{"name": name, "call": call, **row} for (name, call), row in sorted(rows.items())]
+
+
+def create_html(element):
+    """Creates the (collapsed) performance panel showing `METRICS`.
+
+    Args:
+        element: The list to be added as 'children' in the overall html struture lateron.
+    """
+    element.append(
+        html.Details(
+            id=PANEL_ID,
+            children=[
+                html.Summary("Performance"),
+                dash_table.DataTable(id=f"{PANEL_ID}-table", page_size=20, sort_action="native"),
+                dcc.Interval(id=f"{PANEL_ID}-interval", interval=PANEL_UPDATE_INTERVAL * 1000),
+            ],
+        )
+    )
+
+
+def register(app, metrics: Metrics, panel: bool = False):
+    """Registers the `/metrics` route on the server of `app` and records the requests of all dash callbacks.
+
+    Args:
+        app: The dash app.
+        metrics: The metrics to expose and record to, which get enabled.
+        panel: Whether the performance panel (see `create_html`) is part of the layout and needs to be updated.
+    """
+    server = app.server
+    metrics.enabled = True
+
+    @server.before_request
+    def _start_timer():
+        flask.g.metrics_start = time.perf_counter()
+
+    @server.after_request
+    def _record_callback(response):
+        if flask.request.path.endswith("/_dash-update-component") and not response.direct_passthrough:
+            callback = _callback_name((flask.request.get_json(silent=True) or dict()).get("output", "unknown"))
+            if callback != f"{PANEL_ID}-table.data":
+                metrics.observe(
+                    "callback_request_seconds", time.perf_counter() - flask.g.metrics_start, callback=callback
+                )
+                metrics.observe("callback_response_bytes", response.calculate_content_length() or 0, callback=callback)
+        return response
+
+    @server.route("/metrics")
+    def _metrics():
+        return flask.Response(metrics.to_prometheus(), mimetype="text/plain; version=0.0.4")
+
+    if panel:
+        app.callback(
+            Output(f"{PANEL_ID}-table", "data"),
+            [Input(f"{PANEL_ID}-interval", "n_intervals")],
+        )(lambda _: [{k: _round(v) for k, v in row.items()} for row in metrics.to_rows()])
+
+
+def _callback_name(output: str) -> str:
+    """Returns a short name of the callback with the (serialized) `output`, e.g. `evaluation-figure.children`."""
+    # Duplicate outputs carry a hash suffix, pattern-matching ids are replaced by their type.
+    output = re.sub(r'\{[^{}]*"type":"([^"]+)"[^{}]*\}', r"\1", output.split("@")[0])
+    # Multiple outputs are serialized as `..first...second..`.
+    return ",".join(o for o in output.strip(".").split("...")) if output.startswith("..") else output
+
+
+def _labels(labels: dict) -> tuple:
+    return tuple(sorted(labels.items()))
+
+
+def _format(labels) -> str:
+    if not labels:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in labels)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(labels, escaped)) + "}"
+
+
+def _round(value):
+    return round(value, 4) if isinstance(value, float) else value
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""Compact encoding of the figures sent to the browser and compression of the responses of the dashboard.
+
+By default plotly serializes numeric arrays as json lists of numbers, which is slow to write on the server, large to
+transfer and slow to parse in the browser. plotly.js (since 2.28) also accepts typed arrays, i.e. the raw bytes of an
+array in base64 along with its type: `{"dtype": "f8", "bdata": "...", "shape": "2, 3"}`. `encode` converts the numeric
+arrays of all traces of the figures within a callback result to this form (as plotly.py does from version 6 on).
+
+Independently, `register_compression` compresses all json responses of the dashboard larger than a threshold with
+brotli (if installed and accepted by the browser) or gzip.
+"""
+
+import base64
+import gzip
+
+from dash import dcc
+from dash.development.base_component import Component
+import flask
+import numpy as np
+from plotly.basedatatypes import BaseFigure
+
+# Responses smaller than this are sent uncompressed, as the overhead outweighs the saving.
+MIN_COMPRESSED_BYTES = 1024
+# Compression levels trading speed for size, as every response is compressed on the fly.
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+COMPRESSED_MIMETYPES = {"application/json"}
+
+# Types of the typed arrays supported by plotly.js.
+_DTYPES = {
+    "int8": "i1",
+    "uint8": "u1",
+    "int16": "i2",
+    "uint16": "u2",
+    "int32": "i4",
+    "uint32": "u4",
+    "float32": "f4",
+    "float64": "f8",
+}
+# Integer types in order of preference when narrowing.
+_INTEGER_TYPES = [np.uint8, np.int8, np.uint16, np.int16, np.uint32, np.int32]
+
+
+def encode(value):
+    """Returns `value` with the numeric arrays of all figures within it encoded as typed arrays.
+
+    Args:
+        value: A plotly figure, a figure dictionary, a dash component (tree) containing `dcc.Graph`s or a list of
+            these. Anything else is returned unchanged.
+    Returns:
+        The same structure, figures being replaced by dictionaries. Components are modified in place.
+    """
+    if isinstance(value, BaseFigure):
+        return encode(value.to_plotly_json())
+    if isinstance(value, dict) and isinstance(value.get("data"), (list, tuple)):
+        return {**value, "data": [_encode_arrays(trace) for trace in value["data"]]}
+    if isinstance(value, dcc.Graph):
+        if getattr(value, "figure", None) is not None:
+            value.figure = encode(value.figure)
+        return value
+    if isinstance(value, Component):
+        children = getattr(value, "children", None)
+        if children is not None:
+            value.children = encode(children)
+        return value
+    if isinstance(value, list):
+        return [encode(v) for v in value]
+    return value
+
+
+def estimate_size(value) -> int:
+    """Returns the approximate size of `value` (e.g. as returned by `encode`) serialized as json, without serializing.
+
+    Arrays are counted with their `nbytes`, strings (e.g. of typed arrays) with their length and numbers with 8 bytes.
+    """
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(len(str(k)) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sum(estimate_size(v) for v in value)
+    if isinstance(value, (BaseFigure, Component)):
+        return estimate_size(value.to_plotly_json())
+    return 8
+
+
+def typed_array(array: np.ndarray):
+    """Returns the typed array specification of the numeric `array`, `array` itself if it has no typed equivalent.
+
+    Integers are narrowed to the smallest type holding their values, 64 bit integers (unsupported by plotly.js) are
+    converted to float if their values exceed 32 bit.
+    """
+    if array.dtype.kind in "iu":
+        low, high = (int(array.min()), int(array.max())) if array.size > 0 else (0, 0)
+        dtype = next(
+            (t for t in _INTEGER_TYPES if np.iinfo(t).min <= low and high <= np.iinfo(t).max),
+            np.float64,
+        )
+        if np.dtype(dtype).itemsize < array.dtype.itemsize or array.dtype.itemsize == 8:
+            array = array.astype(dtype)
+    dtype = _DTYPES.get(array.dtype.name)
+    if dtype is None:
+        return array
+    # plotly.js reads the bytes in little-endian order.
+    data = np.ascontiguousarray(array, dtype=array.dtype.newbyteorder("<"))
+    spec = {"dtype": dtype, "bdata": base64.b64encode(data.tobytes()).decode("ascii")}
+    if array.ndim > 1:
+        spec["shape"] = ", ".join(str(n) for n in array.shape)
+    return spec
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """Compresses `data` with `encoding`, either `gzip` or `br` (requires `brotli`)."""
+    if encoding == "br":
+        import brotli
+
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL)
+
+
+def available_encodings() -> list:
+    """Returns the supported content encodings, the preferred first."""
+    try:
+        import brotli  # noqa: F401
+    except ImportError:
+        return ["gzip"]
+    return ["br", "gzip"]
+
+
+def register_compression(app, min_bytes: int = MIN_COMPRESSED_BYTES):
+    """Compresses the json responses (i.e. callback results and layout) of the server of `app` of `min_bytes` or more.
+
+    Note that hooks registered later run earlier, thus to see the compressed responses (e.g. in `_metrics`), register
+    this last.
+    """
+    encodings = available_encodings()
+
+    @app.server.after_request
+    def _compress_response(response):
+        if (
+            response.direct_passthrough
+            or response.status_code != 200
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in COMPRESSED_MIMETYPES
+        ):
+            return response
+        encoding = flask.request.accept_encodings.best_match(encodings)
+        data = response.get_data()
+        if encoding is None or len(data) < min_bytes:
+            return response
+        response.set_data(compress(data, encoding))
+        response.headers["Content-Encoding"] = encoding
+        response.vary.add("Accept-Encoding")
+        return response
+
+
+def _encode_arrays(value):
+    """Returns `value` (a trace or one of its attributes) with all numeric numpy arrays as typed arrays."""
+    if isinstance(value, np.ndarray):
+        return typed_array(value) if value.dtype.kind in "iuf" else value
+    if isinstance(value, dict):
+        return {k: _encode_arrays(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_encode_arrays(v) for v in value]
+    return value
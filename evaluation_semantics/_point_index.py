@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""Spatial index of (reflex) points, answering density, region and neighbourhood queries without a pass over all points.
+
+The points are sorted by the cell of a regular `GRID_SIZE` x `GRID_SIZE` grid over their bounding box they fall into,
+thus the points of any range of cells within a grid row are one contiguous slice. Alongside, the summed-area table of
+the number of points per cell gives the number of points within any block of cells in constant time. Densities of
+large regions are taken from the table, while only the points of small (zoomed in) regions and of the border cells of
+a queried region are touched. Neighbourhood queries are answered by a `scipy.spatial.cKDTree` on the same points.
+"""
+
+import numpy as np
+
+from evaluation_semantics import _chunked
+from evaluation_semantics import _features
+
+
+class PointIndex:
+    # Number of cells of the grid per axis.
+    GRID_SIZE = 1 << 10
+    # Maximum number of points binned exactly for a density, larger regions are binned along the cells of the grid.
+    MAX_EXACT_POINTS = 1 << 20
+
+    def __init__(self, points: np.ndarray):
+        """Builds the index, i.e. sorts the points by grid cell and builds the summed-area table and the kd-tree.
+
+        Args:
+            points: Array of shape `(n, 2)` with the x and y coordinates of the points, kept sorted by cell (as
+                float64, the precision of the kd-tree) in `points`.
+        """
+        from scipy.spatial import cKDTree
+
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        if len(points) > 0:
+            low, high = points.min(axis=0), points.max(axis=0)
+        else:
+            low, high = np.zeros(2), np.ones(2)
+        # Degenerate extents (e.g. all points on one line) are widened, so that every cell has a positive size.
+        self._low = low
+        self._high = np.where(high > low, high, low + 1.0)
+        self._cell_size = (self._high - self._low) / self.GRID_SIZE
+
+        # Cells are numbered row by row, i.e. `y * GRID_SIZE + x`.
+        cells = self._cell_of(points[:, 1], 1) * self.GRID_SIZE + self._cell_of(points[:, 0], 0)
+        counts = np.bincount(cells, minlength=self.GRID_SIZE**2)
+        order = np.argsort(cells, kind="stable")
+        del cells
+        self.points = _read_only(points[order])
+        del order
+        self._offsets = np.zeros(self.GRID_SIZE**2 + 1, dtype=np.int64)
+        np.cumsum(counts, out=self._offsets[1:])
+        # Padded by a leading row and column of zeros, indexed by the (exclusive) cell bounds `[y, x]`.
+        self._integral = np.zeros((self.GRID_SIZE + 1, self.GRID_SIZE + 1), dtype=np.int64)
+        np.cumsum(np.cumsum(counts.reshape(self.GRID_SIZE, self.GRID_SIZE), axis=0), axis=1, out=self._integral[1:, 1:])
+        # The tree refers to the sorted points rather than copying them. Sliding midpoint splits build much faster than
+        # median splits at about the same query time.
+        self._tree = cKDTree(self.points, copy_data=False, balanced_tree=False)
+
+    @classmethod
+    def from_adapter(cls, adapter, column):
+        """Returns the index of the points in `column` of `adapter`, i.e. the feature `point_index(column)`."""
+        return _features.get(adapter, f"point_index({column})")
+
+    def __len__(self):
+        return len(self.points)
+
+    @property
+    def extent(self):
+        """Returns the range of the x and the y coordinates covered by the index, as tuple of tuples."""
+        return tuple((float(low), float(high)) for low, high in zip(self._low, self._high))
+
+    def density(self, x_range=None, y_range=None, bins: int = 200):
+        """Returns the 2D histogram of the points within the given ranges with (up to) `bins` bins per axis.
+
+        Regions holding at most `MAX_EXACT_POINTS` points are binned exactly. Larger ones are binned along the cells of
+        the grid from the summed-area table, i.e. the bins are multiples of the cells (and fewer than `bins` on an axis
+        spanning fewer cells) and the outermost ones are extended to the cells they overlap.
+
+        Args:
+            x_range: Tuple of the lower and upper limit of the x coordinates, the full extent if `None`.
+            y_range: Same as `x_range` for the y coordinates.
+            bins: Number of bins per axis.
+        Returns:
+            Tuple of the counts (indexed `[y, x]`) and the bin edges along x and y.
+        """
+        ranges = [self._clip(r, axis) for axis, r in enumerate([x_range, y_range])]
+        first, last = zip(*[self._cell_range(r, axis) for axis, r in enumerate(ranges)])
+        if self._count_cells(first, last) <= self.MAX_EXACT_POINTS:
+            points = self._points_in_cells(first, last)
+            counts, x_edges, y_edges = np.histogram2d(points[:, 0], points[:, 1], bins=bins, range=ranges)
+            return counts.T.astype(np.int64), x_edges, y_edges
+
+        bounds = list()
+        for axis in range(2):
+            step = -(-(last[axis] - first[axis]) // bins)
+            bounds.append(np.append(np.arange(first[axis], last[axis], step), last[axis]))
+        integral = self._integral[np.ix_(bounds[1], bounds[0])]
+        counts = np.diff(np.diff(integral, axis=0), axis=1)
+        x_edges, y_edges = [self._low[axis] + self._cell_size[axis] * bounds[axis] for axis in range(2)]
+        return counts, x_edges, y_edges
+
+    def count(self, x_range, y_range) -> int:
+        """Returns the exact number of points within the rectangle spanned by `x_range` and `y_range` (inclusive).
+
+        The cells fully within the rectangle are counted via the summed-area table, only the points of the cells on
+        its border are compared with its limits.
+        """
+        (x_low, x_high), (y_low, y_high) = x_range, y_range
+        if x_low > x_high or y_low > y_high:
+            return 0
+        if x_high < self._low[0] or y_high < self._low[1] or x_low > self._high[0] or y_low > self._high[1]:
+            return 0
+        first = (int(self._cell_of(x_low, 0)), int(self._cell_of(y_low, 1)))
+        last = (int(self._cell_of(x_high, 0)) + 1, int(self._cell_of(y_high, 1)) + 1)
+
+        count = self._count_cells((first[0] + 1, first[1] + 1), (last[0] - 1, last[1] - 1))
+        border = [
+            ((first[0], first[1]), (last[0], first[1] + 1)),
+            ((first[0], last[1] - 1), (last[0], last[1])),
+            ((first[0], first[1] + 1), (first[0] + 1, last[1] - 1)),
+            ((last[0] - 1, first[1] + 1), (last[0], last[1] - 1)),
+        ]
+        # Rectangles one cell wide or high have overlapping (i.e. identical) border rows or columns.
+        for cells in {b for b in border if b[0][0] < b[1][0] and b[0][1] < b[1][1]}:
+            points = self._points_in_cells(*cells)
+            count += np.count_nonzero(
+                (points[:, 0] >= x_low) & (points[:, 0] <= x_high) & (points[:, 1] >= y_low) & (points[:, 1] <= y_high)
+            )
+        return int(count)
+
+    def near(self, x: float, y: float, radius: float):
+        """Returns the neighbourhood of the position `(x, y)`.
+
+        Returns:
+            Tuple of the number of points within `radius` (euclidean distance), the distance to the nearest point and
+            the nearest point (`inf` and `None` if there are no points at all).
+        """
+        if len(self.points) == 0:
+            return 0, np.inf, None
+        count = self._tree.query_ball_point([x, y], radius, return_length=True)
+        distance, nearest = self._tree.query([x, y])
+        return int(count), float(distance), self.points[nearest]
+
+    def _clip(self, value_range, axis):
+        low, high = self._low[axis], self._high[axis]
+        if value_range is None:
+            return (float(low), float(high))
+        start, stop = max(value_range[0], low), min(value_range[1], high)
+        return (float(start), float(stop)) if start < stop else (float(low), float(high))
+
+    def _cell_range(self, value_range, axis):
+        """Returns the first and the (exclusive) last cell along `axis` overlapping `value_range`."""
+        first = int(np.clip(np.floor((value_range[0] - self._low[axis]) / self._cell_size[axis]), 0, self.GRID_SIZE))
+        last = int(np.clip(np.ceil((value_range[1] - self._low[axis]) / self._cell_size[axis]), 0, self.GRID_SIZE))
+        return min(first, self.GRID_SIZE - 1), max(last, first + 1)
+
+    def _cell_of(self, values, axis):
+        """Returns the cell along `axis` of each of the coordinates `values`, outliers being clipped to the grid."""
+        cells = np.floor((values - self._low[axis]) / self._cell_size[axis])
+        return np.clip(cells, 0, self.GRID_SIZE - 1).astype(np.int64)
+
+    def _count_cells(self, first, last) -> int:
+        """Returns the number of points within the cells `first` (inclusive) to `last` (exclusive), both `(x, y)`."""
+        (x0, y0), (x1, y1) = first, last
+        if x1 <= x0 or y1 <= y0:
+            return 0
+        integral = self._integral
+        return int(integral[y1, x1] - integral[y0, x1] - integral[y1, x0] + integral[y0, x0])
+
+    def _points_in_cells(self, first, last) -> np.ndarray:
+        """Returns the points within the cells `first` (inclusive) to `last` (exclusive), both `(x, y)`."""
+        (x0, y0), (x1, y1) = first, last
+        rows = np.arange(y0, y1) * self.GRID_SIZE
+        starts, stops = self._offsets[rows + x0], self._offsets[rows + x1]
+        lengths = stops - starts
+        # The slices of all rows gathered at once, i.e. `concatenate([arange(start, stop) for ...])`.
+        index = np.arange(lengths.sum()) + np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+        return self.points[index]
+
+
+def _read_only(array: np.ndarray) -> np.ndarray:
+    array.setflags(write=False)
+    return array
+
+
+@_features.feature
+def point_index(adapter, column):
+    """Spatial index of the ragged `column`, each row holding interleaved x and y coordinates (see `_chunked.pairs`)."""
+    return PointIndex(_chunked.pairs(adapter, column))
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Switching between recordings (input files) at runtime, backed by an `AdapterPool`.
+
+The evaluations are created once for an `ActiveAdapter`, which forwards everything to the adapter of the recording
+selected in the browser the request comes from. The selection is kept in a cookie, thus every user switches on their
+own and all callbacks stay unchanged. Results derived from the data (features, figures) are cached per adapter and
+data token, thus switching back to a recently viewed recording is served from the caches.
+"""
+
+from dash import ctx, dcc, html
+from dash.dependencies import Input, Output, State
+import flask
+
+from evaluation_semantics import _cross_filter
+from evaluation_semantics import base
+
+SELECTOR_ID = "dropdown-recording"
+COOKIE_NAME = "evaluation-recording"
+
+
+class ActiveAdapter:
+    def __init__(self, pool, recordings: list, default: str):
+        """Proxy of the adapter of the recording selected by the current request, `default` outside of requests.
+
+        Args:
+            pool: The `AdapterPool` holding the adapters, keyed by recording.
+            recordings: All selectable recordings.
+            default: The recording used if none is selected (and outside of requests, e.g. during the warm-up).
+        """
+        self.pool = pool
+        self.recordings = recordings
+        self.default_recording = default
+
+    def current(self):
+        """Returns the adapter of the selected recording, as set by the hook registered via `register`."""
+        if flask.has_request_context() and "recording_adapter" in flask.g:
+            return flask.g.recording_adapter
+        return self.pool.get(self.default_recording)
+
+    def selected(self) -> str:
+        """Returns the recording selected by the current request."""
+        recording = flask.request.cookies.get(COOKIE_NAME) if flask.has_request_context() else None
+        return recording if recording in self.recordings else self.default_recording
+
+    def __getattr__(self, name):
+        return getattr(self.current(), name)
+
+
+def create_html(element, adapter: ActiveAdapter):
+    """Adds the selector of the recording to `element`."""
+    element.append(html.P("Recording:"))
+    element.append(
+        dcc.Dropdown(
+            id=SELECTOR_ID,
+            options=[{"value": r, "label": r} for r in adapter.recordings],
+            value=adapter.default_recording,
+            clearable=False,
+            persistence=True,
+            persistence_type="session",
+        )
+    )
+
+
+def register(app, adapter: ActiveAdapter):
+    """Registers the hook resolving the selected recording per request and the callback switching it.
+
+    On switching, the new recording is loaded (unless in the pool already), all selected evaluations are re-computed
+    and the recording following it is prefetched.
+    """
+
+    @app.server.before_request
+    def _resolve_recording():
+        if flask.request.path.endswith("/_dash-update-component"):
+            flask.g.recording_adapter = adapter.pool.get(adapter.selected())
+
+    def _function_switch_recording(recording, selected_dropdown_values):
+        if recording not in adapter.recordings:
+            recording = adapter.default_recording
+        adapter.pool.get(recording)
+        # Session cookie, i.e. as long as the persisted value of the selector.
+        ctx.response.set_cookie(COOKIE_NAME, recording, samesite="Lax")
+        # Ranges selected in the previous recording (e.g. of sample positions) do not apply to this one.
+        ctx.response.delete_cookie(_cross_filter.COOKIE_NAME)
+        following = adapter.recordings[(adapter.recordings.index(recording) + 1) % len(adapter.recordings)]
+        adapter.pool.prefetch(following)
+        # Forgetting the previous selection and setting it again makes the dispatcher re-compute every evaluation.
+        return list(), selected_dropdown_values
+
+    app.callback(
+        [
+            Output(base.SELECTION_STORE_ID, "data", allow_duplicate=True),
+            Output("dropdown-selection-evaluation", "value"),
+        ],
+        [Input(SELECTOR_ID, "value")],
+        [State("dropdown-selection-evaluation", "value")],
+        prevent_initial_call=True,
+    )(_function_switch_recording)
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Registry of the available evaluations and data adapters, discovered without importing them.
+
+The modules of `evaluation_semantics` and `data_adapter` are only parsed to find the subclasses of
+`EvaluationSemanticsBase` and `DataAdapter` (also indirect ones) and their metadata. A module is imported the first
+time one of its classes is loaded via `PluginEntry.load`, thus listing the available plugins stays cheap however many
+there are and whatever they import.
+"""
+
+import ast
+import importlib
+from pathlib import Path
+
+_ROOT_DIRECTORY = Path(__file__).parent.parent
+
+
+class PluginEntry:
+    def __init__(self, name: str, module_name: str, class_name: str, description: str):
+        """Metadata of an evaluation or data adapter class, which is imported only once loaded.
+
+        Args:
+            name: Name shown to users, e.g. as returned by `get_name` of an evaluation.
+            module_name: Fully qualified name of the module defining the class.
+            class_name: Name of the class.
+            description: First line of the docstring of the class (or of its constructor).
+        """
+        self.name = name
+        self.module_name = module_name
+        self.class_name = class_name
+        self.description = description
+
+    def load(self):
+        """Imports the module (if not yet done) and returns the class."""
+        return getattr(importlib.import_module(self.module_name), self.class_name)
+
+    def __repr__(self):
+        return f"PluginEntry({self.name!r}, {self.module_name}.{self.class_name})"
+
+
+def available_evaluations() -> dict:
+    """Returns the entries of all evaluations by their name (i.e. `get_name`), ordered by module name."""
+    entries = _scan("evaluation_semantics", "EvaluationSemanticsBase", lambda stem: "base" in stem)
+    return {e.name: e for e in entries}
+
+
+def available_data_adapters() -> dict:
+    """Returns the entries of all data adapters by their class name, ordered by module name."""
+    entries = _scan("data_adapter", "DataAdapter", lambda stem: stem == "data_adapter")
+    return {e.class_name: e for e in entries}
+
+
+def _scan(package: str, base_class_name: str, ignore) -> list:
+    """Returns the entries of all (direct and indirect) subclasses of `base_class_name` within `package`.
+
+    Modules starting with an underscore and the ones for which `ignore(stem)` is true are skipped.
+    """
+    classes = dict()
+    for file_path in sorted((_ROOT_DIRECTORY / package).glob("*.py")):
+        if file_path.name.startswith("_") or ignore(file_path.stem):
+            continue
+        tree = ast.parse(file_path.read_text(), filename=str(file_path))
+        for node in tree.body:
+            if isinstance(node, ast.ClassDef):
+                classes[node.name] = (f"{package}.{file_path.stem}", node)
+
+    # Subclasses of subclasses (e.g. of another data adapter) are found by iterating until nothing is added.
+    subclasses = {base_class_name}
+    while True:
+        found = {name for name, (_, node) in classes.items() if subclasses & {_base_name(b) for b in node.bases}}
+        if found <= subclasses:
+            break
+        subclasses |= found
+
+    return [
+        PluginEntry(_display_name(node), module_name, name, _description(node))
+        for name, (module_name, node) in sorted(classes.items(), key=lambda item: item[1][0])
+        if name in subclasses and name != base_class_name
+    ]
+
+
+def _base_name(node) -> str:
+    """Returns the name of a base class, e.g. `EvaluationSemanticsBase` for `base.EvaluationSemanticsBase`."""
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    return node.id if isinstance(node, ast.Name) else ""
+
+
+def _display_name(node: ast.ClassDef) -> str:
+    """Returns the string literal returned by `get_name` of the class, the class name if there is none."""
+    for statement in node.body:
+        if isinstance(statement, ast.FunctionDef) and statement.name == "get_name":
+            for child in ast.walk(statement):
+                if isinstance(child, ast.Return) and isinstance(child.value, ast.Constant):
+                    return str(child.value.value)
+    return node.name
+
+
+def _description(node: ast.ClassDef) -> str:
+    docstring = ast.get_docstring(node)
+    if docstring is None:
+        constructor = next((s for s in node.body if isinstance(s, ast.FunctionDef) and s.name == "__init__"), None)
+        docstring = ast.get_docstring(constructor) if constructor is not None else None
+    return docstring.strip().splitlines()[0] if docstring else ""
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""Production serving of the dashboard by several preforked worker processes.
+
+Everything set up before `serve` is called (the data adapter, its arrays, the features and the figure cache if warmed
+up) is created once in the master process and inherited by the workers on fork. The pages holding it are shared
+copy-on-write, thus the memory does not grow with the number of workers as long as the workers only read the data.
+`gc.freeze` keeps the garbage collector from touching (and thereby copying) the pages of these objects.
+
+gunicorn is used if installed, else a minimal prefork server on top of werkzeug. Note that every worker has its own
+figure cache and metrics, i.e. `/metrics` reports the worker handling the request.
+"""
+
+import concurrent.futures
+import gc
+import logging
+import os
+import signal
+import socket
+import time
+from typing import Optional
+
+from werkzeug.serving import BaseWSGIServer
+
+logger = logging.getLogger(__name__)
+
+# Workers exiting within this many seconds after their start count as crashing, e.g. failing on every request.
+MIN_WORKER_SECONDS = 10.0
+# Number of consecutive crashing workers after which the server gives up, restarts are delayed increasingly before.
+MAX_CRASHING_RESTARTS = 5
+# Maximum delay of restarting a crashing worker in seconds.
+MAX_RESTART_DELAY = 30.0
+
+
+def serve(app, host: str, port: int, workers: int, threads: int):
+    """Serves `app` on `host:port` by `workers` processes with `threads` threads each, until terminated.
+
+    Args:
+        app: The dash app, fully set up.
+        host: Host to listen on, e.g. `0.0.0.0` for all interfaces.
+        port: Port to listen on.
+        workers: Number of worker processes.
+        threads: Number of threads handling requests per worker.
+    """
+    # Objects created so far are moved to a generation never collected, thus their pages stay shared after the fork.
+    gc.freeze()
+    try:
+        import gunicorn.app.base
+    except ImportError:
+        logger.info("gunicorn is not installed, serving via werkzeug.")
+        _serve_werkzeug(app.server, host, port, workers, threads)
+        return
+
+    class _Application(gunicorn.app.base.BaseApplication):
+        def load_config(self):
+            for key, value in dict(
+                bind=f"{host}:{port}", workers=workers, threads=threads, preload_app=True, worker_class="gthread"
+            ).items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return app.server
+
+    _Application().run()
+
+
+def _serve_werkzeug(server, host, port, workers, threads):
+    """Forks `workers` processes accepting on the same listening socket, restarting every worker that exits.
+
+    Workers crashing right after their start are restarted with an exponential backoff, after
+    `MAX_CRASHING_RESTARTS` of them in a row all workers are stopped and `SystemExit(1)` is raised.
+    """
+    listener = socket.create_server((host, port), backlog=128)
+    listener.set_inheritable(True)
+    children = dict()
+
+    def _start_worker():
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            try:
+                _PooledWSGIServer(host, port, server, threads, fd=listener.fileno()).serve_forever()
+            finally:
+                os._exit(1)
+        children[pid] = time.monotonic()
+
+    def _stop(signum, frame, code=0):
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        raise SystemExit(code)
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+    for _ in range(workers):
+        _start_worker()
+    logger.info("Serving on http://%s:%d with %d workers of %d threads.", host, port, workers, threads)
+    crashing = 0
+    while True:
+        pid, status = os.wait()
+        started = children.pop(pid, time.monotonic())
+        crashing = crashing + 1 if time.monotonic() - started < MIN_WORKER_SECONDS else 0
+        if crashing > MAX_CRASHING_RESTARTS:
+            logger.error(
+                "Worker %d exited with status %d, %d workers crashed in a row, stopping.", pid, status, crashing
+            )
+            _stop(None, None, code=1)
+        delay = min(2.0 ** (crashing - 1), MAX_RESTART_DELAY) if crashing > 0 else 0.0
+        logger.warning("Worker %d exited with status %d, restarting it in %.1f s.", pid, status, delay)
+        time.sleep(delay)
+        _start_worker()
+
+
+class _PooledWSGIServer(BaseWSGIServer):
+    def __init__(self, host: str, port: int, app, threads: int, fd: Optional[int] = None):
+        """werkzeug server handling the requests by a fixed number of threads (rather than one thread per request)."""
+        super().__init__(host, port, app, fd=fd)
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=threads)
+
+    def process_request(self, request, client_address):
+        future = self._executor.submit(self._process_request, request, client_address)
+        # Anything but a failing connection is a bug, which is logged rather than kept unseen by the future.
+        future.add_done_callback(_log_failure)
+
+    def _process_request(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except OSError:
+            # E.g. the client closed the connection, reported the same way as by `socketserver`.
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+
+def _log_failure(future):
+    if future.exception() is not None:
+        logger.error("Serving a request failed.", exc_info=future.exception())
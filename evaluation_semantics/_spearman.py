@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""Spearman rank correlation of all column pairs at once.
+
+Every column is ranked exactly once (and shared with other consumers via the feature store) and the full correlation
+matrix is computed as a single matrix product of the centered ranks. The p-values are derived from the very same
+matrix, as done by `scipy.stats.spearmanr`.
+"""
+
+import typing
+
+import numpy as np
+
+from evaluation_semantics import _features
+
+if typing.TYPE_CHECKING:
+    # Pandas and scipy are only imported once a correlation is computed, since importing them takes a while.
+    import pandas as pd
+
+# Default number of bins used for the ranking by `spearman_chunked`.
+CHUNKED_BINS = 4096
+
+
+def spearman(frame: "pd.DataFrame", max_samples: typing.Optional[int] = None, seed: int = 0):
+    """Computes the Spearman correlation matrix and its p-values for all columns of `frame`.
+
+    Args:
+        frame: The data, one variable per column.
+        max_samples: If given and `frame` has more rows, the correlation is computed on a random subsample of
+            this many rows.
+        seed: Seed for drawing the subsample.
+    Returns:
+        Tuple of the correlation and the p-value matrix, both as data frames indexed by the column names.
+    """
+    values = frame.to_numpy()
+    if max_samples is not None and len(values) > max_samples:
+        rows = np.sort(np.random.default_rng(seed).choice(len(values), size=max_samples, replace=False))
+        values = values[rows]
+
+    import scipy.stats as stats
+
+    return spearman_ranked(stats.rankdata(values, axis=0), frame.columns)
+
+
+def spearman_features(adapter, columns):
+    """Computes the Spearman correlation matrix and its p-values from the `ranks` features of `columns`.
+
+    Args:
+        adapter: The data adapter.
+        columns: The names of the columns to correlate, all of them need to have the same length.
+    Returns:
+        Tuple of the correlation and the p-value matrix, both as data frames indexed by the column names.
+    """
+    columns = list(columns)
+    return spearman_ranked(np.column_stack([_features.get(adapter, f"ranks({c})") for c in columns]), columns)
+
+
+def spearman_ranked(ranks: np.ndarray, columns):
+    """Computes the Spearman correlation matrix and its p-values from the ranks of all columns.
+
+    Args:
+        ranks: The (mid-)ranks, one column per variable. The array is modified in place.
+        columns: The names of the columns.
+    Returns:
+        Tuple of the correlation and the p-value matrix, both as data frames indexed by the column names.
+    """
+    ranks -= ranks.mean(axis=0)
+    correlation = _normalize(ranks.T @ ranks)
+    return _to_frames(correlation, _pvalues(correlation, len(ranks)), columns)
+
+
+def spearman_chunked(adapter, columns, bins: int = CHUNKED_BINS):
+    """Approximates the Spearman correlation matrix and its p-values chunk by chunk via `DataAdapter.iter_chunks`.
+
+    The ranks are derived from a histogram with `bins` bins per column (values within one bin are treated as ties,
+    see the `rank_lookup` feature), thus the memory needed is independent of the number of rows and the data is never
+    loaded as a whole.
+
+    Args:
+        adapter: The data adapter.
+        columns: The names of the columns to correlate, all of them need to have the same length.
+        bins: Number of bins used for the ranking.
+    Returns:
+        Tuple of the correlation and the p-value matrix, both as data frames indexed by the column names.
+    """
+    columns = list(columns)
+    rank_lookups = [_features.get(adapter, f"rank_lookup({column}, {bins})") for column in columns]
+    # The mean of all (mid-)ranks is known upfront, so the ranks can be centered chunk-wise.
+    mean_rank = (_features.get(adapter, f"histogram({columns[-1]}, {bins})")[0].sum() + 1) / 2
+
+    number_of_rows = 0
+    cross_products = np.zeros((len(columns), len(columns)))
+    for chunk in adapter.iter_chunks(columns):
+        chunk_ranks = np.column_stack([_lookup(chunk[c], *lookup) for c, lookup in zip(columns, rank_lookups)])
+        number_of_rows += len(chunk_ranks)
+        chunk_ranks -= mean_rank
+        cross_products += chunk_ranks.T @ chunk_ranks
+
+    correlation = _normalize(cross_products)
+    return _to_frames(correlation, _pvalues(correlation, number_of_rows), columns)
+
+
+def _lookup(values, edges, ranks):
+    bins = np.clip(np.searchsorted(edges, values, side="right") - 1, 0, len(ranks) - 1)
+    return ranks[bins]
+
+
+def _normalize(covariance):
+    deviation = np.sqrt(np.diag(covariance))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        correlation = covariance / np.outer(deviation, deviation)
+    return np.clip(correlation, -1.0, 1.0)
+
+
+def _pvalues(correlation, number_of_rows):
+    import scipy.stats as stats
+
+    degrees_of_freedom = number_of_rows - 2
+    # A correlation of +-1 (e.g. the diagonal) gives an infinite t and thus a p-value of 0. That is a convention (the
+    # same as of `scipy.stats.spearmanr`), the diagonal is not a test result and must not be "fixed" into one.
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = correlation * np.sqrt((degrees_of_freedom / ((correlation + 1.0) * (1.0 - correlation))).clip(0))
+    return 2 * stats.t.sf(np.abs(t), degrees_of_freedom)
+
+
+def _to_frames(correlation, pvalues, columns):
+    import pandas as pd
+
+    return (
+        pd.DataFrame(correlation, index=columns, columns=columns),
+        pd.DataFrame(pvalues, index=columns, columns=columns),
+    )
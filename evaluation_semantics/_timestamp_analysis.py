@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+
+import numpy as np
+
+from evaluation_semantics import _chunked
+from evaluation_semantics import _features
+
+
+class TimestampAnalysis:
+    # Differences larger than this factor times the median (positive) difference are considered gaps.
+    GAP_FACTOR = 5.0
+
+    def __init__(self, timestamps: np.ndarray, differences: np.ndarray):
+        """Analysis of a timestamp sequence: the difference of each timestamp to its predecessor plus an index of all
+        out-of-sequence (negative difference) and gap (unusually large difference) events.
+
+        Consecutive samples of the same kind form one event, described by the position of its first sample, the
+        number of samples (run length) and the largest absolute difference within it (magnitude).
+
+        Args:
+            timestamps: The timestamps, one per sample. The array is modified in place.
+            differences: The difference of each timestamp to its predecessor, zero for the first one.
+        """
+        # Subtract the first element from all elements since one wouldn't see a difference in the plots.
+        # Make sure that we don't subtract anything from the zero-padded values where no valid echo/reflex point
+        # was available.
+        valid = timestamps > 0
+        if np.any(valid):
+            timestamps[valid] -= timestamps[valid][0]
+        self.relative_timestamps = timestamps
+        self.differences = differences
+        # The analysis is shared via the feature store.
+        self.relative_timestamps.setflags(write=False)
+        self.differences.setflags(write=False)
+
+        positive_differences = differences[differences > 0]
+        self.gap_threshold = (
+            self.GAP_FACTOR * np.median(positive_differences) if len(positive_differences) > 0 else np.inf
+        )
+        self.out_of_sequence = _events(differences < 0, differences)
+        self.gaps = _events(differences > self.gap_threshold, differences)
+
+    @classmethod
+    def from_adapter(cls, adapter):
+        """Returns the analysis of the `timestamp` column of `adapter`, i.e. the feature `timestamp_analysis`."""
+        return _features.get(adapter, "timestamp_analysis")
+
+    def events(self) -> list:
+        """Returns all events as list of dictionaries, ordered by position."""
+        events = [
+            {"kind": kind, "position": int(p), "run_length": int(r), "magnitude": m.item()}
+            for kind, index in [("out-of-sequence", self.out_of_sequence), ("gap", self.gaps)]
+            for p, r, m in zip(index["position"], index["run_length"], index["magnitude"])
+        ]
+        return sorted(events, key=lambda e: e["position"])
+
+
+@_features.feature
+def timestamp_analysis(adapter):
+    """Analysis of the `timestamp` column, see `TimestampAnalysis`."""
+    return TimestampAnalysis(_chunked.concatenate(adapter, "timestamp"), _features.get(adapter, "diff(timestamp)"))
+
+
+def _events(mask: np.ndarray, differences: np.ndarray) -> dict:
+    """Returns position, run length and magnitude of each run of consecutive `True` values in `mask`."""
+    edges = np.diff(mask.astype(np.int8), prepend=0, append=0)
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    if len(starts) > 0:
+        # Reduce each run [start, end), the appended value makes `end == len(differences)` a valid index.
+        bounds = np.column_stack([starts, ends]).ravel()
+        magnitudes = np.maximum.reduceat(np.append(np.abs(differences), 0), bounds)[::2]
+    else:
+        magnitudes = np.empty(0, dtype=differences.dtype)
+    return {"position": starts, "run_length": ends - starts, "magnitude": magnitudes}
@@ -1,10 +1,27 @@
 #!/usr/bin/env python3
 
 import abc
-from dash.dependencies import Input, Output
-from dash import html
-import plotly.express as px
+from collections import OrderedDict
+import concurrent.futures
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+import threading
+import time
+from typing import Optional
+
+from dash.dependencies import ALL, Input, Output, State
+from dash import ctx, dcc, html, no_update
+import plotly.colors
+import plotly.io
 from data_adapter.data_adapter import DataAdapter
+from evaluation_semantics import _features
+from evaluation_semantics import _metrics
+from evaluation_semantics import _payload
+
+logger = logging.getLogger(__name__)
 
 
 class EvaluationSemanticsBase(abc.ABC):
@@ -19,6 +36,7 @@ class EvaluationSemanticsBase(abc.ABC):
 
         self.adapter = adapter
         self.mode = mode
+        self.progress_callback = None
         assert (
             mode in self._SUPPORTED_MODES
         ), f"Specified mode '{mode}' is not supported. Must be one of {str(self._SUPPORTED_MODES)}."
@@ -38,6 +56,69 @@ class EvaluationSemanticsBase(abc.ABC):
         """Abstract method to be overridden to return the (plotly) figure to be displayed."""
         pass
 
+    def get_parts(self) -> dict:
+        """Returns the parts of the evaluation filled by the dispatcher (see `register_dispatcher`) once selected.
+
+        Each part is a mapping of its name to the method returning its content. Every part needs a matching html
+        element (see `create_default_part_html`). Subclasses with further parts should extend the default ones.
+        """
+        return {"heading": self.get_name, "info": self.get_info_text, "figure": self.get_figure}
+
+    def get_figure_states(self) -> list:
+        """Returns the (dash) states whose values are passed as arguments to `get_figure` by the dispatcher.
+
+        Subclasses whose figure depends on further controls (e.g. a dropdown) should override this method.
+        """
+        return list()
+
+    def is_filtered(self) -> bool:
+        """Returns whether the evaluation shows only the rows within the range selected via `_cross_filter`.
+
+        Only the `table_columns` of the adapter are filtered (see `_filter`), thus evaluations of other columns (e.g.
+        `points`, one row per sample rather than per echo) show all of their data and should return `False`.
+        """
+        return True
+
+    def get_features(self) -> list:
+        """Returns the derived features (e.g. `"ranks(amplitude)"`) consumed by the evaluation, see `feature`.
+
+        They are computed once per adapter and shared by all evaluations. Subclasses using features should override
+        this method, so that the features can be computed upfront (e.g. by `warm_up`).
+        """
+        return list()
+
+    def get_filter_sources(self) -> list:
+        """Returns the graphs in which selecting a range (via box select) filters all evaluations, see `_cross_filter`.
+
+        Each source is a tuple of the id of the graph and the column along its x axis, either a column name (or
+        `_filter.INDEX` for the position of the rows) or a (dash) state whose value is the column name.
+        """
+        return list()
+
+    def feature(self, spec: str):
+        """Returns the derived feature `spec` (e.g. `"diff(timestamp)"`) of the adapter, see `_features.get`."""
+        return _features.get(self.adapter, spec)
+
+    def measure(self, method: str):
+        """Returns a context manager recording the performance of the enclosed call of `method` in `METRICS`.
+
+        Calls via `return_data_or_empty_list` are measured already, callbacks calling methods directly (e.g. for
+        zooming) should use it.
+        """
+        return METRICS.measure(self.get_name(), method)
+
+    def get_warmup_arguments(self) -> list:
+        """Returns the arguments of `get_figure` to precompute by `warm_up`, one tuple of state values each.
+
+        By default this is the figure shown on first selection, i.e. with all states (see `get_figure_states`) still
+        being unset. Subclasses may add further ones, e.g. for each value of their controls.
+        """
+        return [tuple(None for _ in self.get_figure_states())]
+
+    def part_id(self, part: str) -> dict:
+        """Returns the (pattern-matching) id of the html element of `part`."""
+        return {"type": f"evaluation-{part}", "name": self.get_name()}
+
     def create_html(self, element):
         """Creates the default html elements. If anything else is needed this method should be overridden by its subclass.
         Partial use of default creation (in the subclass) is possible as well via direct call to the respective method.
@@ -55,7 +136,7 @@ class EvaluationSemanticsBase(abc.ABC):
         Args:
             element: The list to be added as 'children' in the overall html struture lateron.
         """
-        element.append(html.H3(id="{name}-heading".format(name=self.get_name())))
+        self.create_default_part_html(element, "heading")
 
     def create_default_info_html(self, element):
         """Creates the default html element for the 'info' section only.
@@ -63,7 +144,7 @@ class EvaluationSemanticsBase(abc.ABC):
         Args:
             element: The list to be added as 'children' in the overall html struture lateron.
         """
-        element.append(html.H3(id="{name}-info".format(name=self.get_name())))
+        self.create_default_part_html(element, "info")
 
     def create_default_figure_html(self, element):
         """Creates the default html element for the 'figure' section only.
@@ -71,71 +152,187 @@ class EvaluationSemanticsBase(abc.ABC):
         Args:
             element: The list to be added as 'children' in the overall html struture lateron.
         """
-        element.append(html.H3(id="{name}-figure".format(name=self.get_name())))
+        self.create_default_part_html(element, "figure")
 
-    def register(self, app):
-        """Creates the default callbacks matching the default html elements as created via `create_html`.
-        If anything else is needed this method should be overridden by its subclass.
-        Partial use of default creation (in the subclass) is possible as well via direct call to the respective method.
+    def create_default_part_html(self, element, part: str):
+        """Creates the default html element for any part as returned by `get_parts`.
 
         Args:
-            app: The dash app where the callbacks need to be registered.
+            element: The list to be added as 'children' in the overall html struture lateron.
+            part: Name of the part.
         """
-        self.register_default_name(app)
-        self.register_default_info(app)
-        self.register_default_figure(app)
+        element.append(html.H3(id=self.part_id(part)))
 
-    def register_default_name(self, app):
-        """Creates the default callback matching the default html element as created via `create_html` or
-        `create_default_name_html`.
+    def register(self, app):
+        """Registers the callbacks of the evaluation besides the ones of its parts, which are all served by the
+        dispatcher (see `register_dispatcher`). By default there are none, subclasses with further interactive
+        elements (e.g. zooming) should override this method.
 
         Args:
-            app: The dash app where the default `name` callback needs to be registered.
+            app: The dash app where the callbacks need to be registered.
         """
+        pass
 
-        def _function_return_name(selected_dropdown_values):
-            return return_data_or_empty_list(selected_dropdown_values, self, self.get_name)
+    @property
+    def reports_progress(self) -> bool:
+        """Returns whether progress (see `report_progress`) is shown, i.e. computed as background job."""
+        return self.progress_callback is not None
 
-        app.callback(
-            Output("{name}-heading".format(name=self.get_name()), "children"),
-            [Input("dropdown-selection-evaluation", "value")],
-        )(_function_return_name)
-
-    def register_default_info(self, app):
-        """Creates the default callback matching the default html element as created via `create_html` or
-        `create_default_info_html`.
+    def report_progress(self, message: str, partial=None):
+        """Reports the progress of a running computation (e.g. `get_figure`), which is shown in the dashboard if
+        computed as background job. Subclasses with long running computations should call it for each step.
 
         Args:
-            app: The dash app where the default `info` callback needs to be registered.
+            message: Short description of the current step.
+            partial: Optional preliminary result (e.g. a figure from a subsample), shown until the computation is
+                done. As it is computed in vain otherwise, only create it if `reports_progress` is set.
         """
+        if self.progress_callback is not None:
+            self.progress_callback(message, partial)
 
-        def _function_return_info(selected_dropdown_values):
-            return return_data_or_empty_list(selected_dropdown_values, self, self.get_info_text)
+    def create_background_html(self, element):
+        """Creates the html elements needed to compute the figure as background job (see `register_background`).
 
-        app.callback(
-            Output("{name}-info".format(name=self.get_name()), "children"),
-            [Input("dropdown-selection-evaluation", "value")],
-        )(_function_return_info)
+        Args:
+            element: The list to be added as 'children' in the overall html struture lateron.
+        """
+        element.append(dcc.Store(id=self.part_id("request")))
+        element.append(html.P(id=self.part_id("progress"), style={"display": "none"}))
+        element.append(html.Div(id=self.part_id("partial"), style={"display": "none"}))
+
+    def register_background(self, app, manager):
+        """Registers the callback computing the figure as background job, requested via the dispatcher.
 
-    def register_default_figure(self, app):
-        """Creates the default callback matching the default html element as created via `create_html` or
-        `create_default_figure_html`.
+        The job runs in its own process, thus neither blocks the dashboard nor other evaluations. It reports its
+        progress and partial results (see `report_progress`) and is terminated as soon as the evaluation gets
+        deselected.
 
         Args:
-            app: The dash app where the default `figure` callback needs to be registered.
+            app: The dash app where the callback needs to be registered.
+            manager: The manager running the jobs, see `create_background_manager`.
         """
 
-        def _function_return_simple_figure(selected_dropdown_values):
-            return return_data_or_empty_list(selected_dropdown_values, self, self.get_figure)
+        def _function_return_figure(set_progress, request, *state_values):
+            if not request:
+                return list()
+            partial_results = [list()]
+
+            def _progress(message, partial):
+                if partial is not None:
+                    partial_results[0] = partial
+                set_progress([message, partial_results[0]])
+
+            self.progress_callback = _progress
+            self.report_progress("Starting...")
+            try:
+                return return_data_or_empty_list([self.get_name()], self, self.get_figure, *state_values)
+            finally:
+                self.progress_callback = None
 
         app.callback(
-            Output("{name}-figure".format(name=self.get_name()), "children"),
-            [Input("dropdown-selection-evaluation", "value")],
-        )(_function_return_simple_figure)
+            Output(self.part_id("figure"), "children", allow_duplicate=True),
+            [Input(self.part_id("request"), "data")],
+            self.get_figure_states(),
+            background=True,
+            manager=manager,
+            progress=[Output(self.part_id("progress"), "children"), Output(self.part_id("partial"), "children")],
+            progress_default=["", list()],
+            running=[
+                (Output(self.part_id("progress"), "style"), {"display": "block"}, {"display": "none"}),
+                (Output(self.part_id("partial"), "style"), {"display": "block"}, {"display": "none"}),
+            ],
+            prevent_initial_call=True,
+        )(_function_return_figure)
+
+
+def register_dispatcher(app, evaluations, background: bool = False):
+    """Registers the single callback serving the parts of all evaluations (see `get_parts`).
+
+    On every change of the selection only the parts of newly selected evaluations are computed and the ones of
+    deselected evaluations are cleared, all other parts are left untouched. Thus adding an evaluation to the selection
+    neither re-computes the already visible ones nor results in a callback per evaluation and part.
+    The previous selection is kept in the `dcc.Store` with id `SELECTION_STORE_ID`, which needs to be part of the
+    layout. Elements with the id `evaluation.part_id("controls")` (if any) are shown only while selected.
 
+    Args:
+        app: The dash app where the dispatcher needs to be registered.
+        evaluations: All evaluations, their html elements need to be part of the layout.
+        background: Whether the figures are computed as background jobs (see `register_background`). If so, the
+            dispatcher only sets the request of each evaluation instead of computing its figure.
+    """
+    evaluations_by_name = {e.get_name(): e for e in evaluations}
+    parts = sorted({part for e in evaluations for part in e.get_parts() if not (background and part == "figure")})
+    toggled_parts = {p: v for p, v in _TOGGLED_PARTS.items() if background or p != "request"}
+    figure_states = {e.get_name(): e.get_figure_states() for e in evaluations}
+    states = [state for e in evaluations for state in figure_states[e.get_name()]]
+
+    def _function_dispatch(selected_dropdown_values, previous_values, *state_values):
+        selected = set(selected_dropdown_values or list())
+        previous = set(previous_values or list())
+        arguments = dict()
+        for e in evaluations:
+            number_of_states = len(figure_states[e.get_name()])
+            arguments[e.get_name()], state_values = state_values[:number_of_states], state_values[number_of_states:]
+
+        results = list()
+        for outputs in ctx.outputs_list[:-1]:
+            results.append(list())
+            for output in outputs:
+                name = output["id"]["name"]
+                part = output["id"]["type"][len("evaluation-") :]
+                if name in selected and name not in previous:
+                    if part in toggled_parts:
+                        results[-1].append(toggled_parts[part][1])
+                        continue
+                    evaluation = evaluations_by_name[name]
+                    method = evaluation.get_parts()[part]
+                    args = arguments[name] if method == evaluation.get_figure else tuple()
+                    results[-1].append(return_data_or_empty_list(selected, evaluation, method, *args))
+                elif name in previous and name not in selected:
+                    results[-1].append(toggled_parts[part][2] if part in toggled_parts else list())
+                else:
+                    results[-1].append(no_update)
+        return results + [sorted(selected)]
+
+    app.callback(
+        [Output({"type": f"evaluation-{part}", "name": ALL}, "children") for part in parts]
+        + [Output({"type": f"evaluation-{part}", "name": ALL}, v[0]) for part, v in toggled_parts.items()]
+        + [Output(SELECTION_STORE_ID, "data")],
+        [Input("dropdown-selection-evaluation", "value")],
+        [State(SELECTION_STORE_ID, "data")] + states,
+    )(_function_dispatch)
+
+
+def create_background_manager(cache_directory: Path, adapter: DataAdapter):
+    """Creates the manager running callbacks as background jobs in local processes, backed by a disk cache.
+
+    Results are kept in the cache (keyed by the arguments of the callback and the data token of `adapter`), thus
+    requesting the same figure again returns immediately. Requires `diskcache` (`pip install dash[diskcache]`).
 
-UNIFIED_COLOR_SCHEME = px.colors.sequential.Bluyl_r
-DIVERGING_COLOR_SCHEME = px.colors.diverging.RdBu
+    Args:
+        cache_directory: Directory of the disk cache exchanging jobs, progress and results between the processes.
+        adapter: The data adapter all evaluations work on.
+    """
+    try:
+        import diskcache
+    except ImportError as e:
+        raise ImportError(
+            "Background callbacks require `diskcache`, install it via `pip install dash[diskcache]`."
+        ) from e
+    from dash import DiskcacheManager
+
+    return DiskcacheManager(diskcache.Cache(str(cache_directory)), cache_by=[lambda: adapter.data_token])
+
+
+SELECTION_STORE_ID = "evaluation-selection-store"
+# Parts (see `register_dispatcher`) which are not computed but only toggled. Mapped to their property and its values
+# when selected and deselected respectively.
+_TOGGLED_PARTS = {
+    "controls": ("style", {"display": "block"}, {"display": "none"}),
+    "request": ("data", True, None),
+}
+UNIFIED_COLOR_SCHEME = plotly.colors.sequential.Bluyl_r
+DIVERGING_COLOR_SCHEME = plotly.colors.diverging.RdBu
 DASHBOARD_WIDTH = 1400
 NOTEBOOK_WIDTH = 850
 PLOT_HEIGHT = 1000
@@ -155,6 +352,197 @@ def unify_layout(figure):
     figure.update_layout(layout, template=template)
 
 
+def relayout_range(relayout_data, axis="xaxis"):
+    """Extracts the range of `axis` from the `relayoutData` of a `dcc.Graph` (e.g. after zooming).
+
+    Args:
+        relayout_data: The `relayoutData` property as passed to the callback.
+        axis: Name of the axis in the figure layout.
+    Returns:
+        Tuple of the lower and upper limit, `None` if the axis has been reset to its full range and `False` if the
+        axis range has not been changed at all (e.g. only the other axis has been zoomed).
+    """
+    if not relayout_data:
+        return False
+    if relayout_data.get(f"{axis}.autorange"):
+        return None
+    if f"{axis}.range[0]" in relayout_data and f"{axis}.range[1]" in relayout_data:
+        return (relayout_data[f"{axis}.range[0]"], relayout_data[f"{axis}.range[1]"])
+    if f"{axis}.range" in relayout_data:
+        return tuple(relayout_data[f"{axis}.range"])
+    return False
+
+
+class FigureCache:
+    def __init__(self, max_entries: int = 64, max_bytes: int = 256 << 20, directory: Optional[Path] = None):
+        """Least recently used cache for the results of the evaluations (i.e. figures).
+
+        Entries are keyed by `figure_cache_key`, thus they become stale as soon as the data of the adapter changes.
+        The size of an entry is the size of its serialized (json) form, which is what is sent to the browser. It is
+        estimated from the arrays and strings of the entry unless the entry is serialized anyway (see `get_or_compute`).
+        Optionally, serialized entries are also written to `directory`, so that they survive restarts of the
+        dashboard as long as the data does not change.
+
+        Args:
+            max_entries: Maximum number of entries held in memory.
+            max_bytes: Maximum summed size of the entries held in memory, larger entries are not cached at all.
+            directory: Optional directory for the on-disk tier.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.directory = Path(directory) if directory is not None else None
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key, compute, persistent: bool = False, on_serialized=None):
+        """Returns the entry for `key`, calling `compute` to create it on a miss.
+
+        Args:
+            key: The key as created via `figure_cache_key`.
+            compute: Callable without arguments creating the entry. Entries are shared by all callers, thus must not be
+                modified (e.g. results in notebook mode are not cached at all, see `return_data_or_empty_list`).
+            persistent: Whether to use the on-disk tier. Note that entries loaded from disk are the deserialized
+                json, not the original (e.g. plotly or dash) objects, thus this only suits results sent to the browser.
+            on_serialized: Optional callable taking the seconds needed to serialize a computed entry and the
+                serialized entry (json string), e.g. to record metrics.
+
+        Computed entries are only serialized for the on-disk tier or `on_serialized`, since dash serializes the
+        response again anyway. Otherwise their size is estimated via `_payload.estimate_size`.
+        """
+        digest = hashlib.sha1(repr(key).encode()).hexdigest()
+        with self._lock:
+            if digest in self._entries:
+                self._entries.move_to_end(digest)
+                return self._entries[digest][0]
+
+        file_path = self.directory / f"{digest}.json" if persistent and self.directory is not None else None
+        if file_path is not None and file_path.is_file():
+            serialized = file_path.read_text()
+            value = json.loads(serialized)
+        else:
+            value = compute()
+            serialized = None
+            if file_path is not None or on_serialized is not None:
+                start = time.perf_counter()
+                serialized = plotly.io.json.to_json_plotly(value)
+                if on_serialized is not None:
+                    on_serialized(time.perf_counter() - start, serialized)
+            if file_path is not None:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                temporary_path = file_path.with_suffix(f".{os.getpid()}.tmp")
+                temporary_path.write_text(serialized)
+                os.replace(temporary_path, file_path)
+
+        self._put(digest, value, len(serialized) if serialized is not None else _payload.estimate_size(value))
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _put(self, digest, value, nbytes):
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if digest in self._entries:
+                self._bytes -= self._entries.pop(digest)[1]
+            self._entries[digest] = (value, nbytes)
+            self._bytes += nbytes
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_bytes) = self._entries.popitem(last=False)
+                self._bytes -= evicted_bytes
+
+
+# The cache used by all callbacks, see `return_data_or_empty_list`.
+FIGURE_CACHE = FigureCache()
+# The performance metrics of all evaluation calls, see `_metrics`. Only recorded once registered (i.e. `--metrics`).
+METRICS = _metrics.Metrics(enabled=False)
+# How results are sent to the browser, see `configure_payloads`.
+PAYLOAD_OPTIONS = dict(typed_arrays=True, report_sizes=False)
+
+
+def configure_figure_cache(
+    max_entries: Optional[int] = None, max_bytes: Optional[int] = None, directory: Optional[Path] = None
+):
+    """Changes the limits and the on-disk directory of `FIGURE_CACHE`, arguments being `None` are left unchanged."""
+    if max_entries is not None:
+        FIGURE_CACHE.max_entries = max_entries
+    if max_bytes is not None:
+        FIGURE_CACHE.max_bytes = max_bytes
+    if directory is not None:
+        FIGURE_CACHE.directory = Path(directory)
+
+
+def configure_payloads(typed_arrays: Optional[bool] = None, report_sizes: Optional[bool] = None):
+    """Changes `PAYLOAD_OPTIONS`, arguments being `None` are left unchanged.
+
+    Args:
+        typed_arrays: Whether numeric arrays of figures in dashboard mode are sent as typed arrays (see `_payload`).
+        report_sizes: Whether `METRICS` also records the size of each result with plain json lists and compressed,
+            which costs an extra serialization and compression per computed result.
+    """
+    if typed_arrays is not None:
+        PAYLOAD_OPTIONS["typed_arrays"] = typed_arrays
+    if report_sizes is not None:
+        PAYLOAD_OPTIONS["report_sizes"] = report_sizes
+
+
+def encode_payload(value):
+    """Returns `value` (e.g. a figure returned by a callback) as to be sent to the browser, see `configure_payloads`."""
+    return _payload.encode(value) if PAYLOAD_OPTIONS["typed_arrays"] else value
+
+
+def figure_cache_key(instance, method, args):
+    """Returns the key of the result of `method` of the evaluation `instance` called with `args`."""
+    return (instance.get_name(), method.__name__, repr(args), instance.mode, instance.adapter.data_token)
+
+
+def warm_up(evaluations, max_workers: Optional[int] = None) -> dict:
+    """Computes all parts (see `get_parts`) of `evaluations` concurrently, filling `FIGURE_CACHE`.
+
+    First, the features declared by all evaluations (see `get_features`) are computed. Then the figures are computed
+    for the arguments returned by `get_warmup_arguments`, exactly as the dispatcher would, thus the first selection of
+    an evaluation is served from the cache. Threads are used since the cache lives in this process and most of the
+    work is done by numpy, which releases the GIL. Note that the limits of the cache need to be large enough to hold
+    the results of all evaluations.
+
+    Args:
+        evaluations: The evaluations to compute.
+        max_workers: Maximum number of threads, see `concurrent.futures.ThreadPoolExecutor`.
+    Returns:
+        Mapping of the name of each evaluation to the seconds it took (`None` if it failed).
+    """
+
+    def _compute(evaluation):
+        name = evaluation.get_name()
+        start = time.perf_counter()
+        try:
+            for method in evaluation.get_parts().values():
+                arguments = evaluation.get_warmup_arguments() if method == evaluation.get_figure else [tuple()]
+                for args in arguments:
+                    return_data_or_empty_list([name], evaluation, method, *args)
+        except Exception:
+            logger.exception("Warm-up of '%s' failed.", name)
+            return None
+        duration = time.perf_counter() - start
+        logger.info("Warmed up '%s' in %.2f s.", name, duration)
+        return duration
+
+    start = time.perf_counter()
+    for adapter in {id(e.adapter): e.adapter for e in evaluations}.values():
+        # Features shared by several evaluations are computed only once, before any evaluation waits for them.
+        _features.prefetch(
+            adapter, [f for e in evaluations if e.adapter is adapter for f in e.get_features()], max_workers
+        )
+    logger.info("Computed the features in %.2f s.", time.perf_counter() - start)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        durations = dict(zip([e.get_name() for e in evaluations], executor.map(_compute, evaluations)))
+    logger.info("Warmed up %d evaluations in %.2f s.", len(evaluations), time.perf_counter() - start)
+    return durations
+
+
 def return_data_or_empty_list(ui_value, instance, method, *args):
     """Returns the data as provided by the return value of `method` if the `instance`-name is in `ui_value`
     (which corresponds to the dropdown menu).
@@ -167,13 +555,44 @@ def return_data_or_empty_list(ui_value, instance, method, *args):
         *args: Further arguments that need to be passed to `method` (without any checks).
     Returns:
         An empty list if the specified evaluation has not been selected in the dashboard else
-        the data as returned via the callable `method`.
+        the data as returned via the callable `method`. In dashboard mode, it is cached in `FIGURE_CACHE` (thus
+        shared by all callers) and its figures are encoded via `encode_payload`. In notebook mode, it is computed on
+        every call, since the caller may modify it (e.g. `update_layout`) and nothing is sent.
     """
     if ui_value is None:
         return list()
     if instance.get_name() in ui_value:
-        if len(args) > 0:
-            return method(args)
-        else:
-            return method()
+        labels = dict(evaluation=instance.get_name(), method=method.__name__)
+        if instance.mode != "dashboard":
+            with METRICS.measure(**labels):
+                return method(args) if len(args) > 0 else method()
+        cache = ["hit"]
+
+        def _compute():
+            cache[0] = "miss"
+            with METRICS.measure(**labels):
+                result = method(args) if len(args) > 0 else method()
+            if PAYLOAD_OPTIONS["report_sizes"]:
+                plain = plotly.io.json.to_json_plotly(result)
+                METRICS.observe("evaluation_plain_payload_bytes", len(plain), **labels)
+                compressed = _payload.compress(plain.encode(), _payload.available_encodings()[0])
+                METRICS.observe("evaluation_plain_compressed_payload_bytes", len(compressed), **labels)
+            return encode_payload(result)
+
+        def _on_serialized(seconds, serialized):
+            METRICS.observe("evaluation_serialization_seconds", seconds, **labels)
+            METRICS.observe("evaluation_payload_bytes", len(serialized), **labels)
+            if PAYLOAD_OPTIONS["report_sizes"]:
+                compressed = _payload.compress(serialized.encode(), _payload.available_encodings()[0])
+                METRICS.observe("evaluation_compressed_payload_bytes", len(compressed), **labels)
+
+        # Serializing only to record its time and size is skipped unless metrics are recorded.
+        result = FIGURE_CACHE.get_or_compute(
+            figure_cache_key(instance, method, args),
+            _compute,
+            persistent=True,
+            on_serialized=_on_serialized if METRICS.enabled else None,
+        )
+        METRICS.count("evaluation_calls_total", cache=cache[0], **labels)
+        return result
     return list()
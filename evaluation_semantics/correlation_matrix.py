@@ -2,20 +2,17 @@ from dash import dcc
 from dash import html
 import numpy as np
 import plotly.graph_objects as go
-import scipy.stats as stats
 
 import evaluation_semantics.base as base
-
-
-def spearmanr_correlation(x, y):
-    return stats.spearmanr(x, y)[0]
-
-
-def spearmanr_pvalues(x, y):
-    return stats.spearmanr(x, y)[1]
+from evaluation_semantics import _spearman
 
 
 class CorrelationMatrixEvaluation(base.EvaluationSemanticsBase):
+    # Recordings with more echoes are correlated on a random subsample of this size.
+    MAX_SAMPLES = 1_000_000
+    # Size of the subsample correlated first as partial result, if computed as background job.
+    PREVIEW_SAMPLES = 10_000
+
     def __init__(self, reader, mode="notebook"):
         super().__init__(reader, mode)
 
@@ -25,12 +22,32 @@ class CorrelationMatrixEvaluation(base.EvaluationSemanticsBase):
     def get_name(self):
         return "Correlation Matrix"
 
-    def get_figure(self):
-        echoes = self.adapter.echoes
+    def get_features(self):
+        if not self.adapter.in_memory:
+            return [f"rank_lookup({c}, {_spearman.CHUNKED_BINS})" for c in self.adapter.echo_columns]
+        if len(self.adapter.echoes) <= self.MAX_SAMPLES:
+            return [f"ranks({c})" for c in self.adapter.echo_columns]
+        # Subsamples are ranked on their own.
+        return list()
 
-        correlation = echoes.corr(method=spearmanr_correlation)
-        pvalues = echoes.corr(method=spearmanr_pvalues)
+    def get_figure(self):
+        if self.adapter.in_memory:
+            echoes = self.adapter.echoes
+            if self.reports_progress and len(echoes) > self.PREVIEW_SAMPLES:
+                self.report_progress(
+                    f"Correlating {min(len(echoes), self.MAX_SAMPLES)} echoes, showing a preview...",
+                    self._create_figure(*_spearman.spearman(echoes, max_samples=self.PREVIEW_SAMPLES), preview=True),
+                )
+            if len(echoes) > self.MAX_SAMPLES:
+                correlation, pvalues = _spearman.spearman(echoes, max_samples=self.MAX_SAMPLES)
+            else:
+                correlation, pvalues = _spearman.spearman_features(self.adapter, self.adapter.echo_columns)
+        else:
+            self.report_progress("Ranking and correlating the echoes chunk by chunk...")
+            correlation, pvalues = _spearman.spearman_chunked(self.adapter, self.adapter.echo_columns)
+        return self._create_figure(correlation, pvalues)
 
+    def _create_figure(self, correlation, pvalues, preview=False):
         mask = np.zeros_like(correlation, dtype=np.bool)
         mask[np.triu_indices_from(mask)] = True
         mask[np.diag_indices(len(mask))] = False
@@ -40,7 +57,7 @@ class CorrelationMatrixEvaluation(base.EvaluationSemanticsBase):
         column_names = correlation_upper_triangle.columns.values
         hovertext = [
             [
-                f"correlation({column_names[i]}, {column_names[j]})= {correlation.iloc[i][j]:.2f}, p_value= {pvalues.iloc[i][j]:.3f}"
+                f"correlation({column_names[i]}, {column_names[j]})= {correlation.iloc[i, j]:.2f}, p_value= {pvalues.iloc[i, j]:.3f}"
                 if i >= j
                 else ""
                 for j in range(length)
@@ -62,7 +79,9 @@ class CorrelationMatrixEvaluation(base.EvaluationSemanticsBase):
             hoverinfo="text",
         )
         layout = go.Layout(
-            title_text="Spearman Correlation Matrix",
+            title_text=f"Spearman Correlation Matrix (preview of {self.PREVIEW_SAMPLES} echoes)"
+            if preview
+            else "Spearman Correlation Matrix",
             title_x=0.5,
             width=800,
             height=800,
@@ -1,10 +1,16 @@
-from dash.dependencies import Input, Output
+from dash import no_update
+from dash.dependencies import Input, Output, State
 from dash import dcc
 from dash import html
 import plotly.graph_objects as go
 import numpy as np
 
 import evaluation_semantics.base as base
+from evaluation_semantics._histogram_pyramid import HistogramPyramid
+
+# Minimum number of bins shown for properties without a fixed set of levels, also when zoomed in.
+DEFAULT_NUMBER_OF_BINS = 100
+GRAPH_ID = "echo-property-histogram-graph"
 
 
 class EchoPropertyHistogramEvaluation(base.EvaluationSemanticsBase):
@@ -29,12 +35,28 @@ class EchoPropertyHistogramEvaluation(base.EvaluationSemanticsBase):
     def get_name(self):
         return "Echo Property Histogram"
 
+    def get_features(self):
+        return [
+            f"histogram({c}, {len(self.xtick_text_mapping[c])})"
+            if self.xtick_text_mapping[c]
+            else f"histogram_pyramid({c})"
+            for c in self.adapter.echo_columns
+        ]
+
+    def get_filter_sources(self):
+        return [(GRAPH_ID, State("dropdown-echo-property", "value"))]
+
     def get_figure(self, echo_property_args):
+        """Returns the histogram of an echo property.
+
+        Args:
+            echo_property_args: Sequence of the name of the echo property and optionally the visible range of values.
+                Given a range, only that range is shown, re-binned in finer resolution.
+        """
         echo_property = echo_property_args[0]
-        echoes = self.adapter.echoes
-        columns = self.adapter.echoes.columns
+        visible_range = echo_property_args[1] if len(echo_property_args) > 1 else None
 
-        if echo_property not in columns:
+        if echo_property not in self.adapter.echo_columns:
             return list()
 
         tick_text = self.xtick_text_mapping[echo_property]
@@ -45,89 +67,94 @@ class EchoPropertyHistogramEvaluation(base.EvaluationSemanticsBase):
             yaxis_title="[N] measurements",
         )
         if tick_text:
+            # Binning is done chunk-wise here rather than in the browser, thus only the counts need to be sent.
+            counts, edges = self.feature(f"histogram({echo_property}, {len(tick_text)})")
+            # One bin per level, thus each level is labeled at the centre of its bin.
             layout.update(
                 xaxis_tickmode="array",
-                xaxis_tickvals=np.arange(len(tick_text)),
+                xaxis_tickvals=(edges[:-1] + edges[1:]) / 2,
                 xaxis_ticktext=tick_text,
             )
-            figure = go.Figure(
-                data=[
-                    go.Histogram(
-                        x=echoes[echo_property],
-                        nbinsx=len(tick_text),
-                        marker={"color": base.UNIFIED_COLOR_SCHEME[0]},
-                    ),
-                ],
-                layout=layout,
-            )
         else:
-            figure = go.Figure(
-                data=[
-                    go.Histogram(
-                        x=echoes[echo_property],
-                        marker={"color": base.UNIFIED_COLOR_SCHEME[0]},
-                    )
-                ],
-                layout=layout,
-            )
+            pyramid = HistogramPyramid.from_adapter(self.adapter, echo_property)
+            counts, edges = pyramid.histogram(visible_range, DEFAULT_NUMBER_OF_BINS)
+            if visible_range is not None:
+                layout.update(xaxis_range=visible_range, xaxis_rangeslider_range=pyramid.value_range)
+        figure = go.Figure(
+            data=[
+                go.Bar(
+                    x=(edges[:-1] + edges[1:]) / 2,
+                    y=counts,
+                    width=np.diff(edges),
+                    marker={"color": base.UNIFIED_COLOR_SCHEME[0]},
+                )
+            ],
+            layout=layout,
+        )
 
         if self.mode == "dashboard":
             base.unify_layout(figure)
             figure.update_layout(autosize=False, width=base.DASHBOARD_WIDTH)
-            return dcc.Graph(figure=figure)
+            return dcc.Graph(id=GRAPH_ID, figure=figure, config={"modeBarButtonsToAdd": ["select2d"]})
         elif self.mode == "notebook":
             figure.update_layout(autosize=False, width=base.NOTEBOOK_WIDTH)
             return figure
 
     def create_html(self, element):
-        columns = self.adapter.echoes.columns
-        options = [{"value": c, "label": c} for c in columns]
+        options = [{"value": c, "label": c} for c in self.adapter.echo_columns]
 
         self.create_default_heading_html(element)
         self.create_default_info_html(element)
         element.append(
             html.Div(
-                [
-                    dcc.Dropdown(
-                        id="dropdown-echo-property",
-                        multi=False,
-                        options=options,
-                        style=dict(width=40),
-                    )
-                ],
-                style={"width": "350px", "margin-left": "15px"},
+                id=self.part_id("controls"),
+                style={"display": "none"},
+                children=html.Div(
+                    [
+                        dcc.Dropdown(
+                            id="dropdown-echo-property",
+                            multi=False,
+                            options=options,
+                            style=dict(width=40),
+                        )
+                    ],
+                    style={"width": "350px", "margin-left": "15px"},
+                ),
             )
         )
         self.create_default_figure_html(element)
 
+    def get_figure_states(self):
+        return [State("dropdown-echo-property", "value")]
+
+    def get_warmup_arguments(self):
+        return super().get_warmup_arguments() + [(c,) for c in self.adapter.echo_columns]
+
     def register(self, app):
-        def _function_return_simple_figure(selected_dropdown_values, echo_property_value):
+        def _function_return_simple_figure(echo_property_value, selected_dropdown_values):
             return base.return_data_or_empty_list(selected_dropdown_values, self, self.get_figure, echo_property_value)
 
-        # Default callbacks
-        self.register_default_name(app)
-        self.register_default_info(app)
+        def _function_return_zoomed_figure(relayout_data, echo_property_value):
+            visible_range = base.relayout_range(relayout_data)
+            if visible_range is False or echo_property_value not in self.adapter.echo_columns:
+                return no_update
+            if self.xtick_text_mapping[echo_property_value]:
+                # Properties with tick texts (i.e. levels) are not re-binned, the browser zooms on its own.
+                return no_update
+            with self.measure("zoom"):
+                return base.encode_payload(self.get_figure([echo_property_value, visible_range]).figure)
 
-        # Custom callbacks start here
         app.callback(
-            Output("{name}-figure".format(name=self.get_name()), "children"),
-            [
-                Input("dropdown-selection-evaluation", "value"),
-                Input("dropdown-echo-property", "value"),
-            ],
-        )(_function_return_simple_figure)
+            Output(GRAPH_ID, "figure"),
+            [Input(GRAPH_ID, "relayoutData")],
+            [State("dropdown-echo-property", "value")],
+            prevent_initial_call=True,
+        )(_function_return_zoomed_figure)
 
-        @app.callback(
-            Output(component_id="dropdown-echo-property", component_property="style"),
-            [
-                Input(
-                    component_id="dropdown-selection-evaluation",
-                    component_property="value",
-                )
-            ],
-        )
-        def show_hide_element(selected_dropdown_values):
-            if selected_dropdown_values and self.get_name() in selected_dropdown_values:
-                return {"display": "block"}
-            else:
-                return {"display": "none"}
+        # The figure is served by the dispatcher on selection, here it is only updated when changing the property.
+        app.callback(
+            Output(self.part_id("figure"), "children", allow_duplicate=True),
+            [Input("dropdown-echo-property", "value")],
+            [State("dropdown-selection-evaluation", "value")],
+            prevent_initial_call=True,
+        )(_function_return_simple_figure)
@@ -2,9 +2,11 @@ from dash import dcc
 from dash import html
 import numpy as np
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 
 import evaluation_semantics.base as base
+from evaluation_semantics import _decimation
+
+GRAPH_ID = "measurement-count-graph"
 
 
 class MeasurementCountEvaluation(base.EvaluationSemanticsBase):
@@ -12,61 +14,63 @@ class MeasurementCountEvaluation(base.EvaluationSemanticsBase):
         super().__init__(reader, mode)
 
     def get_info_text(self):
-        return html.P("Simple plot to show how many measurements are available per sample.")
+        return html.P(
+            "Simple plot to show how many reflex points are available per sample. The echoes are not assigned to "
+            "samples in the data, thus are not counted per sample."
+        )
 
     def get_name(self):
         return "Measurement Count"
 
-    def get_figure(self):
-        number_of_echoes = np.array([len(x) for x in self.adapter.echoes])
-        number_of_points = np.array([len(x) for x in self.adapter.points])
+    def get_features(self):
+        return ["lengths(points)"]
 
-        x_echoes = np.arange(len(number_of_echoes))
-        x_reflex_points = np.arange(len(number_of_points))
+    def is_filtered(self):
+        # The points (one row per sample) are not filtered by the echoes selected via `_cross_filter`.
+        return False
 
-        assert len(x_echoes) == len(x_reflex_points)
-        MAX_SAMPLES_PER_PLOT = 500
-        number_of_subplots = int(np.ceil(len(number_of_echoes) / MAX_SAMPLES_PER_PLOT))
+    def get_figure(self, visible_range=None):
+        """Returns the plot of the number of measurements per sample.
 
-        figure = make_subplots(rows=number_of_subplots, cols=1)
+        Args:
+            visible_range: Optional tuple of the lower and upper sample index to show, the series is decimated to the
+                pixel budget within that range.
+        """
+        # The echoes are stored as one flat row per echo, without the sample they belong to, thus only the reflex points
+        # (one row per sample) can be counted per sample.
+        number_of_points = self.feature("lengths(points)")
 
-        for i in range(number_of_subplots):
-            start = i * MAX_SAMPLES_PER_PLOT
-            end = i * MAX_SAMPLES_PER_PLOT + MAX_SAMPLES_PER_PLOT
-            figure.append_trace(
-                go.Bar(
-                    x=x_echoes[start:end],
-                    y=number_of_echoes[start:end],
-                    marker={"color": base.UNIFIED_COLOR_SCHEME[0]},
-                    name="Subplot {i}: Echoes".format(i=i),
-                ),
-                row=i + 1,
-                col=1,
-            )
-            figure.append_trace(
-                go.Bar(
-                    x=x_reflex_points[start:end],
-                    y=number_of_points[start:end],
-                    marker={"color": base.UNIFIED_COLOR_SCHEME[3]},
-                    name="Subplot {i}: Reflex Points".format(i=i),
-                ),
-                row=i + 1,
-                col=1,
-            )
+        x, y = _decimation.decimate(number_of_points, visible_range)
+        figure = go.Figure(
+            data=[
+                go.Scattergl(
+                    x=x,
+                    y=y,
+                    mode="lines",
+                    line={"color": base.UNIFIED_COLOR_SCHEME[3], "shape": "hvh"},
+                    name="Reflex Points",
+                )
+            ]
+        )
 
         figure.update_layout(
-            barmode="stack",
-            title="Number of valid measurements per sample - mean(echoes) = {me:.2f}, mean(reflex_points) = {mrp:.2f}".format(
-                me=np.mean(number_of_echoes), mrp=np.mean(number_of_points)
+            title="Number of valid measurements per sample - mean(reflex_points) = {mrp:.2f}".format(
+                mrp=np.mean(number_of_points) if len(number_of_points) > 0 else np.nan
             ),
+            uirevision=self.get_name(),
         )
+        if visible_range is not None:
+            figure.update_xaxes(range=visible_range)
         figure.update_yaxes(title_text="[N] measurements", title_standoff=0)
         figure.update_xaxes(title_text="[N] received packages", title_standoff=0)
 
         if self.mode == "dashboard":
             figure.update_layout(autosize=False, width=base.DASHBOARD_WIDTH, height=base.PLOT_HEIGHT)
             base.unify_layout(figure)
-            return dcc.Graph(figure=figure)
+            return dcc.Graph(id=GRAPH_ID, figure=figure)
         elif self.mode == "notebook":
             figure.update_layout(autosize=False, width=base.NOTEBOOK_WIDTH, height=base.PLOT_HEIGHT)
             return figure
+
+    def register(self, app):
+        _decimation.register_zoom(app, GRAPH_ID, self.get_figure)
@@ -0,0 +1,179 @@
+from dash import ctx, dcc, html, no_update
+from dash.dependencies import Input, Output, State
+import plotly.graph_objects as go
+
+import evaluation_semantics.base as base
+from evaluation_semantics._point_index import PointIndex
+
+# Number of bins per axis, also when zoomed in.
+DEFAULT_NUMBER_OF_BINS = 200
+GRAPH_ID = "reflex-point-density-graph"
+QUERY_ID = "reflex-point-density-query"
+# Keeps the visible ranges of the figure, so that zooming one axis keeps the other one and hovering knows the bin size.
+RANGE_STORE_ID = "reflex-point-density-range"
+
+
+class ReflexPointDensityEvaluation(base.EvaluationSemanticsBase):
+    def __init__(self, reader, mode="notebook"):
+        super().__init__(reader, mode)
+
+    def get_info_text(self):
+        return html.P(
+            "Show the density of all reflex points, if the data adapter provides them as x and y coordinates. Zoom in "
+            "to re-bin the visible region, hover a bin to count the points near it or box select a region (via the "
+            "mode bar) to count the points within."
+        )
+
+    def get_name(self):
+        return "Reflex Point Density"
+
+    def get_features(self):
+        return ["point_index(points)"] if self.adapter.point_dimensions == 2 else list()
+
+    def is_filtered(self):
+        # The points (one row per sample) are not filtered by the echoes selected via `_cross_filter`.
+        return False
+
+    def get_figure(self, visible_range=None):
+        """Returns the 2D histogram of the reflex points, binned on the server (the points are never sent).
+
+        Args:
+            visible_range: Optional tuple of the visible x and y range (each a tuple of the lower and upper limit or
+                `None` for the full extent), which is re-binned in finer resolution.
+        """
+        if self.adapter.point_dimensions != 2:
+            # The adapter does not declare its points as x and y coordinates, see `DataAdapter.point_dimensions`.
+            return list()
+        self.report_progress("Indexing the reflex points...")
+        index = PointIndex.from_adapter(self.adapter, "points")
+        x_range, y_range = visible_range if visible_range is not None else (None, None)
+        counts, x_edges, y_edges = index.density(x_range, y_range, DEFAULT_NUMBER_OF_BINS)
+
+        figure = go.Figure(
+            data=[
+                go.Heatmap(
+                    z=counts,
+                    # Given the edges, plotly draws each bin between them (and also supports unequal bin sizes).
+                    x=x_edges,
+                    y=y_edges,
+                    colorscale=base.UNIFIED_COLOR_SCHEME[::-1],
+                    colorbar_title="[N] points",
+                    colorbar_thickness=20,
+                    hovertemplate="x= %{x:.3g}, y= %{y:.3g}: %{z} points<extra></extra>",
+                )
+            ]
+        )
+        figure.update_layout(
+            title=f"Density of {len(index)} reflex points",
+            xaxis_title="x",
+            yaxis_title="y",
+            uirevision=self.get_name(),
+        )
+        if x_range is not None:
+            figure.update_xaxes(range=x_range)
+        if y_range is not None:
+            figure.update_yaxes(range=y_range)
+
+        if self.mode == "dashboard":
+            base.unify_layout(figure)
+            figure.update_layout(autosize=False, width=base.DASHBOARD_WIDTH, height=base.PLOT_HEIGHT)
+            return dcc.Graph(id=GRAPH_ID, figure=figure, config={"modeBarButtonsToAdd": ["select2d"]})
+        elif self.mode == "notebook":
+            figure.update_layout(autosize=False, width=base.NOTEBOOK_WIDTH, height=base.PLOT_HEIGHT)
+            return figure
+
+    def get_region_summary(self, x_range, y_range):
+        """Returns the number of reflex points within the rectangle spanned by `x_range` and `y_range`."""
+        count = PointIndex.from_adapter(self.adapter, "points").count(x_range, y_range)
+        return html.P(
+            "{count} reflex points within x= [{x0:.3g}, {x1:.3g}], y= [{y0:.3g}, {y1:.3g}].".format(
+                count=count, x0=x_range[0], x1=x_range[1], y0=y_range[0], y1=y_range[1]
+            )
+        )
+
+    def get_neighbourhood_summary(self, x, y, visible_range=None):
+        """Returns the number of reflex points within the size of one bin around `(x, y)` and the nearest one.
+
+        Args:
+            x: The x coordinate, e.g. of the hovered bin.
+            y: The y coordinate.
+            visible_range: The visible ranges as passed to `get_figure`, determining the size of the bins.
+        """
+        index = PointIndex.from_adapter(self.adapter, "points")
+        extent = index.extent
+        visible_range = visible_range or (None, None)
+        radius = max(
+            (high - low) / DEFAULT_NUMBER_OF_BINS
+            for low, high in [visible_range[axis] or extent[axis] for axis in range(2)]
+        )
+        count, distance, nearest = index.near(x, y, radius)
+        if nearest is None:
+            return html.P("There are no reflex points.")
+        return html.P(
+            "{count} reflex points within {radius:.3g} of ({x:.3g}, {y:.3g}), the nearest one at ({nx:.3g}, {ny:.3g}) "
+            "in a distance of {distance:.3g}.".format(
+                count=count, radius=radius, x=x, y=y, nx=nearest[0], ny=nearest[1], distance=distance
+            )
+        )
+
+    def create_html(self, element):
+        self.create_default_heading_html(element)
+        self.create_default_info_html(element)
+        self.create_default_figure_html(element)
+        element.append(
+            html.Div(
+                id=self.part_id("controls"),
+                style={"display": "none"},
+                children=[html.P(id=QUERY_ID), dcc.Store(id=RANGE_STORE_ID)],
+            )
+        )
+
+    def register(self, app):
+        def _function_return_zoomed_figure(relayout_data, visible_range):
+            x_range = base.relayout_range(relayout_data, "xaxis")
+            y_range = base.relayout_range(relayout_data, "yaxis")
+            if x_range is False and y_range is False:
+                return no_update, no_update
+            previous_x_range, previous_y_range = visible_range or (None, None)
+            visible_range = (
+                previous_x_range if x_range is False else x_range,
+                previous_y_range if y_range is False else y_range,
+            )
+            with self.measure("zoom"):
+                return base.encode_payload(self.get_figure(visible_range).figure), visible_range
+
+        def _function_return_query(hover_data, selected_data, visible_range):
+            if ctx.triggered_id is None:
+                return no_update
+            if ctx.triggered[0]["prop_id"].endswith(".selectedData"):
+                if not selected_data or "range" not in selected_data:
+                    return no_update
+                with self.measure("count"):
+                    return self.get_region_summary(selected_data["range"]["x"], selected_data["range"]["y"])
+            if not hover_data or not hover_data.get("points"):
+                return no_update
+            point = hover_data["points"][0]
+            with self.measure("near"):
+                return self.get_neighbourhood_summary(point["x"], point["y"], visible_range)
+
+        app.callback(
+            [Output(GRAPH_ID, "figure"), Output(RANGE_STORE_ID, "data")],
+            [Input(GRAPH_ID, "relayoutData")],
+            [State(RANGE_STORE_ID, "data")],
+            prevent_initial_call=True,
+        )(_function_return_zoomed_figure)
+
+        # The range and query refer to the figure computed before, which is replaced on every (re-)computation
+        # (e.g. on switching recordings or changing the filter).
+        app.callback(
+            [Output(RANGE_STORE_ID, "data", allow_duplicate=True), Output(QUERY_ID, "children", allow_duplicate=True)],
+            [Input(base.SELECTION_STORE_ID, "data")],
+            prevent_initial_call=True,
+        )(lambda _: (None, None))
+
+        app.callback(
+            Output(QUERY_ID, "children"),
+            [Input(GRAPH_ID, "hoverData"), Input(GRAPH_ID, "selectedData")],
+            [State(RANGE_STORE_ID, "data")],
+            prevent_initial_call=True,
+        )(_function_return_query)
@@ -1,22 +1,19 @@
-from dash import dcc
-from dash import html
-import numpy as np
+from dash import ctx, dash_table, dcc, html, no_update
+from dash.dependencies import Input, Output, State
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
+from data_adapter import _filter
 import evaluation_semantics.base as base
+from evaluation_semantics import _decimation
+from evaluation_semantics._timestamp_analysis import TimestampAnalysis
 
-
-def _difference_to_last(index, container):
-    if index == 0:
-        return 0
-    if index >= len(container):
-        return 0
-    return container[index] - container[index - 1]
-
-
-def _get_offset(data):
-    return data[data > 0.0][0]
+GRAPH_ID = "timestamps-graph"
+TABLE_ID = "timestamps-events-table"
+# Maximum number of events marked in the plot, the ones with the largest magnitude are preferred.
+MAX_MARKERS = 1000
+# Number of samples shown left and right of an event when jumping to it.
+JUMP_TO_WINDOW = 50
 
 
 class TimestampEvaluation(base.EvaluationSemanticsBase):
@@ -48,50 +45,126 @@ class TimestampEvaluation(base.EvaluationSemanticsBase):
     def get_name(self):
         return "Timestamps"
 
-    def get_figure(self):
-        timestamps_echoes = np.array(self.adapter.timestamps)
+    def get_features(self):
+        return ["timestamp_analysis"]
+
+    def get_filter_sources(self):
+        return [(GRAPH_ID, _filter.INDEX)]
 
-        # Get the relative difference to the previous timestamp. This makes it easier to detect
-        # out of sequence measurements in the plots.
-        difference = [_difference_to_last(i, timestamps_echoes) for i in range(len(timestamps_echoes))]
+    def get_figure(self, visible_range=None):
+        """Returns the plots of the timestamps and their differences.
 
-        # Subtract the first element from all elements since one wouldn't see a difference in the plots.
-        # Make sure that we don't subtract anything from the zero-padded values where no valid echo/reflex point
-        # was available.
-        offset = _get_offset(timestamps_echoes)
-        timestamps_echoes[timestamps_echoes > 0] -= offset
+        Args:
+            visible_range: Optional tuple of the lower and upper sample index to show, the series are decimated to the
+                pixel budget within that range.
+        """
+        self.report_progress("Analysing the timestamps...")
+        analysis = TimestampAnalysis.from_adapter(self.adapter)
 
         figure = make_subplots(
             rows=2,
             cols=1,
+            shared_xaxes=True,
             subplot_titles=(
                 "Out-of-sequence timestamps",
                 "Echo timestamps",
             ),
         )
+        for row, (values, name) in enumerate(
+            [
+                # The relative difference to the previous timestamp makes it easier to detect
+                # out of sequence measurements in the plots.
+                (analysis.differences, "Difference to previous header timestamp"),
+                (analysis.relative_timestamps, "Echo timestamps"),
+            ]
+        ):
+            x, y = _decimation.decimate(values, visible_range)
+            figure.append_trace(
+                go.Scattergl(
+                    x=x,
+                    y=y,
+                    mode="lines",
+                    line={"color": base.UNIFIED_COLOR_SCHEME[0], "shape": "hvh"},
+                    name=name,
+                ),
+                row=row + 1,
+                col=1,
+            )
+        # Jump-to markers for the largest events within the visible range.
+        events = analysis.events()
+        if visible_range is not None:
+            events = [e for e in events if visible_range[0] <= e["position"] <= visible_range[1]]
+        events = sorted(events, key=lambda e: e["magnitude"], reverse=True)[:MAX_MARKERS]
         figure.append_trace(
-            go.Bar(
-                y=difference,
-                marker={"color": base.UNIFIED_COLOR_SCHEME[0]},
-                name="Difference to previous header timestamp",
+            go.Scattergl(
+                x=[e["position"] for e in events],
+                y=[analysis.differences[e["position"]] for e in events],
+                mode="markers",
+                marker={"color": base.DIVERGING_COLOR_SCHEME[0], "size": 9, "symbol": "x"},
+                hovertext=[f"{e['kind']}: {e['run_length']} sample(s), magnitude {e['magnitude']}" for e in events],
+                name="Out-of-sequence and gap events",
             ),
             row=1,
             col=1,
         )
-        figure.append_trace(
-            go.Bar(
-                y=timestamps_echoes,
-                marker={"color": base.UNIFIED_COLOR_SCHEME[0]},
-                name="Echo timestamps",
-            ),
-            row=2,
-            col=1,
-        )
+        figure.update_layout(uirevision=self.get_name())
+        if visible_range is not None:
+            figure.update_xaxes(range=visible_range)
 
         if self.mode == "dashboard":
             base.unify_layout(figure)
             figure.update_layout(autosize=False, width=base.DASHBOARD_WIDTH, height=base.PLOT_HEIGHT)
-            return dcc.Graph(figure=figure)
+            return dcc.Graph(id=GRAPH_ID, figure=figure, config={"modeBarButtonsToAdd": ["select2d"]})
         elif self.mode == "notebook":
             figure.update_layout(autosize=False, width=base.NOTEBOOK_WIDTH, height=base.PLOT_HEIGHT)
             return figure
+
+    def get_summary(self):
+        """Returns the summary of all out-of-sequence and gap events, one table row per event."""
+        analysis = TimestampAnalysis.from_adapter(self.adapter)
+        events = analysis.events()
+        return html.Div(
+            [
+                html.P(
+                    "{oos} out-of-sequence and {gaps} gap events (differences larger than {threshold:.3g}). "
+                    "Select a row to jump to the event.".format(
+                        oos=len(analysis.out_of_sequence["position"]),
+                        gaps=len(analysis.gaps["position"]),
+                        threshold=analysis.gap_threshold,
+                    )
+                ),
+                dash_table.DataTable(
+                    id=TABLE_ID,
+                    columns=[{"name": c, "id": c} for c in ["kind", "position", "run_length", "magnitude"]],
+                    data=events,
+                    page_size=10,
+                    sort_action="native",
+                    style_table={"width": "{w}px".format(w=base.DASHBOARD_WIDTH // 2)},
+                ),
+            ]
+        )
+
+    def get_parts(self):
+        return {**super().get_parts(), "summary": self.get_summary}
+
+    def create_html(self, element):
+        super().create_html(element)
+        self.create_default_part_html(element, "summary")
+
+    def register(self, app):
+        def _function_return_zoomed_figure(relayout_data, active_cell, table_data):
+            if ctx.triggered_id == TABLE_ID:
+                if not active_cell:
+                    return no_update
+                position = table_data[active_cell["row"]]["position"]
+                with self.measure("jump"):
+                    figure = self.get_figure((position - JUMP_TO_WINDOW, position + JUMP_TO_WINDOW)).figure
+                    return base.encode_payload(figure)
+            return _decimation.zoomed_figure(relayout_data, self.get_figure, axes=("xaxis", "xaxis2"))
+
+        app.callback(
+            Output(GRAPH_ID, "figure"),
+            [Input(GRAPH_ID, "relayoutData"), Input(TABLE_ID, "active_cell")],
+            [State(TABLE_ID, "derived_viewport_data")],
+            prevent_initial_call=True,
+        )(_function_return_zoomed_figure)